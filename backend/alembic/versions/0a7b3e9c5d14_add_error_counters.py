@@ -0,0 +1,36 @@
+"""Add per-user error counters
+
+Revision ID: 0a7b3e9c5d14
+Revises: f6a9d2c4b831
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7b3e9c5d14'
+down_revision: Union[str, None] = 'f6a9d2c4b831'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('error_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('language_id', sa.Integer(), nullable=False),
+        sa.Column('error_type', sa.String(50), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['language_id'], ['languages.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'language_id', 'error_type')
+    )
+    # Existing messages are counted by: python -m app.jobs.analytics --rebuild-error-counters
+
+
+def downgrade() -> None:
+    op.drop_table('error_counters')
@@ -0,0 +1,39 @@
+"""Add adaptive difficulty state
+
+Revision ID: 1c5e8f2a6b93
+Revises: 0a7b3e9c5d14
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c5e8f2a6b93'
+down_revision: Union[str, None] = '0a7b3e9c5d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('difficulty_states',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('language_id', sa.Integer(), nullable=False),
+        sa.Column('scores', sa.LargeBinary().with_variant(mysql.BLOB(), 'mysql'), nullable=False),
+        sa.Column('complexities', sa.LargeBinary().with_variant(mysql.BLOB(), 'mysql'), nullable=False),
+        sa.Column('current_level', sa.Enum('easy', 'medium', 'hard', name='difficultylevel'), nullable=False),
+        sa.Column('recommendation', sa.String(20), nullable=False),
+        sa.Column('recommended_level', sa.Enum('easy', 'medium', 'hard', name='difficultylevel'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['language_id'], ['languages.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'language_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('difficulty_states')
@@ -0,0 +1,32 @@
+"""Add message language detection
+
+Revision ID: 2d9f4b7e1a05
+Revises: 1c5e8f2a6b93
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d9f4b7e1a05'
+down_revision: Union[str, None] = '1c5e8f2a6b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('messages', sa.Column('detected_language', sa.String(10), nullable=True))
+    op.add_column('messages', sa.Column('in_target_language', sa.Boolean(), nullable=True))
+    op.add_column('conversation_sessions', sa.Column('language_checked_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('conversation_sessions', sa.Column('target_language_count', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('conversation_sessions', 'target_language_count')
+    op.drop_column('conversation_sessions', 'language_checked_count')
+    op.drop_column('messages', 'in_target_language')
+    op.drop_column('messages', 'detected_language')
@@ -0,0 +1,28 @@
+"""Add correction text diffs
+
+Revision ID: 3e6a1d8c4f27
+Revises: 2d9f4b7e1a05
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e6a1d8c4f27'
+down_revision: Union[str, None] = '2d9f4b7e1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('feedback', sa.Column('text_diff', sa.Text(), nullable=True))
+    op.add_column('review_items', sa.Column('text_diff', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('review_items', 'text_diff')
+    op.drop_column('feedback', 'text_diff')
@@ -0,0 +1,38 @@
+"""Add prompt cache
+
+Revision ID: 4b8d2f6a9c31
+Revises: 3e6a1d8c4f27
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8d2f6a9c31'
+down_revision: Union[str, None] = '3e6a1d8c4f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('prompt_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cache_key', sa.String(64), nullable=False),
+        sa.Column('variant', sa.Integer(), nullable=False),
+        sa.Column('prompt_class', sa.String(50), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('cache_key', 'variant', name='uq_prompt_cache_key_variant')
+    )
+    op.create_index('ix_prompt_cache_expires_at', 'prompt_cache', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_prompt_cache_expires_at', table_name='prompt_cache')
+    op.drop_table('prompt_cache')
@@ -0,0 +1,26 @@
+"""Add session version
+
+Revision ID: 7e3b9a5d2f14
+Revises: 6d2a8f4c1e93
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3b9a5d2f14'
+down_revision: Union[str, None] = '6d2a8f4c1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversation_sessions', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('conversation_sessions', 'version')
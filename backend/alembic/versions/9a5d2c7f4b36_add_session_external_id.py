@@ -0,0 +1,30 @@
+"""Add session external id
+
+Revision ID: 9a5d2c7f4b36
+Revises: 8f4c1b6e3a25
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a5d2c7f4b36'
+down_revision: Union[str, None] = '8f4c1b6e3a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('conversation_sessions', sa.Column('external_id', sa.String(length=100), nullable=True))
+    op.create_index(
+        'uq_conversation_sessions_user_external', 'conversation_sessions', ['user_id', 'external_id'], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_conversation_sessions_user_external', table_name='conversation_sessions')
+    op.drop_column('conversation_sessions', 'external_id')
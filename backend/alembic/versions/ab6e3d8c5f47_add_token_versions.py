@@ -0,0 +1,37 @@
+"""Add token versions
+
+Revision ID: ab6e3d8c5f47
+Revises: 9a5d2c7f4b36
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ab6e3d8c5f47'
+down_revision: Union[str, None] = '9a5d2c7f4b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('token_revocations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('token_version', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_token_revocations_created_at', 'token_revocations', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_token_revocations_created_at', table_name='token_revocations')
+    op.drop_table('token_revocations')
+    op.drop_column('users', 'token_version')
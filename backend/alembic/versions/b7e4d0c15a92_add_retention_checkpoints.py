@@ -0,0 +1,34 @@
+"""Add retention_checkpoints table
+
+Revision ID: b7e4d0c15a92
+Revises: 3f1c2a9d7b64
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d0c15a92'
+down_revision: Union[str, None] = '3f1c2a9d7b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('retention_checkpoints',
+        sa.Column('policy', sa.String(100), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False, default=0),
+        sa.Column('rows_affected', sa.Integer(), nullable=False, default=0),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('policy')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('retention_checkpoints')
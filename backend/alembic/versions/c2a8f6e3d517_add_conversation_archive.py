@@ -0,0 +1,51 @@
+"""Add compressed cold storage for completed conversations
+
+Revision ID: c2a8f6e3d517
+Revises: b7e4d0c15a92
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a8f6e3d517'
+down_revision: Union[str, None] = 'b7e4d0c15a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('compression_dictionaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary().with_variant(mysql.BLOB(), 'mysql'), nullable=False),
+        sa.Column('sample_count', sa.Integer(), nullable=False, default=0),
+        sa.Column('created_at', sa.DateTime(), nullable=True, default=sa.func.current_timestamp()),
+        sa.PrimaryKeyConstraint('id')
+    )
+    
+    op.create_table('archived_conversations',
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('dictionary_id', sa.Integer(), nullable=True),
+        sa.Column('codec', sa.String(20), nullable=False),
+        sa.Column('payload', sa.LargeBinary().with_variant(mysql.LONGBLOB(), 'mysql'), nullable=False),
+        sa.Column('raw_size', sa.Integer(), nullable=False),
+        sa.Column('compressed_size', sa.Integer(), nullable=False),
+        sa.Column('message_count', sa.Integer(), nullable=False, default=0),
+        sa.Column('archived_at', sa.DateTime(), nullable=True, default=sa.func.current_timestamp()),
+        sa.PrimaryKeyConstraint('session_id'),
+        sa.ForeignKeyConstraint(['session_id'], ['conversation_sessions.id'], name='fk_archived_conversations_session'),
+        sa.ForeignKeyConstraint(['dictionary_id'], ['compression_dictionaries.id'], name='fk_archived_conversations_dictionary')
+    )
+    
+    op.add_column('conversation_sessions', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('conversation_sessions', 'archived_at')
+    op.drop_table('archived_conversations')
+    op.drop_table('compression_dictionaries')
@@ -0,0 +1,60 @@
+"""Add full-text message search index
+
+Revision ID: d41e7b2c9f08
+Revises: c2a8f6e3d517
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41e7b2c9f08'
+down_revision: Union[str, None] = 'c2a8f6e3d517'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Not an ORM table: MySQL needs a FULLTEXT index and SQLite an FTS5 virtual table
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE message_search USING fts5(
+                content,
+                message_id UNINDEXED,
+                session_id UNINDEXED,
+                user_id UNINDEXED,
+                language_id UNINDEXED,
+                created_at UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """)
+        return
+    
+    op.create_table('message_search',
+        sa.Column('message_id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('language_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.PrimaryKeyConstraint('message_id'),
+        mysql_engine='InnoDB'
+    )
+    op.create_index('ix_message_search_user_language', 'message_search', ['user_id', 'language_id'])
+    op.create_index('ft_message_search_content', 'message_search', ['content'], mysql_prefix='FULLTEXT')
+    
+    # Backfill existing messages
+    op.execute("""
+        INSERT INTO message_search (message_id, session_id, user_id, language_id, created_at, content)
+        SELECT m.id, m.session_id, s.user_id, s.target_language_id, m.created_at, m.content
+        FROM messages m JOIN conversation_sessions s ON s.id = m.session_id
+        WHERE m.message_type <> 'system'
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('message_search')
@@ -0,0 +1,45 @@
+"""Add per-user vocabulary index
+
+Revision ID: e58c3a1f7d20
+Revises: d41e7b2c9f08
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e58c3a1f7d20'
+down_revision: Union[str, None] = 'd41e7b2c9f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('vocabulary_entries',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('language_id', sa.Integer(), nullable=False),
+        sa.Column('token', sa.String(64).with_variant(sa.String(64, collation='utf8mb4_bin'), 'mysql'), nullable=False),
+        sa.Column('occurrences', sa.Integer(), nullable=False),
+        sa.Column('first_seen_at', sa.DateTime(), nullable=False),
+        sa.Column('last_seen_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['language_id'], ['languages.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'language_id', 'token')
+    )
+    op.create_index('ix_vocabulary_entries_first_seen', 'vocabulary_entries', ['user_id', 'language_id', 'first_seen_at'], unique=False)
+    op.create_table('indexer_checkpoints',
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('indexer_checkpoints')
+    op.drop_index('ix_vocabulary_entries_first_seen', table_name='vocabulary_entries')
+    op.drop_table('vocabulary_entries')
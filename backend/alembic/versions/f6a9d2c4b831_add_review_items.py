@@ -0,0 +1,49 @@
+"""Add spaced-repetition review items
+
+Revision ID: f6a9d2c4b831
+Revises: e58c3a1f7d20
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a9d2c4b831'
+down_revision: Union[str, None] = 'e58c3a1f7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('review_items',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('language_id', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(20), nullable=False),
+        sa.Column('source_id', sa.Integer(), nullable=False),
+        sa.Column('fingerprint', sa.String(40), nullable=False),
+        sa.Column('original_text', sa.Text(), nullable=False),
+        sa.Column('corrected_text', sa.Text(), nullable=False),
+        sa.Column('explanation', sa.Text(), nullable=True),
+        sa.Column('ease', sa.Float(), nullable=False),
+        sa.Column('interval_days', sa.Integer(), nullable=False),
+        sa.Column('repetitions', sa.Integer(), nullable=False),
+        sa.Column('lapses', sa.Integer(), nullable=False),
+        sa.Column('due_at', sa.DateTime(), nullable=False),
+        sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['language_id'], ['languages.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'language_id', 'fingerprint', name='uq_review_items_fingerprint')
+    )
+    op.create_index('ix_review_items_user_due', 'review_items', ['user_id', 'due_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_review_items_user_due', table_name='review_items')
+    op.drop_table('review_items')
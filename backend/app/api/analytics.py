@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from typing import Optional
+
+from ..db.routing import get_read_db
+from ..models.user import CurrentUser
+from ..models.analytics import ErrorPatternReport, ProgressSeries
+from ..models.difficulty import DifficultyRecommendation
+from ..services.analytics_service import AnalyticsService
+from ..services.progress_service import ProgressService
+from ..services.difficulty_service import DifficultyService
+from ..core.dependencies import get_current_user
+from ..core.rate_limit import rate_limit
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], dependencies=[Depends(rate_limit("default"))])
+
+@router.get("/errors", response_model=ErrorPatternReport)
+async def get_error_patterns(
+    days: int = Query(default=30, ge=1, le=365),
+    limit: int = Query(default=5, ge=1, le=50),
+    language_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """The current user's most frequent error categories and their trend"""
+    analytics_service = AnalyticsService(db)
+    return analytics_service.get_error_patterns(current_user.id, days=days, limit=limit, language_id=language_id)
+
+@router.get("/progress", response_model=ProgressSeries)
+async def get_progress(
+    days: int = Query(default=90, ge=1, le=730),
+    points: int = Query(default=30, ge=2, le=365),
+    window: int = Query(default=5, ge=1, le=100),
+    alpha: float = Query(default=0.3, gt=0, le=1),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """The current user's feedback scores over time, downsampled to `points` chart buckets"""
+    progress_service = ProgressService(db)
+    return progress_service.get_progress(current_user.id, days=days, points=points, window=window, alpha=alpha)
+
+@router.get("/difficulty/{language_id}", response_model=DifficultyRecommendation)
+async def get_difficulty_recommendation(
+    language_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Recommended difficulty for the current user's next session in a language"""
+    difficulty_service = DifficultyService(db)
+    return difficulty_service.recommend(current_user.id, language_id)
@@ -3,17 +3,19 @@ from sqlmodel import Session
 from datetime import timedelta
 
 from ..db.database import get_db
-from ..models.user import UserCreate, UserLogin, Token, UserRead
+from ..models.user import UserCreate, UserLogin, Token, UserRead, CurrentUser
 from ..services.user_service import UserService
-from ..core.security import create_access_token
+from ..core.security import create_user_access_token
+from ..core.dependencies import get_current_user
 from ..core.config import settings
+from ..core.rate_limit import rate_limit_by_ip
 from ..utils.logger import get_logger
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 logger = get_logger()
 
-@router.post("/register", response_model=UserRead)
+@router.post("/register", response_model=UserRead, dependencies=[Depends(rate_limit_by_ip("auth"))])
 async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     user_service = UserService(db)
@@ -109,7 +111,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
             detail="Failed to create user"
         )
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit_by_ip("auth"))])
 async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     """Authenticate user and return access token"""
     user_service = UserService(db)
@@ -123,14 +125,34 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Create access token
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    
+    # Create access token, valid until it expires or the user's tokens are revoked
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user, expires_delta=access_token_expires)
     
     return Token(access_token=access_token, token_type="bearer")
 
+@router.post("/logout-all")
+async def logout_all(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke every access token issued to the current user, on all devices"""
+    user_service = UserService(db)
+    
+    if not user_service.revoke_tokens(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return {"message": "Logged out everywhere"}
+
 @router.post("/check-email")
 async def check_email_availability(email: str, db: Session = Depends(get_db)):
     """Check if email is available for registration"""
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from typing import List, Optional
+
+from ..db.database import get_db
+from ..models.user import CurrentUser
+from ..models.feedback import FeedbackRead
+from ..services.feedback_service import FeedbackService
+from ..core.dependencies import get_current_user
+from ..core.rate_limit import rate_limit
+
+router = APIRouter(prefix="/feedback", tags=["feedback"], dependencies=[Depends(rate_limit("default"))])
+
+@router.get("/corrections", response_model=List[FeedbackRead])
+async def list_corrections(
+    session_id: Optional[int] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """The current user's corrections, newest first, with precomputed edit spans"""
+    feedback_service = FeedbackService(db)
+    return feedback_service.get_corrections(current_user.id, session_id=session_id, limit=limit, offset=offset)
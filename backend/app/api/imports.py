@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlmodel import Session
+from typing import Optional
+
+from ..db.database import get_db
+from ..models.user import CurrentUser
+from ..models.imports import ImportReport
+from ..services.import_service import ImportService, LineTooLongError, ndjson_lines
+from ..core.dependencies import get_current_user
+from ..core.rate_limit import rate_limit
+
+router = APIRouter(prefix="/imports", tags=["imports"], dependencies=[Depends(rate_limit("default"))])
+
+@router.post(
+    "/sessions", response_model=ImportReport,
+    openapi_extra={"requestBody": {"content": {"application/x-ndjson": {"schema": {"type": "string"}}}}}
+)
+async def import_sessions(
+    request: Request,
+    name: Optional[str] = Query(default=None, max_length=64, description="Resume a failed import by sending it again under the same name"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import sessions from another tool into the current user's account, as NDJSON with one session per line"""
+    import_service = ImportService(db)
+    try:
+        return await import_service.import_ndjson(
+            ndjson_lines(request.stream()),
+            name=f"user{current_user.id}:{name}" if name else None,
+            user_id=current_user.id
+        )
+    except LineTooLongError as e:
+        # Batches before the line are committed, a named import resumes after them
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e)
+        )
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Header, Query, Request
+from sqlmodel import Session
+from typing import List, Optional
+
+from ..db.database import get_db
+from ..models.user import CurrentUser
+from ..models.review import ReviewItem, ReviewItemRead, ReviewOutcome, ReviewOutcomeResult
+from ..services.review_service import ReviewService
+from ..core.dependencies import get_current_user
+from ..core.rate_limit import rate_limit
+from ..core.idempotency import idempotent
+
+router = APIRouter(prefix="/reviews", tags=["reviews"], dependencies=[Depends(rate_limit("default"))])
+
+def review_item_to_read(item: ReviewItem) -> ReviewItemRead:
+    """Convert a ReviewItem row, parsing its stored edit spans"""
+    return ReviewItemRead(**item.model_dump(exclude={"text_diff"}), text_diff=item.get_text_diff())
+
+@router.get("/due", response_model=List[ReviewItemRead])
+async def get_due_reviews(
+    limit: int = Query(default=20, ge=1, le=100),
+    language_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Corrections due for review now, most overdue first"""
+    review_service = ReviewService(db)
+    items = review_service.get_due_items(current_user.id, limit=limit, language_id=language_id)
+    return [review_item_to_read(item) for item in items]
+
+@router.post("/outcomes", response_model=ReviewOutcomeResult)
+async def record_review_outcomes(
+    outcomes: List[ReviewOutcome],
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Record a batch of review grades and reschedule the items"""
+    async def handler():
+        review_service = ReviewService(db)
+        return review_service.record_outcomes(current_user.id, outcomes)
+
+    return await idempotent(db, request, current_user.id, idempotency_key, outcomes, handler, ReviewOutcomeResult)
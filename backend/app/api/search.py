@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from typing import Optional
+
+from ..db.database import get_db
+from ..models.user import CurrentUser
+from ..models.search import SearchResults
+from ..services.search_service import SearchService
+from ..core.dependencies import get_current_user
+from ..core.rate_limit import rate_limit
+
+router = APIRouter(prefix="/search", tags=["search"], dependencies=[Depends(rate_limit("default"))])
+
+@router.get("/messages", response_model=SearchResults)
+async def search_messages(
+    q: str = Query(min_length=1, max_length=200),
+    language_id: Optional[int] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Search the current user's conversation history, best matches first"""
+    search_service = SearchService(db)
+    return search_service.search(current_user.id, q, language_id=language_id, limit=limit, offset=offset)
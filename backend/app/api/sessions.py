@@ -0,0 +1,328 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlmodel import Session
+from typing import List, Optional
+
+from ..db.database import get_db
+from ..db.routing import get_read_db
+from ..models.user import CurrentUser
+from ..models.message import Message, MessageBase, MessageUpdate, MessageRead, MessageType
+from ..models.feedback import Feedback, FeedbackRead
+from ..models.summary import SummaryStatus
+from ..models.session import (
+    ConversationSessionCreate, ConversationSessionRead, ConversationSessionReadWithMessages, ConversationSessionSummary,
+    ConversationSessionUpdate
+)
+from ..services.session_service import SessionService, SessionConflictError
+from ..services.opener_service import OpenerService, openers_enabled
+from ..services.summary_service import SummaryService
+from ..services.feedback_service import feedback_to_read
+from ..core.dependencies import get_current_user
+from ..core.rate_limit import rate_limit
+from ..core.idempotency import idempotent
+from ..utils.http_cache import session_etag, etag_matches
+
+router = APIRouter(prefix="/sessions", tags=["sessions"], dependencies=[Depends(rate_limit("default"))])
+
+def message_to_read(message: Message) -> MessageRead:
+    """Convert a Message row, parsing its JSON columns"""
+    return MessageRead(
+        id=message.id,
+        session_id=message.session_id,
+        content=message.content,
+        message_type=message.message_type,
+        word_count=message.word_count,
+        character_count=message.character_count,
+        complexity_score=message.complexity_score,
+        detected_language=message.detected_language,
+        in_target_language=message.in_target_language,
+        created_at=message.created_at,
+        detected_errors=message.get_detected_errors(),
+        corrections=message.get_corrections()
+    )
+
+@router.post(
+    "/", response_model=ConversationSessionRead, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("conversation"))]
+)
+async def create_session(
+    session_data: ConversationSessionCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Start a session, at the recommended difficulty unless one is given, with an opening assistant turn"""
+    async def handler():
+        session_service = SessionService(db)
+
+        try:
+            db_session = session_service.create_session(current_user.id, session_data)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        # Open the conversation, from the scenario's cached openers when there are enough
+        if openers_enabled():
+            opener = await OpenerService(db).get_opener(db_session)
+            if opener:
+                session_service.add_message(
+                    db_session.id, current_user.id, MessageBase(content=opener, message_type=MessageType.ASSISTANT)
+                )
+                db.refresh(db_session)
+
+        return db_session
+
+    return await idempotent(
+        db, request, current_user.id, idempotency_key, session_data, handler,
+        ConversationSessionRead, status.HTTP_201_CREATED
+    )
+
+@router.get("/", response_model=List[ConversationSessionSummary])
+async def list_sessions(
+    limit: int = 50,
+    offset: int = 0,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """List the current user's sessions, newest first"""
+    session_service = SessionService(db)
+    return session_service.get_user_sessions(current_user.id, limit=limit, offset=offset)
+
+@router.get(
+    "/{session_id}",
+    response_model=ConversationSessionReadWithMessages,
+    responses={304: {"description": "Session unchanged since the ETag in If-None-Match"}}
+)
+async def get_session(
+    session_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get a session with its messages, or 304 if the client's copy is current"""
+    session_service = SessionService(db)
+
+    db_session = session_service.get_user_session(session_id, current_user.id)
+    if not db_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    # Answer from the session row alone when the client already has this version
+    etag = session_etag(db_session.id, db_session.updated_at, db_session.message_count)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    messages = [message_to_read(message) for message in session_service.get_session_messages(db_session.id)]
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return ConversationSessionReadWithMessages(
+        **db_session.model_dump(exclude={"full_conversation"}),
+        messages=messages,
+        conversation=session_service.parse_conversation(db_session)
+    )
+
+@router.post(
+    "/{session_id}/messages", response_model=MessageRead, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("conversation"))]
+)
+async def add_message(
+    session_id: int,
+    message_data: MessageBase,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Add a message to one of the current user's sessions"""
+    async def handler():
+        session_service = SessionService(db)
+
+        try:
+            message = session_service.add_message(session_id, current_user.id, message_data)
+        except SessionConflictError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+        if not message:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+
+        return message_to_read(message)
+
+    return await idempotent(
+        db, request, current_user.id, idempotency_key, message_data, handler,
+        MessageRead, status.HTTP_201_CREATED
+    )
+
+@router.patch(
+    "/{session_id}/messages/{message_id}", response_model=MessageRead,
+    dependencies=[Depends(rate_limit("conversation"))]
+)
+async def update_message(
+    session_id: int,
+    message_id: int,
+    message_data: MessageUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update a message or its analysis (detected errors, corrections, complexity)"""
+    session_service = SessionService(db)
+
+    try:
+        message = session_service.update_message(session_id, current_user.id, message_id, message_data)
+    except SessionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not message:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Message not found"
+        )
+
+    return message_to_read(message)
+
+@router.patch(
+    "/{session_id}", response_model=ConversationSessionRead,
+    responses={409: {"description": "Session changed since the version the edit was made on"}}
+)
+async def update_session(
+    session_id: int,
+    session_data: ConversationSessionUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Edit a session, send the version it was read at to reject edits of a stale copy"""
+    session_service = SessionService(db)
+
+    try:
+        db_session = session_service.update_session(session_id, current_user.id, session_data)
+    except SessionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not db_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    return db_session
+
+@router.post("/{session_id}/pause", response_model=ConversationSessionRead)
+async def pause_session(
+    session_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Pause a session"""
+    session_service = SessionService(db)
+
+    try:
+        db_session = session_service.pause_session(session_id, current_user.id)
+    except SessionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not db_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    return db_session
+
+@router.post("/{session_id}/resume", response_model=ConversationSessionRead)
+async def resume_session(
+    session_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Resume a paused session"""
+    session_service = SessionService(db)
+
+    try:
+        db_session = session_service.resume_session(session_id, current_user.id)
+    except SessionConflictError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not db_session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    return db_session
+
+@router.post("/{session_id}/end", response_model=ConversationSessionRead)
+async def end_session(
+    session_id: int,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """End a session, its summary feedback is generated in the background"""
+    async def handler():
+        session_service = SessionService(db)
+
+        try:
+            db_session = session_service.end_session(session_id, current_user.id)
+        except SessionConflictError as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=str(e)
+            )
+        if not db_session:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
+
+        return db_session
+
+    return await idempotent(db, request, current_user.id, idempotency_key, None, handler, ConversationSessionRead)
+
+@router.get(
+    "/{session_id}/summary", response_model=FeedbackRead,
+    responses={status.HTTP_202_ACCEPTED: {"model": SummaryStatus, "description": "Summary still being generated"}}
+)
+async def get_session_summary(
+    session_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """The summary feedback of an ended session, 202 with Retry-After while it is generated"""
+    session_service = SessionService(db)
+
+    db_session = session_service.get_user_session(session_id, current_user.id)
+    summary_status = SummaryService(db).get_status(session_id) if db_session else None
+    if not summary_status or summary_status.status in ("skipped", "failed"):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Summary not found"
+        )
+
+    if summary_status.feedback_id is None:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=summary_status.model_dump(),
+            headers={"Retry-After": "5"}
+        )
+
+    return feedback_to_read(db.get(Feedback, summary_status.feedback_id))
@@ -1,16 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from typing import List
+from datetime import datetime
 
 from ..db.database import get_db
-from ..models.user import User, UserRead, UserUpdate, UserReadWithStats
+from ..db.routing import get_read_db
+from ..models.user import User, CurrentUser, UserRead, UserUpdate, UserReadWithStats, PasswordChange, Token
+from ..models.usage import LLMUsageRead
 from ..services.user_service import UserService
-from ..core.dependencies import get_current_user
+from ..services.usage_service import UsageService
+from ..services.export_service import stream_export
+from ..core.dependencies import get_current_user, get_current_active_user
+from ..core.security import create_user_access_token
+from ..core.rate_limit import rate_limit
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], dependencies=[Depends(rate_limit("default"))])
 
 @router.get("/me", response_model=UserRead)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: User = Depends(get_current_active_user)):
     """Get current user's profile"""
     return UserRead(
         id=current_user.id,
@@ -29,10 +37,33 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
         learning_goals=current_user.learning_goals
     )
 
+@router.get("/me/llm-usage", response_model=LLMUsageRead)
+async def get_llm_usage(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """LLM tokens the current user has spent today and what is left of the daily quota"""
+    usage_service = UsageService(db)
+    return usage_service.get_today(current_user.id)
+
+@router.get("/me/export")
+def export_current_user_data(
+    format: str = Query(default="ndjson", pattern="^(ndjson|zip)$"),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Download all of the current user's data, as NDJSON or a zip of CSV files, streamed as it is read"""
+    extension, media_type = ("zip", "application/zip") if format == "zip" else ("ndjson", "application/x-ndjson")
+    filename = f"convopilot-export-{current_user.id}-{datetime.utcnow():%Y%m%d}.{extension}"
+    return StreamingResponse(
+        stream_export(current_user.id, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.put("/me", response_model=UserRead)
 async def update_current_user_profile(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update current user's profile"""
@@ -62,10 +93,30 @@ async def update_current_user_profile(
         learning_goals=updated_user.learning_goals
     )
 
+@router.put("/me/password", response_model=Token, dependencies=[Depends(rate_limit("password"))])
+async def change_password(
+    password_change: PasswordChange,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Change the current user's password, signing out every other client. Returns a new access token"""
+    user_service = UserService(db)
+    
+    updated_user = user_service.change_password(
+        current_user.id, password_change.current_password, password_change.new_password
+    )
+    if not updated_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect password"
+        )
+    
+    return Token(access_token=create_user_access_token(updated_user), token_type="bearer")
+
 @router.get("/me/stats", response_model=UserReadWithStats)
 async def get_current_user_stats(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get current user's statistics"""
     user_service = UserService(db)
@@ -93,7 +144,7 @@ async def get_current_user_stats(
 
 @router.delete("/me")
 async def deactivate_current_user(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Deactivate current user's account"""
@@ -110,7 +161,7 @@ async def deactivate_current_user(
 
 @router.get("/profile-completion")
 async def get_profile_completion(
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_active_user)
 ):
     """Get profile completion percentage"""
     completion_score = 0
@@ -140,8 +191,8 @@ async def get_profile_completion(
 
 @router.get("/language-peers")
 async def get_language_peers(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get other users learning the same target language"""
     user_service = UserService(db)
@@ -164,8 +215,8 @@ async def get_language_peers(
 
 @router.get("/statistics")
 async def get_user_statistics(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get user's learning statistics"""
     from ..services.session_service import SessionService
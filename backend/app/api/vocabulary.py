@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from typing import Optional
+
+from ..db.database import get_db
+from ..models.user import CurrentUser
+from ..models.vocabulary import VocabularySize, VocabularyGrowth
+from ..services.vocabulary_service import VocabularyService
+from ..core.dependencies import get_current_user
+from ..core.rate_limit import rate_limit
+
+router = APIRouter(prefix="/vocabulary", tags=["vocabulary"], dependencies=[Depends(rate_limit("default"))])
+
+@router.get("/size", response_model=VocabularySize)
+async def get_vocabulary_size(
+    language_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Distinct words the current user has produced"""
+    vocabulary_service = VocabularyService(db)
+    return vocabulary_service.get_vocabulary_size(current_user.id, language_id=language_id)
+
+@router.get("/new-words", response_model=VocabularyGrowth)
+async def get_new_words_per_week(
+    language_id: Optional[int] = None,
+    weeks: int = Query(default=12, ge=1, le=104),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """New distinct words per week for the current user"""
+    vocabulary_service = VocabularyService(db)
+    return vocabulary_service.get_new_words_per_week(current_user.id, language_id=language_id, weeks=weeks)
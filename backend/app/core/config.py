@@ -15,16 +15,101 @@ class Settings(BaseSettings):
     mysql_port: int = 3306
     mysql_database: str = "convopilot"
     
+    # Read replicas for read-heavy routes such as history and stats (see app/db/routing.py)
+    database_replica_urls: str | None = None  # Comma-separated SQLAlchemy URLs, reads use the primary when unset
+    replica_sticky_seconds: float = 10  # Reads by a client that wrote this recently go to the primary
+    replica_max_lag_seconds: float = 10  # Replicas further behind the primary's heartbeat are skipped
+    replica_retry_seconds: float = 30  # How long a replica that failed a query is skipped
+    
+    # Startup schema handling: "create_all" (dev), "migrations" (verify alembic head) or "skip"
+    db_startup_mode: str = "create_all"
+    
+    # Production server settings (see app/server.py)
+    web_concurrency: int | None = None  # Defaults to the number of available CPU cores
+    graceful_timeout: int = 30  # Seconds to drain in-flight requests on SIGTERM
+    
+    # Responses smaller than this many bytes are sent uncompressed
+    compression_minimum_size: int = 1024
+    
+    # Background jobs (see app/jobs)
+    scheduler_enabled: bool = True
+    stale_session_idle_minutes: int = 120
+    indexer_settle_seconds: float = 60  # Indexers leave newer rows for later, must exceed the longest write transaction (see app/db/checkpoint.py)
+    
+    # Data retention (see app/services/retention_service.py)
+    retention_deactivated_user_days: int | None = 90  # Purge accounts deactivated this long ago
+    retention_message_days: int | None = None  # Delete messages older than this, disabled by default
+    retention_batch_size: int = 1000
+    retention_batch_pause_ms: int = 100  # Pause between batches to let replication and other writers keep up
+    
+    # Cold storage for completed sessions (see app/services/archive_service.py)
+    archive_after_days: int | None = 30
+    
+    # Adaptive difficulty (see app/services/difficulty_service.py)
+    difficulty_window: int = 10  # Recent scores and complexity ratings kept per user and language
+    difficulty_min_samples: int = 3
+    difficulty_increase_score: float = 80.0  # Mean overall score at or above which difficulty goes up
+    difficulty_decrease_score: float = 55.0  # Mean overall score below which difficulty goes down
+    difficulty_increase_complexity: float = 4.0  # Minimum mean message complexity (1-10) to go up
+    
+    # Session-summary feedback generated after a session ends (see app/services/summary_service.py)
+    summary_batch_size: int = 20  # Sessions summarised per run of the job, concurrently
+    summary_max_attempts: int = 3  # LLM failures before falling back to the offline summary
+    
+    # Re-reads of a session after losing a concurrent update, for changes that can simply be redone
+    session_update_retries: int = 3
+    
+    # Idempotency-Key handling of write requests (see app/core/idempotency.py)
+    idempotency_ttl_hours: int = 24  # How long a stored response is replayed to retries
+    idempotency_wait_seconds: float = 10  # How long a duplicate waits for the original request before 409
+    idempotency_memory_entries: int = 10000  # Stored responses cached in each worker
+    
+    # Bulk import of historical sessions (see app/services/import_service.py)
+    import_batch_size: int = 500  # Sessions per transaction, with their messages and feedback
+    import_max_line_bytes: int = 16 * 1024 * 1024  # Longest session line accepted, bounds what a stream without newlines buffers
+    
+    # Language detection of user messages (see app/utils/langid.py)
+    langid_enabled: bool = True
+    langid_model_path: str | None = None  # Defaults to app/data/langid.npy, built by python -m app.jobs.langid, detection is skipped while missing
+    langid_min_confidence: float = 0.9  # Below this a message counts as written in the target language
+    
+    # Rate limits as "<count>/<second|minute|hour|day>" (see app/core/rate_limit.py)
+    rate_limit_enabled: bool = True
+    rate_limit_auth: str = "10/minute"  # Login and registration, per client IP
+    rate_limit_conversation: str = "30/minute"  # Starting sessions and writing messages, per user
+    rate_limit_password: str = "5/hour"  # Password changes, per user
+    rate_limit_default: str = "300/minute"  # Other authenticated routes, per user
+    rate_limit_redis_url: str | None = None  # Share buckets across workers (requires the redis package)
+    
+    # Daily LLM token allowance per user, None for unlimited (see app/services/usage_service.py)
+    llm_daily_token_quota: int | None = 50_000
+    
     # JWT settings
     secret_key: str = "your-super-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_revocation_poll_seconds: float = 1.0  # How often each worker picks up tokens revoked by others
     
     # CORS settings - Use string for env var, convert to list
     backend_cors_origins: str | list[str] = "http://localhost:3000"
     
-    # LLM API settings (for future use)
+    # LLM API settings (see app/core/llm.py)
     openai_api_key: str | None = None
+    llm_base_url: str = "https://api.openai.com/v1"
+    llm_model: str = "gpt-4o-mini"
+    llm_max_connections: int = 20  # Keep-alive pool per provider and worker
+    llm_max_concurrency: int = 16  # In-flight requests per provider and worker
+    llm_timeout_seconds: float = 30
+    llm_max_retries: int = 2
+    llm_hedge_after_ms: int | None = None  # Send a second copy of requests slower than this, disabled by default
+    llm_breaker_failures: int = 5  # Consecutive failures that open the circuit
+    llm_breaker_reset_seconds: float = 30  # How long the circuit stays open before a trial call
+    
+    # Cached LLM output for deterministic prompts such as session openers (see app/services/prompt_cache_service.py)
+    session_openers_enabled: bool = True  # Only used when openai_api_key is set
+    prompt_cache_variants: int = 5  # Distinct generations kept per prompt, picked at random
+    prompt_cache_ttl_hours: int = 24 * 7
+    prompt_cache_memory_entries: int = 2000  # Keys kept in each worker's LRU
     
     class Config:
         env_file = ".env"
@@ -36,6 +121,10 @@ class Settings(BaseSettings):
             return self.database_url
         return f"mysql+pymysql://{self.mysql_user}:{self.mysql_password}@{self.mysql_host}:{self.mysql_port}/{self.mysql_database}"
     
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in (self.database_replica_urls or "").split(",") if url.strip()]
+    
     @property
     def database_url_async(self) -> str:
         if self.database_url:
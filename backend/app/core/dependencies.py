@@ -4,79 +4,77 @@ from sqlalchemy.orm import Session
 from typing import Optional
 
 from .security import verify_token
+from .token_versions import token_versions
 from ..db.database import get_db
 from ..services.user_service import UserService
-from ..models.user import User
+from ..models.user import User, CurrentUser
 
 # Security scheme
 security = HTTPBearer()
 
+def _token_user(token: str, db: Session) -> Optional[CurrentUser]:
+    """The user a token was issued to, None if it is malformed or was revoked"""
+    payload = verify_token(token)
+    email, user_id, version = payload.get("sub"), payload.get("uid"), payload.get("token_version")
+    if not isinstance(email, str) or not isinstance(user_id, int) or not isinstance(version, int):
+        return None
+    # Checked against the versions held in memory, the database is only read for users not seen yet
+    if not token_versions.is_current(db, user_id, version):
+        return None
+    return CurrentUser(id=user_id, email=email)
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Get the current authenticated user"""
-    
+) -> CurrentUser:
+    """Get the current authenticated user from their access token, without loading the account"""
+
     # Verify the token
     try:
-        payload = verify_token(credentials.credentials)
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except Exception:
+        current_user = _token_user(credentials.credentials, db)
+    except HTTPException:
+        current_user = None
+    if current_user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    # Get user from database
+
+    return current_user
+
+async def get_current_active_user(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get the current user's account, for routes that need more than their id"""
     user_service = UserService(db)
-    user = user_service.get_user_by_email(email)
+    user = user_service.get_user_by_id(current_user.id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    # Deactivation revokes the user's tokens, this only catches accounts changed directly in the database
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    
-    return user
 
-async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
-    """Get the current active user (additional check for is_active)"""
-    return current_user
+    return user
 
 def get_optional_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
     db: Session = Depends(get_db)
-) -> Optional[User]:
+) -> Optional[CurrentUser]:
     """Get the current user if authenticated, otherwise return None"""
     if not credentials:
         return None
-    
+
     try:
-        payload = verify_token(credentials.credentials)
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        
-        user_service = UserService(db)
-        user = user_service.get_user_by_email(email)
-        if user and user.is_active:
-            return user
+        return _token_user(credentials.credentials, db)
     except Exception:
-        pass
-    
-    return None 
\ No newline at end of file
+        return None
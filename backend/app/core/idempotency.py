@@ -0,0 +1,175 @@
+"""Idempotency-Key handling for write routes.
+
+Clients retrying a write send the same Idempotency-Key header with every
+attempt. The first attempt runs the route and its response is stored for
+idempotency_ttl_hours, retries get that response back with an
+Idempotent-Replayed header and nothing is run again. A duplicate arriving
+while the first attempt is still running waits for its response, so
+concurrent submissions execute once. Reusing a key for a different request
+body is rejected with 422.
+
+Stored responses live in the idempotency_keys table, shared by all workers,
+with the most recent ones also cached in each worker's memory.
+"""
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, Type
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, SQLModel
+
+from .config import settings
+from ..models.idempotency import IdempotencyKey
+
+# A claim this old without a response belongs to a worker that died mid-request
+CLAIM_LEASE = timedelta(minutes=5)
+POLL_SECONDS = 0.1
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: str
+
+
+_responses: "OrderedDict[str, tuple[float, StoredResponse]]" = OrderedDict()
+_responses_lock = threading.Lock()
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key_hash: str) -> Optional[StoredResponse]:
+    with _responses_lock:
+        entry = _responses.get(key_hash)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        _responses.move_to_end(key_hash)
+        return entry[1]
+
+
+def _cache_put(key_hash: str, expires_in: float, stored: StoredResponse):
+    with _responses_lock:
+        _responses[key_hash] = (time.monotonic() + expires_in, stored)
+        _responses.move_to_end(key_hash)
+        while len(_responses) > settings.idempotency_memory_entries:
+            _responses.popitem(last=False)
+
+
+def _replay(stored: StoredResponse, request_hash: str) -> Response:
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    return Response(
+        content=stored.body, status_code=stored.status_code, media_type="application/json",
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def _claim(db: Session, key_hash: str, user_id: int, request_hash: str) -> Optional[IdempotencyKey]:
+    """Record the key as in progress and return None, or return the existing record of another attempt"""
+    now = datetime.utcnow()
+    record = db.get(IdempotencyKey, key_hash)
+    if record is not None and (
+        record.expires_at <= now or (record.status_code is None and record.created_at < now - CLAIM_LEASE)
+    ):
+        db.delete(record)
+        db.commit()
+        record = None
+    if record is None:
+        db.add(IdempotencyKey(
+            key_hash=key_hash, user_id=user_id, request_hash=request_hash,
+            created_at=now, expires_at=now + timedelta(hours=settings.idempotency_ttl_hours)
+        ))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            # Another attempt claimed the key first
+            db.rollback()
+            record = db.get(IdempotencyKey, key_hash)
+    return record
+
+
+def _serialize(result: Any, response_model: Optional[Type[SQLModel]]) -> str:
+    if response_model is not None and not isinstance(result, response_model):
+        result = response_model.model_validate(result, from_attributes=True)
+    return json.dumps(jsonable_encoder(result), separators=(",", ":"))
+
+
+async def idempotent(
+    db: Session,
+    request: Request,
+    user_id: int,
+    key: Optional[str],
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    response_model: Optional[Type[SQLModel]] = None,
+    status_code: int = status.HTTP_200_OK,
+) -> Any:
+    """Run a write route's `handler` once per Idempotency-Key and replay its response to retries"""
+    if key is None:
+        return await handler()
+
+    key_hash = _hash(f"{user_id}\n{request.method} {request.url.path}\n{key}")
+    request_hash = _hash(json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":")))
+
+    stored = _cache_get(key_hash)
+    if stored is not None:
+        return _replay(stored, request_hash)
+
+    deadline = time.monotonic() + settings.idempotency_wait_seconds
+    while (record := _claim(db, key_hash, user_id, request_hash)) is not None:
+        if record.request_hash != request_hash or record.status_code is not None:
+            stored = StoredResponse(record.request_hash, record.status_code, record.response_body)
+            if record.status_code is not None:
+                _cache_put(key_hash, (record.expires_at - datetime.utcnow()).total_seconds(), stored)
+            return _replay(stored, request_hash)
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed"
+            )
+        # End the transaction so the next read sees the other attempt's response
+        db.rollback()
+        await asyncio.sleep(POLL_SECONDS)
+
+    try:
+        result = await handler()
+    except BaseException:
+        # Nothing is stored for failed attempts, the client may retry with the same key
+        db.rollback()
+        db.exec(delete(IdempotencyKey).where(IdempotencyKey.key_hash == key_hash))
+        db.commit()
+        raise
+
+    if isinstance(result, Response):
+        stored = StoredResponse(request_hash, result.status_code, result.body.decode("utf-8"))
+    else:
+        stored = StoredResponse(request_hash, status_code, _serialize(result, response_model))
+    db.exec(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key_hash == key_hash)
+        .values(status_code=stored.status_code, response_body=stored.body)
+    )
+    db.commit()
+    _cache_put(key_hash, settings.idempotency_ttl_hours * 3600, stored)
+    return Response(content=stored.body, status_code=stored.status_code, media_type="application/json")
+
+
+def purge_expired(db: Session) -> int:
+    """Delete expired stored responses, returns how many were removed"""
+    deleted = db.exec(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,246 @@
+"""Shared async client for LLM provider APIs.
+
+One `LLMClient` per provider lives for the whole worker process, so every
+call reuses the same keep-alive connection pool. Each provider has its own
+concurrency limit, so a slow provider cannot take every connection. Failed
+calls are retried with jittered exponential backoff. Optionally, a hedge
+attempt is started when the first one is slow. A circuit breaker makes calls
+fail fast while the provider is down.
+
+Point `llm_base_url` at benchmarks/fake_llm.py to exercise all of this
+locally with injected latency and errors.
+"""
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .config import settings
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+
+class LLMError(Exception):
+    """A provider call failed after all retries"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(LLMError):
+    """The provider has been failing, calls are rejected without being sent"""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures, lets one trial call through after `reset_seconds`"""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            # A failed trial call keeps the circuit open for another period
+            if self.opened_at is None:
+                logger.warning(f"LLM circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+
+
+class _RetryableError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMClient:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        max_connections: int = 20,
+        max_concurrency: int = 16,
+        timeout_seconds: float = 30,
+        connect_timeout_seconds: float = 5,
+        max_retries: int = 2,
+        backoff_base_seconds: float = 0.25,
+        backoff_max_seconds: float = 8,
+        hedge_after_seconds: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.http = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60,
+            ),
+            transport=transport,
+        )
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = {"requests": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0, "rejected": 0}
+
+    async def chat(self, messages: List[Dict[str, str]], model: Optional[str] = None, **params: Any) -> Dict[str, Any]:
+        """OpenAI-style chat completion, returns the decoded response body"""
+        body = {"model": model or settings.llm_model, "messages": messages, **params}
+        return await self.post("/chat/completions", body)
+
+    async def post(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """POST with the breaker, retries and hedging applied"""
+        if not self.breaker.allow():
+            self.metrics["rejected"] += 1
+            raise CircuitOpenError("LLM provider circuit is open")
+        self.metrics["requests"] += 1
+
+        attempt = 0
+        while True:
+            try:
+                result = await self._hedged(path, body)
+            except _RetryableError as e:
+                if attempt >= self.max_retries:
+                    self.metrics["failures"] += 1
+                    self.breaker.record_failure()
+                    raise LLMError(str(e), e.status_code) from e
+                attempt += 1
+                self.metrics["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, e.retry_after))
+            except LLMError:
+                # Not retryable (e.g. a 400), the provider itself is healthy
+                self.breaker.record_success()
+                raise
+            except asyncio.CancelledError:
+                # An abandoned call says nothing about the provider, free the trial slot
+                self.breaker.trial_in_flight = False
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never sooner than the provider's Retry-After"""
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    async def _hedged(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        if self.hedge_after_seconds is None:
+            return await self._send(path, body)
+
+        first = asyncio.create_task(self._send(path, body))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after_seconds)
+        # Only hedge with spare capacity, a saturated provider gets no extra load
+        if done or self.semaphore.locked():
+            return await first
+
+        self.metrics["hedges"] += 1
+        hedge = asyncio.create_task(self._send(path, body))
+        pending = {first, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.metrics["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _send(self, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.semaphore:
+            try:
+                response = await self.http.post(path, json=body)
+            except httpx.TransportError as e:
+                raise _RetryableError(f"{type(e).__name__}: {e}") from e
+
+        if response.status_code in RETRYABLE_STATUS:
+            retry_after = response.headers.get("retry-after")
+            raise _RetryableError(
+                f"LLM provider returned {response.status_code}",
+                response.status_code,
+                float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else None,
+            )
+        if response.status_code >= 400:
+            raise LLMError(f"LLM provider returned {response.status_code}: {response.text[:200]}", response.status_code)
+        return response.json()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {**self.metrics, "circuit": self.breaker.state, "consecutive_failures": self.breaker.failures}
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+_clients: Dict[str, LLMClient] = {}
+
+
+def get_llm_client(base_url: Optional[str] = None, api_key: Optional[str] = None) -> LLMClient:
+    """The worker's shared client for a provider (one per base URL), created on first use"""
+    base_url = base_url or settings.llm_base_url
+    client = _clients.get(base_url)
+    if client is None:
+        client = _clients[base_url] = LLMClient(
+            base_url=base_url,
+            api_key=api_key or settings.openai_api_key,
+            max_connections=settings.llm_max_connections,
+            max_concurrency=settings.llm_max_concurrency,
+            timeout_seconds=settings.llm_timeout_seconds,
+            max_retries=settings.llm_max_retries,
+            hedge_after_seconds=settings.llm_hedge_after_ms / 1000 if settings.llm_hedge_after_ms else None,
+            breaker=CircuitBreaker(settings.llm_breaker_failures, settings.llm_breaker_reset_seconds),
+        )
+    return client
+
+
+async def close_llm_clients():
+    """Close pooled provider connections on shutdown"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
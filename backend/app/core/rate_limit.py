@@ -0,0 +1,139 @@
+"""Token-bucket rate limiting per route group.
+
+Limits are written "<count>/<second|minute|hour|day>". A bucket holds up to
+`count` tokens and refills at count per period, so short bursts are allowed
+while the sustained rate stays bounded. Authenticated routes are limited per
+user and the anonymous auth routes per client IP.
+
+Buckets live in the worker's memory, so each worker enforces the full limit
+on its own. Set rate_limit_redis_url (needs the redis package) to share
+buckets across workers and replicas instead.
+"""
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from .config import settings
+from .dependencies import get_current_user
+from ..models.user import CurrentUser
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """(capacity, tokens per second) from "<count>/<period>" """
+    count, _, period = limit.partition("/")
+    if period not in PERIODS or not count.strip().isdigit() or int(count) < 1:
+        raise ValueError(f"Invalid rate limit {limit!r}, expected e.g. '10/minute'")
+    return float(count), int(count) / PERIODS[period]
+
+
+class MemoryBucketStore:
+    """Buckets in a dict of key -> [tokens, last refill time, seconds to refill completely]"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.buckets: Dict[str, list] = {}
+        self.lock = threading.Lock()
+        self.max_keys = max_keys
+
+    async def take(self, key: str, capacity: float, rate: float, cost: float = 1) -> float:
+        """Spend `cost` tokens, returns 0 if allowed or the seconds until enough tokens are back"""
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    self._evict_idle(now)
+                bucket = self.buckets[key] = [capacity, now, capacity / rate]
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return 0.0
+            bucket[0] = tokens
+            return (cost - tokens) / rate
+
+    def _evict_idle(self, now: float):
+        # Buckets idle long enough to have refilled completely are the same as new ones
+        for key in [key for key, (_, stamp, refill) in self.buckets.items() if now - stamp >= refill]:
+            del self.buckets[key]
+        if len(self.buckets) >= self.max_keys:
+            self.buckets.clear()
+
+
+class RedisBucketStore:
+    """Buckets shared by all workers, updated atomically by a Lua script"""
+
+    SCRIPT = """
+        local capacity, rate, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+        local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'stamp')
+        local tokens = tonumber(bucket[1]) or capacity
+        local stamp = tonumber(bucket[2]) or now
+        tokens = math.min(capacity, tokens + math.max(0, now - stamp) * rate)
+        local wait = 0
+        if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+        redis.call('HSET', KEYS[1], 'tokens', tokens, 'stamp', now)
+        redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+        return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio
+
+        self.client = redis.asyncio.from_url(url)
+        self.script = self.client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, capacity: float, rate: float, cost: float = 1) -> float:
+        return float(await self.script(keys=[f"ratelimit:{key}"], args=[capacity, rate, cost, time.time()]))
+
+
+class RateLimiter:
+    def __init__(self, store, limits: Dict[str, str]):
+        self.store = store
+        self.limits = {group: parse_limit(limit) for group, limit in limits.items()}
+
+    async def check(self, group: str, key: str, cost: float = 1):
+        """Raise 429 with Retry-After when `key` is over the group's limit"""
+        capacity, rate = self.limits[group]
+        wait = await self.store.take(f"{group}:{key}", capacity, rate, cost)
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        store = RedisBucketStore(settings.rate_limit_redis_url) if settings.rate_limit_redis_url else MemoryBucketStore()
+        _limiter = RateLimiter(store, {
+            "auth": settings.rate_limit_auth,
+            "conversation": settings.rate_limit_conversation,
+            "password": settings.rate_limit_password,
+            "default": settings.rate_limit_default,
+        })
+    return _limiter
+
+
+def rate_limit(group: str):
+    """Dependency limiting the current user's requests to a route group"""
+    async def dependency(current_user: CurrentUser = Depends(get_current_user)):
+        if settings.rate_limit_enabled:
+            await get_limiter().check(group, f"user:{current_user.id}")
+    return dependency
+
+
+def rate_limit_by_ip(group: str):
+    """Dependency limiting anonymous requests to a route group by client address"""
+    async def dependency(request: Request):
+        if settings.rate_limit_enabled:
+            await get_limiter().check(group, f"ip:{request.client.host if request.client else 'unknown'}")
+    return dependency
@@ -0,0 +1,280 @@
+"""Lightweight in-process job scheduler.
+
+Jobs run on an interval or a 5-field cron expression (UTC). Every worker in
+every replica runs the same schedule, and a lease row per job in the database
+decides which one actually executes each scheduled slot.
+"""
+import asyncio
+import inspect
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional, Union
+
+from sqlmodel import Session
+
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+JobFunc = Callable[[], Union[None, Awaitable[None]]]
+EPOCH = datetime(1970, 1, 1)
+
+
+class IntervalSchedule:
+    """Fire every `seconds`, aligned to the epoch so all workers agree on slots"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+
+    def next_slot(self, after: datetime) -> datetime:
+        elapsed = (after - EPOCH).total_seconds()
+        return EPOCH + timedelta(seconds=(elapsed // self.seconds + 1) * self.seconds)
+
+    def __str__(self) -> str:
+        return f"every {self.seconds:g}s"
+
+
+class CronSchedule:
+    """Standard 5-field cron expression: minute hour day-of-month month day-of-week"""
+
+    FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6)]
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        values = [self._parse_field(part, low, high, name) for part, (name, low, high) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = values
+        # Like cron, day-of-month and day-of-week are OR-ed when both are restricted
+        self.day_restricted = parts[2] != "*"
+        self.weekday_restricted = parts[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int, name: str) -> frozenset:
+        if name == "weekday":
+            high = 7  # Both 0 and 7 mean Sunday
+        values = set()
+        for item in field.split(","):
+            item, _, step = item.partition("/")
+            step = int(step) if step else 1
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = (int(value) for value in item.split("-", 1))
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron {name} field: {field!r}")
+            values.update(range(start, end + 1, step))
+        if name == "weekday":
+            values = {value % 7 for value in values}
+        return frozenset(values)
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_slot(self, after: datetime) -> datetime:
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after + timedelta(days=366 * 5)
+        while moment <= limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self._day_matches(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+    def __str__(self) -> str:
+        return f"cron {self.expression}"
+
+
+class JobMetrics:
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0  # Slots claimed by another worker
+        self.running = False
+        self.next_run_at: Optional[datetime] = None
+        self.last_started_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.total_duration_ms = 0.0
+        self.last_status: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def average_duration_ms(self) -> Optional[float]:
+        return self.total_duration_ms / self.runs if self.runs else None
+
+
+class Job:
+    def __init__(
+        self,
+        name: str,
+        func: JobFunc,
+        schedule: Union[IntervalSchedule, CronSchedule],
+        jitter_seconds: float = 0,
+        lease_seconds: float = 600,
+    ):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.jitter_seconds = jitter_seconds
+        self.lease_seconds = lease_seconds
+        self.metrics = JobMetrics()
+
+
+class Scheduler:
+    def __init__(self, owner: Optional[str] = None):
+        # Set in start() unless given, the scheduler is created at import, before gunicorn forks workers
+        self.owner = owner
+        self._fixed_owner = owner is not None
+        self.jobs: dict[str, Job] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._stopping: Optional[asyncio.Event] = None
+
+    def add_job(self, job: Job) -> Job:
+        if job.name in self.jobs:
+            raise ValueError(f"Job already registered: {job.name}")
+        self.jobs[job.name] = job
+        return job
+
+    def interval(self, name: str, seconds: float, jitter_seconds: float = 0, lease_seconds: float = 600):
+        """Decorator registering a job that runs every `seconds`"""
+        def decorator(func: JobFunc) -> JobFunc:
+            self.add_job(Job(name, func, IntervalSchedule(seconds), jitter_seconds, lease_seconds))
+            return func
+        return decorator
+
+    def cron(self, name: str, expression: str, jitter_seconds: float = 0, lease_seconds: float = 600):
+        """Decorator registering a job that runs on a cron expression (UTC)"""
+        def decorator(func: JobFunc) -> JobFunc:
+            self.add_job(Job(name, func, CronSchedule(expression), jitter_seconds, lease_seconds))
+            return func
+        return decorator
+
+    async def start(self):
+        """Start one loop per registered job"""
+        if not self._fixed_owner:
+            self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopping = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._run_loop(job), name=f"job:{job.name}")
+            for job in self.jobs.values()
+        ]
+        logger.info(f"Scheduler {self.owner} started {len(self._tasks)} jobs")
+
+    async def stop(self, timeout: float = 30):
+        """Stop scheduling, giving running jobs up to `timeout` seconds to finish"""
+        if self._stopping is None:
+            return
+        self._stopping.set()
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        self._stopping = None
+
+    async def _run_loop(self, job: Job):
+        while not self._stopping.is_set():
+            slot = job.schedule.next_slot(datetime.utcnow())
+            job.metrics.next_run_at = slot
+            # Jitter spreads lease attempts from many workers over a small window
+            delay = (slot - datetime.utcnow()).total_seconds() + random.uniform(0, job.jitter_seconds)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=max(delay, 0))
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.run_job(job, slot)
+
+    async def run_job(self, job: Job, slot: datetime) -> bool:
+        """Run one slot of a job if this worker wins its lease"""
+        try:
+            acquired = await asyncio.to_thread(self._acquire, job, slot)
+        except Exception as e:
+            logger.error(f"Could not acquire lease for job {job.name}: {e}")
+            return False
+        if not acquired:
+            job.metrics.skipped += 1
+            return False
+
+        metrics = job.metrics
+        metrics.running = True
+        metrics.last_started_at = datetime.utcnow()
+        started = time.perf_counter()
+        status, error = "success", None
+        try:
+            result = job.func() if inspect.iscoroutinefunction(job.func) else await asyncio.to_thread(job.func)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            metrics.failures += 1
+            logger.error(f"Job {job.name} failed: {error}")
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            metrics.running = False
+            metrics.runs += 1
+            metrics.last_duration_ms = duration_ms
+            metrics.total_duration_ms += duration_ms
+            metrics.last_status = status
+            metrics.last_error = error
+
+        try:
+            await asyncio.to_thread(self._release, job, status, duration_ms, error)
+        except Exception as e:
+            logger.error(f"Could not release lease for job {job.name}: {e}")
+        return True
+
+    def _acquire(self, job: Job, slot: datetime) -> bool:
+        from ..db.database import engine
+        from ..services.job_lease_service import JobLeaseService
+
+        with Session(engine) as db:
+            return JobLeaseService(db).try_acquire(job.name, self.owner, slot, job.lease_seconds)
+
+    def _release(self, job: Job, status: str, duration_ms: float, error: Optional[str]):
+        from ..db.database import engine
+        from ..services.job_lease_service import JobLeaseService
+
+        with Session(engine) as db:
+            JobLeaseService(db).release(job.name, self.owner, status, duration_ms, error)
+
+    def get_status(self) -> list[dict]:
+        """Per-job timing and last-run metrics for this worker"""
+        return [
+            {
+                "name": job.name,
+                "schedule": str(job.schedule),
+                "runs": job.metrics.runs,
+                "failures": job.metrics.failures,
+                "skipped": job.metrics.skipped,
+                "running": job.metrics.running,
+                "next_run_at": job.metrics.next_run_at,
+                "last_started_at": job.metrics.last_started_at,
+                "last_duration_ms": job.metrics.last_duration_ms,
+                "average_duration_ms": job.metrics.average_duration_ms,
+                "last_status": job.metrics.last_status,
+                "last_error": job.metrics.last_error,
+            }
+            for job in self.jobs.values()
+        ]
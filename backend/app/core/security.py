@@ -28,6 +28,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def create_user_access_token(user, expires_delta: Optional[timedelta] = None) -> str:
+    """Create a JWT access token for a user, valid until it expires or the user's token version changes."""
+    return create_access_token(
+        {"sub": user.email, "uid": user.id, "token_version": user.token_version}, expires_delta=expires_delta
+    )
+
 def verify_token(token: str) -> dict:
     """Verify and decode a JWT token."""
     try:
@@ -0,0 +1,99 @@
+"""Per-user token versions, so access tokens can be revoked before they expire.
+
+Access tokens carry the token_version their user had when they were issued.
+Deactivating an account, changing its password or logging out everywhere
+bumps the version, and every token issued before stops being accepted.
+
+Each worker keeps the versions in an array indexed by user id, 4 bytes per
+user, and checks tokens against it without a database query. A user's
+version is read from the users table the first time one of their tokens is
+seen. Every bump is also recorded in token_revocations, which each worker
+reads at most every token_revocation_poll_seconds to pick up revocations made
+by other workers. The worker making a revocation applies it at once.
+"""
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from .config import settings
+from ..models.user import User, TokenRevocation
+
+UNKNOWN = -1
+# Revocations are re-read this far back on every poll, in case one commits after a later one was seen
+POLL_OVERLAP = timedelta(seconds=30)
+RETENTION = timedelta(days=1)
+
+
+class TokenVersions:
+    def __init__(self):
+        self.versions = array("i")
+        self.lock = threading.Lock()
+        self.poll_lock = threading.Lock()
+        self.next_poll = 0.0
+        self.polled_at: Optional[datetime] = None
+
+    def is_current(self, db: Session, user_id: int, token_version: int) -> bool:
+        """Whether a token with this version is still valid, from memory except for new users"""
+        self._poll(db)
+        version = self.get(user_id)
+        # A newer version than known means this worker has not seen the revocation yet
+        if version == UNKNOWN or token_version > version:
+            version = db.exec(select(User.token_version).where(User.id == user_id)).first()
+            if version is None:
+                return False
+            self.record(user_id, version)
+        return token_version == version
+
+    def get(self, user_id: int) -> int:
+        versions = self.versions
+        return versions[user_id] if 0 <= user_id < len(versions) else UNKNOWN
+
+    def record(self, user_id: int, version: int):
+        """Remember a user's version, versions only go up"""
+        with self.lock:
+            if user_id >= len(self.versions):
+                self.versions.extend([UNKNOWN] * (user_id + 1 - len(self.versions)))
+            if version > self.versions[user_id]:
+                self.versions[user_id] = version
+
+    def _poll(self, db: Session):
+        if time.monotonic() < self.next_poll or not self.poll_lock.acquire(blocking=False):
+            return
+        try:
+            self.next_poll = time.monotonic() + settings.token_revocation_poll_seconds
+            started = datetime.utcnow()
+            since = (self.polled_at or started) - POLL_OVERLAP
+            for user_id, version in db.exec(
+                select(TokenRevocation.user_id, TokenRevocation.token_version)
+                .where(TokenRevocation.created_at >= since)
+            ).all():
+                self.record(user_id, version)
+            self.polled_at = started
+        finally:
+            self.poll_lock.release()
+
+
+token_versions = TokenVersions()
+
+
+def revoke(db: Session, user: User):
+    """Bump the user's token version in the caller's transaction.
+
+    Record the new version in token_versions once committed, so this worker
+    rejects the old tokens right away.
+    """
+    user.token_version += 1
+    db.add(user)
+    db.add(TokenRevocation(user_id=user.id, token_version=user.token_version))
+
+
+def purge_expired(db: Session) -> int:
+    """Delete revocations every worker has read, returns how many were removed"""
+    deleted = db.exec(delete(TokenRevocation).where(TokenRevocation.created_at < datetime.utcnow() - RETENTION)).rowcount
+    db.commit()
+    return deleted
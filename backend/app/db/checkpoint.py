@@ -0,0 +1,32 @@
+"""Horizons for incremental indexers that read a table in id order past a checkpoint.
+
+Auto-increment ids are handed out when rows are inserted but the rows only become
+visible when their transaction commits, so rows can appear below an id an indexer
+has already moved past, e.g. a bulk import batch committing after live messages.
+Indexers therefore only read up to a horizon: the highest id that existed at least
+indexer_settle_seconds ago, by which time every transaction holding a lower id has
+committed or rolled back. A new horizon is taken once the indexer has caught up.
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from ..core.config import settings
+from ..models.job import IndexerCheckpoint
+
+
+def settled_id(db: Session, name: str, last_id: int, id_column) -> int:
+    """Highest id the indexer `name`, checkpointed at `last_id`, may read up to now"""
+    horizon_name = f"{name}:horizon"
+    horizon = db.get(IndexerCheckpoint, horizon_name)
+    now = datetime.utcnow()
+    if horizon is None or last_id >= horizon.last_id:
+        horizon = horizon or IndexerCheckpoint(name=horizon_name)
+        horizon.last_id = db.exec(select(func.max(id_column))).one() or 0
+        horizon.updated_at = now
+        db.add(horizon)
+        db.commit()
+    if horizon.updated_at > now - timedelta(seconds=settings.indexer_settle_seconds):
+        return last_id
+    return horizon.last_id
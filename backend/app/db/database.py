@@ -1,19 +1,46 @@
+from pathlib import Path
+
 from sqlmodel import create_engine, SQLModel, Session
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 from ..core.config import settings
 
 # Sync database setup
 engine = create_engine(settings.database_url_sync, echo=True)
 
-# Async database setup
-async_engine = create_async_engine(settings.database_url_async, echo=True)
-AsyncSessionLocal = sessionmaker(
-    bind=async_engine, 
-    class_=AsyncSession, 
-    expire_on_commit=False
-)
+# Read replicas, only used through the routing session (see routing.py)
+replica_engines = [create_engine(url, echo=True, pool_pre_ping=True) for url in settings.replica_urls]
+
+# Async database setup (created on first use, nothing on the startup path needs it)
+_async_engine = None
+_async_session_factory = None
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        _async_engine = create_async_engine(settings.database_url_async, echo=True)
+    return _async_engine
+
+def get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from sqlalchemy.orm import sessionmaker
+        _async_session_factory = sessionmaker(
+            bind=get_async_engine(),
+            class_=AsyncSession,
+            expire_on_commit=False
+        )
+    return _async_session_factory
+
+def __getattr__(name: str):
+    # Keep `from app.db.database import async_engine, AsyncSessionLocal` working
+    if name == "async_engine":
+        return get_async_engine()
+    if name == "AsyncSessionLocal":
+        return get_async_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Base class for all models
 Base = declarative_base()
@@ -21,6 +48,61 @@ Base = declarative_base()
 # Function to create all tables
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    
+    # Tables outside the ORM metadata
+    from ..services.search_service import ensure_search_schema
+    ensure_search_schema(engine)
+
+def get_alembic_head() -> str | None:
+    """Get the head revision from the alembic scripts shipped with the app"""
+    # Alembic is only needed for this check, so don't pay for it on every import
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    backend_dir = Path(__file__).resolve().parents[2]
+    config = Config(str(backend_dir / "alembic.ini"))
+    config.set_main_option("script_location", str(backend_dir / "alembic"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+def get_database_revision() -> str | None:
+    """Get the revision currently stamped in the database"""
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+def verify_migrations():
+    """Check that the database is at the alembic head revision"""
+    expected = get_alembic_head()
+    current = get_database_revision()
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {current}, expected {expected}. "
+            "Run `alembic upgrade head` before starting the app."
+        )
+
+def init_database():
+    """Prepare the database according to settings.db_startup_mode"""
+    if settings.db_startup_mode == "create_all":
+        create_db_and_tables()
+    elif settings.db_startup_mode == "migrations":
+        verify_migrations()
+    elif settings.db_startup_mode != "skip":
+        raise ValueError(f"Unknown db_startup_mode: {settings.db_startup_mode}")
+
+def reset_engines_after_fork():
+    """Drop pooled connections inherited from the parent process without closing them"""
+    engine.dispose(close=False)
+    for replica_engine in replica_engines:
+        replica_engine.dispose(close=False)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+async def dispose_engines():
+    """Close all pooled connections on shutdown"""
+    engine.dispose()
+    for replica_engine in replica_engines:
+        replica_engine.dispose()
+    if _async_engine is not None:
+        await _async_engine.dispose()
 
 # Dependency to get database session
 def get_db():
@@ -29,5 +111,5 @@ def get_db():
 
 # Async dependency to get database session
 async def get_async_db():
-    async with AsyncSessionLocal() as session:
-        yield session 
\ No newline at end of file
+    async with get_async_session_factory()() as session:
+        yield session
@@ -0,0 +1,210 @@
+"""Routing of read-only requests to read replicas.
+
+Routes that only read, such as session history, stats and dashboards, take
+their session from get_read_db instead of get_db. Its queries go to a replica
+and anything it writes goes to the primary, after which the rest of the
+session reads from the primary too.
+
+A replica is only used while it can be trusted:
+- Reads by a client that sent a write in the last replica_sticky_seconds go
+  to the primary, so users see their own changes. Every response to a write
+  sets a cookie, signed with the secret key, holding when that window ends, so
+  it holds whichever worker or instance serves the next request.
+- The primary stores a heartbeat every few seconds (see app/jobs/maintenance.py).
+  A replica whose copy of it is older than replica_max_lag_seconds is skipped,
+  so all reads go to the primary when the heartbeat job is not running.
+- A replica that fails a query is skipped for replica_retry_seconds, and the
+  query, and the rest of the session, run on the primary instead.
+"""
+import hashlib
+import hmac
+import itertools
+import math
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import Select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlmodel import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..core.config import settings
+from ..models.job import IndexerCheckpoint
+from ..utils.logger import get_logger
+from .database import engine, replica_engines
+
+logger = get_logger()
+
+HEARTBEAT = "replica_heartbeat"
+# How often each worker re-reads a replica's heartbeat
+LAG_CHECK_SECONDS = 1.0
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+STICKY_COOKIE = "read_primary_until"
+
+
+class RoutingSession(Session):
+    """Session reading from `replica`, when given, and writing to the primary"""
+
+    def __init__(self, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(bind=engine, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is not None:
+            if isinstance(clause, Select) and not self._flushing:
+                return self.replica
+            if self._flushing or clause is not None:
+                # Read your own writes for the rest of the session
+                self.replica = None
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def exec(self, *args, **kwargs):
+        return self._read(super().exec, *args, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._read(super().execute, *args, **kwargs)
+
+    def _read(self, run, *args, **kwargs):
+        """Run a statement, again on the primary when the replica fails it"""
+        replica = self.replica
+        try:
+            return run(*args, **kwargs)
+        except DBAPIError as e:
+            if replica is None or self.replica is not replica:
+                raise
+            # Nothing was written while reading from the replica, so nothing is lost
+            self.rollback()
+            self.replica = None
+            replicas.mark_failed(replica, e)
+            return run(*args, **kwargs)
+
+
+class _Replica:
+    def __init__(self, replica_engine: Engine):
+        self.engine = replica_engine
+        self.skip_until = 0.0
+        self.checked_at = float("-inf")
+        self.caught_up = False
+
+
+class ReplicaRouter:
+    """Picks a healthy, caught-up replica for each read-only session, round robin"""
+
+    def __init__(self, engines: List[Engine]):
+        self.replicas = [_Replica(replica_engine) for replica_engine in engines]
+        self._turn = itertools.count()
+
+    def engine_for(self) -> Optional[Engine]:
+        """A replica engine to read from, None to read from the primary"""
+        if not self.replicas:
+            return None
+        start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._usable(replica):
+                return replica.engine
+        return None
+
+    def mark_failed(self, replica_engine: Engine, error: Exception):
+        for replica in self.replicas:
+            if replica.engine is replica_engine:
+                replica.skip_until = time.monotonic() + settings.replica_retry_seconds
+                logger.warning(
+                    f"Replica {replica_engine.url.render_as_string(hide_password=True)} failed, "
+                    f"reading from the primary for {settings.replica_retry_seconds:.0f}s: {getattr(error, 'orig', error)}"
+                )
+
+    def _usable(self, replica: _Replica) -> bool:
+        now = time.monotonic()
+        if replica.skip_until > now:
+            return False
+        if now - replica.checked_at >= LAG_CHECK_SECONDS:
+            # Set first so concurrent requests keep the last result instead of all checking
+            replica.checked_at = now
+            try:
+                lag = self._lag(replica.engine)
+            except SQLAlchemyError as e:
+                replica.caught_up = False
+                self.mark_failed(replica.engine, e)
+                return False
+            replica.caught_up = lag is not None and lag <= settings.replica_max_lag_seconds
+        return replica.caught_up
+
+    @staticmethod
+    def _lag(replica_engine: Engine) -> Optional[float]:
+        """Seconds since the heartbeat the replica has, None if it has none"""
+        with Session(replica_engine) as db:
+            heartbeat = db.get(IndexerCheckpoint, HEARTBEAT)
+        if heartbeat is None or heartbeat.updated_at is None:
+            return None
+        return (datetime.utcnow() - heartbeat.updated_at).total_seconds()
+
+
+replicas = ReplicaRouter(replica_engines)
+
+
+def write_heartbeat(db: Session):
+    """Store the time on the primary, replicas are as far behind as their copy of it"""
+    heartbeat = db.get(IndexerCheckpoint, HEARTBEAT) or IndexerCheckpoint(name=HEARTBEAT)
+    heartbeat.updated_at = datetime.utcnow()
+    db.add(heartbeat)
+    db.commit()
+
+
+def _signature(until: int) -> str:
+    return hmac.new(
+        settings.secret_key.encode("utf-8"), f"{STICKY_COOKIE}:{until}".encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+def sticky_cookie() -> str:
+    """Cookie value sending the client's reads to the primary for replica_sticky_seconds from now"""
+    until = math.ceil(time.time() + settings.replica_sticky_seconds)
+    return f"{until}.{_signature(until)}"
+
+
+def reads_primary(cookie: Optional[str]) -> bool:
+    """Whether a sticky cookie is genuine and its window is still open"""
+    until, _, signature = (cookie or "").partition(".")
+    if not until.isdigit() or not hmac.compare_digest(signature, _signature(int(until))):
+        return False
+    now = time.time()
+    # Never longer than one window, even for cookies signed before the setting was lowered
+    return now < int(until) <= now + settings.replica_sticky_seconds + 1
+
+
+class ReadYourWritesMiddleware:
+    """Set the sticky cookie on responses to writes, so the client's next reads go to the primary"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            # Signed as the response starts, so the window opens once the write is done
+            if message["type"] == "http.response.start":
+                cookie = (
+                    f"{STICKY_COOKIE}={sticky_cookie()}; Max-Age={math.ceil(settings.replica_sticky_seconds)}; "
+                    "Path=/; HttpOnly; SameSite=lax"
+                )
+                if scope.get("scheme") == "https":
+                    cookie += "; Secure"
+                MutableHeaders(scope=message).append("set-cookie", cookie)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def get_read_db(request: Request):
+    """Database session for read-only routes, reading from a replica when one can serve the client"""
+    replica = None if reads_primary(request.cookies.get(STICKY_COOKIE)) else replicas.engine_for()
+    with RoutingSession(replica) as session:
+        yield session
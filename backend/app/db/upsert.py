@@ -0,0 +1,53 @@
+"""Dialect-aware multi-row upserts (MySQL ON DUPLICATE KEY UPDATE, SQLite/PostgreSQL ON CONFLICT)."""
+from typing import Callable, List
+
+from sqlalchemy import func
+from sqlmodel import Session
+
+
+def greatest(dialect: str, a, b):
+    """Larger of two SQL expressions"""
+    return func.greatest(a, b) if dialect in ("mysql", "postgresql") else func.max(a, b)
+
+
+def least(dialect: str, a, b):
+    """Smaller of two SQL expressions"""
+    return func.least(a, b) if dialect in ("mysql", "postgresql") else func.min(a, b)
+
+
+def upsert(
+    db: Session,
+    model,
+    rows: List[dict],
+    key_columns: List[str],
+    update: Callable,
+    chunk_size: int = 1000,
+):
+    """Insert rows, merging into existing ones on key conflict.
+
+    `update(existing, incoming, dialect)` returns {column: expression} for
+    conflicting rows, where `existing` are the table's columns and `incoming`
+    the values that failed to insert.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise ValueError(f"Upsert is not supported on {dialect}")
+
+    table = model.__table__
+    for start in range(0, len(rows), chunk_size):
+        statement = insert(table).values(rows[start:start + chunk_size])
+        if dialect == "mysql":
+            statement = statement.on_duplicate_key_update(**update(table.c, statement.inserted, dialect))
+        else:
+            statement = statement.on_conflict_do_update(
+                index_elements=key_columns, set_=update(table.c, statement.excluded, dialect)
+            )
+        db.exec(statement)
@@ -0,0 +1,9 @@
+# Background jobs run by the in-process scheduler, started from main.lifespan
+from ..core.scheduler import Scheduler
+
+scheduler = Scheduler()
+
+# Register job modules
+from . import analytics, archive, maintenance, prompt_cache, retention, reviews, summaries, vocabulary  # noqa: E402,F401
+
+__all__ = ["scheduler"]
@@ -0,0 +1,45 @@
+"""Learner analytics maintenance.
+
+Difficulty recommendations are recomputed for everyone nightly.
+
+Error counters are kept current as detected errors are written. After
+upgrading, or to repair them, recount from the stored messages:
+    python -m app.jobs.analytics --rebuild-error-counters [--user-id 42]
+
+Cohort progress report (JSON on stdout) for every user with recent feedback:
+    python -m app.jobs.analytics --cohort-progress --days 90
+"""
+import argparse
+
+from sqlmodel import Session
+
+from . import scheduler
+from ..db.database import engine
+from ..services.analytics_service import AnalyticsService
+from ..services.progress_service import ProgressService
+from ..services.difficulty_service import DifficultyService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+@scheduler.cron("recompute_difficulty", "0 2 * * *", jitter_seconds=60, lease_seconds=3600)
+def recompute_difficulty():
+    """Rebuild every learner's difficulty window and recommendation"""
+    with Session(engine) as db:
+        updated = DifficultyService(db).recompute_all()
+    logger.info(f"Recomputed difficulty for {updated} users and languages")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learner analytics maintenance")
+    parser.add_argument("--rebuild-error-counters", action="store_true", help="recount error counters from messages")
+    parser.add_argument("--user-id", type=int, default=None, help="only rebuild this user's counters")
+    parser.add_argument("--cohort-progress", action="store_true", help="print per-user progress summaries as JSON")
+    parser.add_argument("--days", type=int, default=90, help="cohort report window")
+    args = parser.parse_args()
+    if args.rebuild_error_counters:
+        with Session(engine) as db:
+            read = AnalyticsService(db).rebuild_error_counters(user_id=args.user_id)
+        logger.info(f"Rebuilt error counters from {read} messages")
+    if args.cohort_progress:
+        with Session(engine) as db:
+            print(ProgressService(db).get_cohort_progress(days=args.days).model_dump_json(indent=2))
@@ -0,0 +1,27 @@
+from sqlmodel import Session
+
+from . import scheduler
+from ..core.config import settings
+from ..db.database import engine
+from ..services.archive_service import ArchiveService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+@scheduler.cron("train_compression_dictionary", "0 5 * * 0", jitter_seconds=60)
+def train_compression_dictionary():
+    """Retrain the transcript dictionary weekly so it follows how conversations change"""
+    with Session(engine) as db:
+        dictionary = ArchiveService(db).train_dictionary()
+    if dictionary is not None:
+        logger.info(f"Trained compression dictionary {dictionary.id} from {dictionary.sample_count} sessions")
+
+@scheduler.cron("archive_completed_sessions", "0 4 * * *", jitter_seconds=60, lease_seconds=3600)
+def archive_completed_sessions():
+    """Move sessions completed a while ago into compressed cold storage"""
+    if settings.archive_after_days is None:
+        return
+    with Session(engine) as db:
+        archived = ArchiveService(db).archive_completed_sessions(settings.archive_after_days)
+    if archived:
+        logger.info(f"Archived {archived} completed sessions")
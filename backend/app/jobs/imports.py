@@ -0,0 +1,52 @@
+"""Bulk import of historical sessions from other tools.
+
+Reads NDJSON, one session per line with its messages and feedback (see
+app/models/imports.py), from a file or stdin:
+    python -m app.jobs.imports sessions.ndjson --name acme-2026
+Each line names its learner with user_email unless --user-email is given.
+Rerunning a named import resumes after its last committed batch.
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from sqlmodel import Session, select
+
+from ..db.database import engine
+from ..models.user import User
+from ..services.import_service import ImportService, ndjson_lines
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+CHUNK_SIZE = 1 << 20
+
+async def read_chunks(file: BinaryIO) -> AsyncIterator[bytes]:
+    while chunk := file.read(CHUNK_SIZE):
+        yield chunk
+
+async def import_file(file: BinaryIO, name: str | None, user_email: str | None, batch_size: int | None):
+    with Session(engine) as db:
+        user_id = None
+        if user_email:
+            user_id = db.exec(select(User.id).where(User.email == user_email)).first()
+            if user_id is None:
+                raise SystemExit(f"No user with email {user_email}")
+        return await ImportService(db).import_ndjson(
+            ndjson_lines(read_chunks(file)), name=name, user_id=user_id, batch_size=batch_size
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import historical sessions from NDJSON")
+    parser.add_argument("path", help="NDJSON file, - for stdin")
+    parser.add_argument("--name", help="import name, to resume it after a failure")
+    parser.add_argument("--user-email", help="import every session into this account")
+    parser.add_argument("--batch-size", type=int, help="sessions per transaction")
+    args = parser.parse_args()
+    if args.path == "-":
+        report = asyncio.run(import_file(sys.stdin.buffer, args.name, args.user_email, args.batch_size))
+    else:
+        with open(args.path, "rb") as file:
+            report = asyncio.run(import_file(file, args.name, args.user_email, args.batch_size))
+    print(report.model_dump_json(indent=2))
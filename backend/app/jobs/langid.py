@@ -0,0 +1,72 @@
+"""Build the language identification model.
+
+From the seed corpus only (no database needed, e.g. at image build time):
+    python -m app.jobs.langid --seed-only
+From the seed corpus plus assistant messages, labelled with their session's
+target language, which adds every language actually taught:
+    python -m app.jobs.langid
+
+Running workers keep the model they mapped at startup until restarted.
+"""
+import argparse
+from collections import Counter
+from pathlib import Path
+
+from sqlmodel import Session, select
+
+from ..core.config import settings
+from ..db.database import engine
+from ..models.language import Language
+from ..models.message import Message, MessageType
+from ..models.session import ConversationSession
+from ..utils import langid
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+def base_code(code: str) -> str:
+    return code.lower().replace("_", "-").split("-")[0]
+
+def message_samples(per_language: int) -> list[tuple[str, str]]:
+    """Recent assistant messages per target language"""
+    samples = []
+    with Session(engine) as db:
+        for language in db.exec(select(Language)).all():
+            contents = db.exec(
+                select(Message.content)
+                .join(ConversationSession, ConversationSession.id == Message.session_id)
+                .where(
+                    ConversationSession.target_language_id == language.id,
+                    Message.message_type == MessageType.ASSISTANT
+                )
+                .order_by(Message.id.desc())
+                .limit(per_language)
+            ).all()
+            samples.extend((base_code(language.code), content) for content in contents)
+    return samples
+
+def build_model(seed_only: bool = False, per_language: int = 5000) -> list[str]:
+    """Train and save the model, returns the language codes it covers"""
+    samples = langid.seed_samples()
+    if not seed_only:
+        samples += message_samples(per_language)
+    codes, weights = langid.train(samples)
+    path = Path(settings.langid_model_path or langid.DEFAULT_MODEL_PATH)
+    langid.save(path, codes, weights)
+    langid.reset_identifier()
+
+    counts = Counter(code for code, _ in samples)
+    logger.info(f"Saved language model for {len(codes)} languages to {path}: {dict(counts)}")
+    if not seed_only:
+        with Session(engine) as db:
+            missing = {base_code(language.code) for language in db.exec(select(Language)).all()} - set(codes)
+        if missing:
+            logger.warning(f"No training text for languages {sorted(missing)}, their messages won't be checked")
+    return codes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the language identification model")
+    parser.add_argument("--seed-only", action="store_true", help="train on the built-in seed corpus only")
+    parser.add_argument("--per-language", type=int, default=5000, help="assistant messages sampled per language")
+    args = parser.parse_args()
+    build_model(seed_only=args.seed_only, per_language=args.per_language)
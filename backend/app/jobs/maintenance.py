@@ -0,0 +1,80 @@
+"""Routine upkeep.
+
+Metrics for messages stored before they were computed on insert are filled in
+every few minutes, or all at once with:
+    python -m app.jobs.maintenance --backfill-message-metrics
+
+Edit spans for corrections stored before they were computed on write:
+    python -m app.jobs.maintenance --backfill-text-diffs
+"""
+import argparse
+
+from sqlmodel import Session
+
+from . import scheduler
+from ..core.config import settings
+from ..core import idempotency, token_versions
+from ..db.database import engine
+from ..db import routing
+from ..services.session_service import SessionService
+from ..services.message_metrics_service import MessageMetricsService
+from ..services.feedback_service import FeedbackService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+@scheduler.interval("pause_stale_sessions", seconds=300, jitter_seconds=30)
+def pause_stale_sessions():
+    """Pause sessions that were left active without any activity"""
+    with Session(engine) as db:
+        paused = SessionService(db).pause_stale_sessions(settings.stale_session_idle_minutes)
+    if paused:
+        logger.info(f"Paused {paused} stale sessions")
+
+@scheduler.interval("backfill_message_metrics", seconds=600, jitter_seconds=60)
+def backfill_message_metrics(max_batches: int = 50):
+    """Compute word counts and complexity for older messages"""
+    with Session(engine) as db:
+        updated = MessageMetricsService(db).backfill(max_batches=max_batches)
+    if updated:
+        logger.info(f"Computed metrics for {updated} messages")
+
+@scheduler.interval("purge_idempotency_keys", seconds=3600, jitter_seconds=120)
+def purge_idempotency_keys():
+    """Delete stored write responses past their replay window"""
+    with Session(engine) as db:
+        deleted = idempotency.purge_expired(db)
+    if deleted:
+        logger.info(f"Purged {deleted} expired idempotency keys")
+
+@scheduler.interval("purge_token_revocations", seconds=3600, jitter_seconds=120)
+def purge_token_revocations():
+    """Delete token revocations old enough for every worker to have read them"""
+    with Session(engine) as db:
+        deleted = token_versions.purge_expired(db)
+    if deleted:
+        logger.info(f"Purged {deleted} old token revocations")
+
+if settings.replica_urls:
+    # A write every few seconds, only worth it when reads go to replicas
+    @scheduler.interval("replica_heartbeat", seconds=2, lease_seconds=10)
+    def replica_heartbeat():
+        """Timestamp on the primary that replica lag is measured against"""
+        with Session(engine) as db:
+            routing.write_heartbeat(db)
+
+def backfill_text_diffs():
+    """Compute edit spans for older feedback and review items"""
+    with Session(engine) as db:
+        filled = FeedbackService(db).backfill_text_diffs()
+    logger.info(f"Computed edit spans for {filled} corrections")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routine upkeep")
+    parser.add_argument("--backfill-message-metrics", action="store_true", help="compute metrics for all older messages")
+    parser.add_argument("--backfill-text-diffs", action="store_true", help="compute edit spans for older corrections")
+    args = parser.parse_args()
+    if args.backfill_message_metrics:
+        backfill_message_metrics(max_batches=1_000_000)
+    if args.backfill_text_diffs:
+        backfill_text_diffs()
@@ -0,0 +1,46 @@
+"""Cached LLM prompts such as session openers.
+
+Expired variants are deleted hourly. To pre-generate openers for the most
+common recent scenarios, e.g. after a deploy or a prompt change, run:
+    python -m app.jobs.prompt_cache --warm --top 50 --days 30
+"""
+import argparse
+import asyncio
+
+from sqlmodel import Session
+
+from . import scheduler
+from ..db.database import engine
+from ..services.prompt_cache_service import PromptCacheService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+@scheduler.interval("purge_prompt_cache", seconds=3600, jitter_seconds=120)
+def purge_prompt_cache():
+    """Delete expired prompt variants"""
+    with Session(engine) as db:
+        deleted = PromptCacheService(db).purge_expired()
+    if deleted:
+        logger.info(f"Purged {deleted} expired prompt variants")
+
+async def warm_openers(top: int, days: int) -> int:
+    """Fill the opener pools of the most common recent scenarios"""
+    from ..core.llm import close_llm_clients
+    from ..services.opener_service import OpenerService
+
+    try:
+        with Session(engine) as db:
+            return await OpenerService(db).warm(top=top, days=days)
+    finally:
+        await close_llm_clients()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cached LLM prompts")
+    parser.add_argument("--warm", action="store_true", help="pre-generate openers for popular scenarios")
+    parser.add_argument("--top", type=int, default=50, help="how many scenarios to warm")
+    parser.add_argument("--days", type=int, default=30, help="look at sessions started in this many days")
+    args = parser.parse_args()
+    if args.warm:
+        added = asyncio.run(warm_openers(args.top, args.days))
+        logger.info(f"Generated {added} opener variants")
@@ -0,0 +1,40 @@
+"""Nightly data retention.
+
+Also runnable by hand, e.g. to preview what a policy would delete:
+    python -m app.jobs.retention --dry-run
+"""
+import argparse
+
+from sqlmodel import Session
+
+from . import scheduler
+from ..core.config import settings
+from ..db.database import engine
+from ..models.retention import RetentionReport
+from ..services.retention_service import RetentionService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+def apply_retention(dry_run: bool = False) -> list[RetentionReport]:
+    """Run every configured retention policy"""
+    reports = []
+    with Session(engine) as db:
+        service = RetentionService(db, settings.retention_batch_size, settings.retention_batch_pause_ms)
+        if settings.retention_deactivated_user_days is not None:
+            reports.append(service.purge_deactivated_users(settings.retention_deactivated_user_days, dry_run=dry_run))
+        if settings.retention_message_days is not None:
+            reports.append(service.delete_old_messages(settings.retention_message_days, dry_run=dry_run))
+    for report in reports:
+        logger.info(f"Retention {report.model_dump()}")
+    return reports
+
+@scheduler.cron("apply_retention", "30 3 * * *", jitter_seconds=60, lease_seconds=6 * 3600)
+def nightly_retention():
+    apply_retention()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply data retention policies")
+    parser.add_argument("--dry-run", action="store_true", help="only count the rows each policy would delete")
+    args = parser.parse_args()
+    apply_retention(dry_run=args.dry_run)
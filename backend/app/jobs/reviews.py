@@ -0,0 +1,16 @@
+from sqlmodel import Session
+
+from . import scheduler
+from ..db.database import engine
+from ..services.review_service import ReviewService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+@scheduler.interval("collect_review_items", seconds=300, jitter_seconds=30)
+def collect_review_items():
+    """Turn new corrections into spaced-repetition review items"""
+    with Session(engine) as db:
+        found = ReviewService(db).collect_new_items()
+    if found:
+        logger.info(f"Collected {found} review items")
@@ -0,0 +1,44 @@
+"""Session-summary feedback for sessions that have ended.
+
+Queued summaries are processed in batches every few seconds. A backlog can
+also be drained by hand with:
+    python -m app.jobs.summaries --drain
+"""
+import argparse
+import asyncio
+
+from sqlmodel import Session
+
+from . import scheduler
+from ..db.database import engine
+from ..services.summary_service import SummaryService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+@scheduler.interval("generate_session_summaries", seconds=5, jitter_seconds=1, lease_seconds=300)
+async def generate_session_summaries():
+    """Summarise one batch of ended sessions"""
+    with Session(engine) as db:
+        handled = await SummaryService(db).process_batch()
+    if handled:
+        logger.info(f"Summarised {handled} sessions")
+
+async def drain():
+    from ..core.llm import close_llm_clients
+
+    total = 0
+    try:
+        with Session(engine) as db:
+            while handled := await SummaryService(db).process_batch():
+                total += handled
+    finally:
+        await close_llm_clients()
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Session-summary feedback")
+    parser.add_argument("--drain", action="store_true", help="process every queued summary now")
+    args = parser.parse_args()
+    if args.drain:
+        logger.info(f"Summarised {asyncio.run(drain())} sessions")
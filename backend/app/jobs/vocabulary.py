@@ -0,0 +1,16 @@
+from sqlmodel import Session
+
+from . import scheduler
+from ..db.database import engine
+from ..services.vocabulary_service import VocabularyService
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+@scheduler.interval("index_vocabulary", seconds=60, jitter_seconds=10)
+def index_vocabulary():
+    """Fold newly written user messages into the vocabulary index"""
+    with Session(engine) as db:
+        indexed = VocabularyService(db).index_new_messages()
+    if indexed:
+        logger.info(f"Indexed vocabulary of {indexed} messages")
@@ -2,18 +2,31 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from typing import List
 
 from .core.config import settings
-from .api import auth, users
-from .db.database import engine, create_db_and_tables
+from .core.compression import CompressionMiddleware
+from .api import auth, users, sessions, search, vocabulary, reviews, analytics, feedback, imports
+from .db.database import init_database, dispose_engines
+from .db.routing import ReadYourWritesMiddleware
+from .jobs import scheduler
+from .models.job import JobStatusRead
+from .models.prompt_cache import PromptCacheStats
+from .services import prompt_cache_service
 
-# Create database tables
+# Prepare database
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Create tables on startup using SQLModel
-    create_db_and_tables()
+    # Create tables or verify migrations depending on DB_STARTUP_MODE
+    init_database()
+    if settings.scheduler_enabled:
+        await scheduler.start()
     yield
-    # Cleanup on shutdown (if needed)
+    # Let running jobs finish, then release pooled connections
+    await scheduler.stop()
+    from .core.llm import close_llm_clients  # Imported late, httpx is not needed to start the app
+    await close_llm_clients()
+    await dispose_engines()
 
 # Create FastAPI app
 app = FastAPI(
@@ -30,11 +43,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+# Compress large responses (brotli if installed and accepted, else gzip)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+# Send reads of clients that just wrote to the primary instead of a replica
+if settings.replica_urls:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
+app.include_router(sessions.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(vocabulary.router, prefix="/api")
+app.include_router(reviews.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
+app.include_router(feedback.router, prefix="/api")
+app.include_router(imports.router, prefix="/api")
 
 @app.get("/")
 def read_root():
@@ -48,6 +76,16 @@ def read_root():
 def health_check():
     return {"status": "healthy", "app": settings.app_name}
 
+@app.get("/health/jobs", response_model=List[JobStatusRead])
+def job_status():
+    """Timing and last-run metrics for this worker's scheduled jobs"""
+    return scheduler.get_status()
+
+@app.get("/health/prompt-cache", response_model=PromptCacheStats)
+def prompt_cache_status():
+    """Hit rate of this worker's cache of generated prompts such as session openers"""
+    return prompt_cache_service.get_stats()
+
 # Global exception handler
 @app.exception_handler(500)
 async def internal_server_error_handler(request, exc):
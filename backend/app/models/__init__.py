@@ -1,5 +1,5 @@
 # Database Models
-from .user import User, ProficiencyLevel
+from .user import User, TokenRevocation, ProficiencyLevel
 from .session import ConversationSession, SessionStatus, DifficultyLevel
 from .message import Message, MessageType
 from .feedback import Feedback, FeedbackType
@@ -7,7 +7,7 @@ from .feedback import Feedback, FeedbackType
 # API Models for User
 from .user import (
     UserBase, UserCreate, UserUpdate, UserRead, UserReadWithStats,
-    UserLogin, Token, TokenData
+    UserLogin, Token, TokenData, CurrentUser, PasswordChange
 )
 
 # API Models for Session
@@ -23,22 +23,67 @@ from .message import (
 
 # API Models for Feedback
 from .feedback import (
-    FeedbackBase, FeedbackCreate, FeedbackUpdate, FeedbackRead, FeedbackSummary
+    FeedbackBase, FeedbackCreate, FeedbackUpdate, FeedbackRead, FeedbackSummary, TextEdit, CharEdit
 )
 
 # Language Models
 from .language import Language, LanguageBase, LanguageCreate, LanguageRead, UserLanguage, UserLanguageRead
 
+# Archive Models
+from .archive import ArchivedConversation, CompressionDictionary
+
+# Scheduler Models
+from .job import JobLease, IndexerCheckpoint, JobStatusRead
+
+# Retention Models
+from .retention import RetentionCheckpoint, RetentionReport
+
+# Search Models
+from .search import SearchHit, SearchResults
+
+# Vocabulary Models
+from .vocabulary import VocabularyEntry, VocabularySize, WeeklyNewWords, VocabularyGrowth
+
+# Review Models
+from .review import ReviewItem, ReviewItemRead, ReviewOutcome, ReviewOutcomeResult
+
+# Analytics Models
+from .analytics import (
+    ErrorCounter, DailyErrorCount, ErrorCategoryTrend, ErrorPatternReport,
+    SkillSeries, ProgressSeries, SkillSummary, CohortProgressEntry, CohortProgressReport
+)
+
+# Difficulty Models
+from .difficulty import DifficultyState, DifficultyRecommendation
+
+# Prompt Cache Models
+from .prompt_cache import PromptCacheEntry, PromptCacheStats
+
+# LLM Usage Models
+from .usage import LLMUsage, LLMUsageRead
+
+# Summary Models
+from .summary import SummaryJob, SummaryStatus
+
+# Idempotency Models
+from .idempotency import IdempotencyKey
+
+# Import Models
+from .imports import MessageImport, FeedbackImport, SessionImport, ImportLineError, ImportReport
+
+# Resolve forward references between API models defined in different modules
+ConversationSessionReadWithMessages.model_rebuild()
+
 __all__ = [
     # Database Models
-    "User", "ConversationSession", "Message", "Feedback",
+    "User", "TokenRevocation", "ConversationSession", "Message", "Feedback",
     
     # Enums
     "ProficiencyLevel", "SessionStatus", "DifficultyLevel", "MessageType", "FeedbackType",
     
     # User API Models
     "UserBase", "UserCreate", "UserUpdate", "UserRead", "UserReadWithStats",
-    "UserLogin", "Token", "TokenData",
+    "UserLogin", "Token", "TokenData", "CurrentUser", "PasswordChange",
     
     # Session API Models
     "ConversationSessionBase", "ConversationSessionCreate", "ConversationSessionUpdate",
@@ -48,8 +93,48 @@ __all__ = [
     "MessageBase", "MessageCreate", "MessageUpdate", "MessageRead", "MessageAnalysis",
     
     # Feedback API Models
-    "FeedbackBase", "FeedbackCreate", "FeedbackUpdate", "FeedbackRead", "FeedbackSummary",
+    "FeedbackBase", "FeedbackCreate", "FeedbackUpdate", "FeedbackRead", "FeedbackSummary", "TextEdit", "CharEdit",
     
     # Language Models
-    "Language", "LanguageBase", "LanguageCreate", "LanguageRead", "UserLanguage", "UserLanguageRead"
+    "Language", "LanguageBase", "LanguageCreate", "LanguageRead", "UserLanguage", "UserLanguageRead",
+    
+    # Archive Models
+    "ArchivedConversation", "CompressionDictionary",
+    
+    # Scheduler Models
+    "JobLease", "IndexerCheckpoint", "JobStatusRead",
+    
+    # Retention Models
+    "RetentionCheckpoint", "RetentionReport",
+    
+    # Search Models
+    "SearchHit", "SearchResults",
+    
+    # Vocabulary Models
+    "VocabularyEntry", "VocabularySize", "WeeklyNewWords", "VocabularyGrowth",
+    
+    # Review Models
+    "ReviewItem", "ReviewItemRead", "ReviewOutcome", "ReviewOutcomeResult",
+    
+    # Analytics Models
+    "ErrorCounter", "DailyErrorCount", "ErrorCategoryTrend", "ErrorPatternReport",
+    "SkillSeries", "ProgressSeries", "SkillSummary", "CohortProgressEntry", "CohortProgressReport",
+    
+    # Difficulty Models
+    "DifficultyState", "DifficultyRecommendation",
+    
+    # Prompt Cache Models
+    "PromptCacheEntry", "PromptCacheStats",
+    
+    # LLM Usage Models
+    "LLMUsage", "LLMUsageRead",
+    
+    # Summary Models
+    "SummaryJob", "SummaryStatus",
+    
+    # Idempotency Models
+    "IdempotencyKey",
+    
+    # Import Models
+    "MessageImport", "FeedbackImport", "SessionImport", "ImportLineError", "ImportReport"
 ] 
\ No newline at end of file
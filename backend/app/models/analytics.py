@@ -0,0 +1,64 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional, List, Dict
+from datetime import date, datetime
+
+# Database model
+class ErrorCounter(SQLModel, table=True):
+    """Detected errors of one category for a user, language and day"""
+    __tablename__ = "error_counters"
+    
+    # Key order lets a dashboard window be a range scan over (user_id, day)
+    user_id: int = Field(primary_key=True, foreign_key="users.id")
+    day: date = Field(primary_key=True)
+    language_id: int = Field(primary_key=True, foreign_key="languages.id")
+    error_type: str = Field(primary_key=True, max_length=50)
+    
+    count: int = Field(default=0)
+
+# API Models
+class DailyErrorCount(SQLModel):
+    day: date
+    count: int
+
+class ErrorCategoryTrend(SQLModel):
+    error_type: str
+    total: int
+    previous_total: int  # Same-length window just before this one
+    change: int
+    daily: List[DailyErrorCount]
+
+class ErrorPatternReport(SQLModel):
+    language_id: Optional[int] = None
+    window_start: date
+    window_end: date
+    total_errors: int
+    categories: List[ErrorCategoryTrend]
+
+class SkillSeries(SQLModel):
+    skill: str
+    values: List[Optional[float]]  # Mean score per bucket, None where there was no feedback
+    rolling_mean: List[Optional[float]]
+    smoothed: List[Optional[float]]  # Exponentially smoothed
+    slope_per_day: Optional[float] = None
+    latest: Optional[float] = None
+
+class ProgressSeries(SQLModel):
+    days: int
+    samples: int
+    bucket_starts: List[datetime]
+    skills: List[SkillSeries]
+
+class SkillSummary(SQLModel):
+    mean: Optional[float] = None
+    smoothed: Optional[float] = None
+    slope_per_day: Optional[float] = None
+
+class CohortProgressEntry(SQLModel):
+    user_id: int
+    samples: int
+    skills: Dict[str, SkillSummary]
+
+class CohortProgressReport(SQLModel):
+    days: int
+    generated_at: datetime
+    users: List[CohortProgressEntry]
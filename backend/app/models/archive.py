@@ -0,0 +1,50 @@
+from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, LargeBinary
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+from ..utils import transcript_codec
+
+# Database models
+class CompressionDictionary(SQLModel, table=True):
+    """Preset dictionary trained on sample conversations"""
+    __tablename__ = "compression_dictionaries"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    data: bytes = Field(sa_column=Column(LargeBinary(length=64 * 1024), nullable=False))
+    sample_count: int = Field(default=0)
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+class ArchivedConversation(SQLModel, table=True):
+    """Compressed transcript and messages of a completed session"""
+    __tablename__ = "archived_conversations"
+    
+    session_id: int = Field(primary_key=True, foreign_key="conversation_sessions.id")
+    dictionary_id: Optional[int] = Field(default=None, foreign_key="compression_dictionaries.id")
+    codec: str = Field(max_length=20)
+    payload: bytes = Field(sa_column=Column(LargeBinary(length=2**32 - 1), nullable=False))
+    
+    # Sizes for monitoring the compression ratio
+    raw_size: int
+    compressed_size: int
+    message_count: int = Field(default=0)
+    
+    # Timestamps
+    archived_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    
+    # Relationships
+    session: Optional["ConversationSession"] = Relationship(back_populates="archive")
+    dictionary: Optional[CompressionDictionary] = Relationship()
+    
+    def load(self) -> Dict[str, Any]:
+        """Decompress the archived payload: {"conversation": [...], "messages": [...]}"""
+        data = None
+        if self.dictionary_id is not None:
+            data = transcript_codec.get_cached_dictionary(self.dictionary_id)
+            if data is None:
+                data = transcript_codec.cache_dictionary(self.dictionary_id, self.dictionary.data)
+        return transcript_codec.decompress(self.payload, self.codec, data)
+    
+    def get_conversation(self) -> List[Dict[str, Any]]:
+        """Helper method to get the archived conversation as list of dicts"""
+        return self.load().get("conversation") or []
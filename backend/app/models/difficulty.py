@@ -0,0 +1,51 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, LargeBinary
+from typing import Optional
+from datetime import datetime
+from array import array
+
+from .session import DifficultyLevel
+
+# Database model
+class DifficultyState(SQLModel, table=True):
+    """Rolling performance window and current recommendation for a user in a language"""
+    __tablename__ = "difficulty_states"
+    
+    user_id: int = Field(primary_key=True, foreign_key="users.id")
+    language_id: int = Field(primary_key=True, foreign_key="languages.id")
+    
+    # Most recent values last, packed float32 so a window is a few dozen bytes
+    scores: bytes = Field(default=b"", sa_column=Column(LargeBinary(length=255), nullable=False))
+    complexities: bytes = Field(default=b"", sa_column=Column(LargeBinary(length=255), nullable=False))
+    
+    current_level: DifficultyLevel
+    recommendation: str = Field(default="maintain", max_length=20)  # "increase", "decrease", "maintain"
+    recommended_level: DifficultyLevel
+    
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    
+    def get_scores(self) -> list[float]:
+        """Helper method to unpack the score window"""
+        return array("f", self.scores).tolist()
+    
+    def set_scores(self, values: list[float]):
+        """Helper method to pack the score window"""
+        self.scores = array("f", values).tobytes()
+    
+    def get_complexities(self) -> list[float]:
+        """Helper method to unpack the complexity window"""
+        return array("f", self.complexities).tolist()
+    
+    def set_complexities(self, values: list[float]):
+        """Helper method to pack the complexity window"""
+        self.complexities = array("f", values).tobytes()
+
+# API Models
+class DifficultyRecommendation(SQLModel):
+    language_id: int
+    current_level: DifficultyLevel
+    recommendation: str
+    recommended_level: DifficultyLevel
+    samples: int
+    mean_score: Optional[float] = None
+    mean_complexity: Optional[float] = None
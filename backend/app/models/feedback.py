@@ -11,6 +11,16 @@ class FeedbackType(str, Enum):
     PRONUNCIATION_TIP = "pronunciation_tip"
     FLUENCY_ASSESSMENT = "fluency_assessment"
 
+# Edit spans between original_text and corrected_text, see utils.text_diff
+class CharEdit(SQLModel):
+    op: str  # "insert", "delete" or "replace"
+    a: List[int]  # [start, end) in the original word
+    b: List[int]  # [start, end) in the corrected word
+
+class TextEdit(CharEdit):
+    kind: Optional[str] = None  # "accent" or "case" when that is all that changed
+    chars: Optional[List[CharEdit]] = None
+
 # Base feedback model
 class FeedbackBase(SQLModel):
     feedback_type: FeedbackType
@@ -38,6 +48,9 @@ class Feedback(FeedbackBase, table=True):
     recommended_practice: Optional[str] = Field(default=None)  # JSON array
     difficulty_adjustment: Optional[str] = Field(default=None, max_length=20)  # "increase", "decrease", "maintain"
     
+    # Edit spans from original_text to corrected_text, computed on write
+    text_diff: Optional[str] = Field(default=None)  # JSON array
+    
     # Timestamps
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     
@@ -57,6 +70,19 @@ class Feedback(FeedbackBase, table=True):
             except json.JSONDecodeError:
                 return []
         return []
+    
+    def set_text_diff(self, edits: Optional[List[Dict[str, Any]]]):
+        """Helper method to set the edit spans as JSON string"""
+        self.text_diff = json.dumps(edits, separators=(",", ":")) if edits is not None else None
+    
+    def get_text_diff(self) -> Optional[List[Dict[str, Any]]]:
+        """Helper method to get the edit spans as list"""
+        if self.text_diff:
+            try:
+                return json.loads(self.text_diff)
+            except json.JSONDecodeError:
+                return None
+        return None
 
 # API Models
 class FeedbackCreate(FeedbackBase):
@@ -91,6 +117,7 @@ class FeedbackRead(FeedbackBase):
     overall_score: Optional[float] = None
     recommended_practice: Optional[List[str]] = None
     difficulty_adjustment: Optional[str] = None
+    text_diff: Optional[List[TextEdit]] = None
     created_at: datetime
 
 class FeedbackSummary(SQLModel):
@@ -0,0 +1,23 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import datetime
+
+# Database model
+class IdempotencyKey(SQLModel, table=True):
+    """Stored response of a write request, replayed to retries sent with the same Idempotency-Key"""
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        Index("ix_idempotency_keys_user_id", "user_id"),
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    key_hash: str = Field(primary_key=True, max_length=64)  # sha256 of the user, route and client key
+    user_id: int = Field(foreign_key="users.id")
+    request_hash: str = Field(max_length=64)  # sha256 of the request body, a key cannot be reused for another
+    status_code: Optional[int] = Field(default=None)  # None while the first request is still running
+    response_body: Optional[str] = Field(default=None)
+    
+    # Timestamps
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
@@ -0,0 +1,59 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+from .session import DifficultyLevel, SessionStatus
+from .message import MessageType
+from .feedback import FeedbackBase
+
+# API Models
+# One NDJSON line of a bulk import: a session with its messages and feedback
+class MessageImport(SQLModel):
+    content: str
+    message_type: MessageType
+    created_at: Optional[datetime] = None
+    detected_errors: Optional[List[Dict[str, Any]]] = None
+    corrections: Optional[List[Dict[str, Any]]] = None
+    complexity_score: Optional[int] = Field(default=None, ge=1, le=10)
+
+class FeedbackImport(FeedbackBase):
+    grammar_score: Optional[float] = Field(default=None, ge=0, le=100)
+    vocabulary_score: Optional[float] = Field(default=None, ge=0, le=100)
+    fluency_score: Optional[float] = Field(default=None, ge=0, le=100)
+    overall_score: Optional[float] = Field(default=None, ge=0, le=100)
+    recommended_practice: Optional[List[str]] = None
+    difficulty_adjustment: Optional[str] = Field(default=None, max_length=20)
+    created_at: Optional[datetime] = None
+
+class SessionImport(SQLModel):
+    external_id: Optional[str] = Field(default=None, max_length=100)  # Sessions already imported are skipped
+    user_email: Optional[str] = None  # Command-line imports only, the API imports into the caller's account
+    language: str = Field(max_length=10)  # Target language code, e.g. "es"
+    title: str = Field(max_length=200)
+    topic: str = Field(max_length=100)
+    difficulty_level: DifficultyLevel = DifficultyLevel.MEDIUM
+    conversation_context: Optional[str] = None
+    status: SessionStatus = SessionStatus.COMPLETED
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
+    messages: List[MessageImport] = []
+    feedback: List[FeedbackImport] = []
+
+class ImportLineError(SQLModel):
+    line: int
+    error: str
+
+class ImportReport(SQLModel):
+    name: Optional[str] = None
+    resumed_from_line: int = 0  # Lines up to here were committed by an earlier run and skipped
+    last_line: int = 0  # Last line committed, resume from the next one
+    sessions: int = 0
+    messages: int = 0
+    feedback: int = 0
+    duplicates: int = 0  # Sessions whose external_id was already imported
+    invalid: int = 0
+    errors: List[ImportLineError] = []  # The first invalid lines
+    batches: int = 0
+    duration_seconds: float = 0.0
+    rows_per_second: float = 0.0
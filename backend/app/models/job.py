@@ -0,0 +1,45 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+# Database model
+class JobLease(SQLModel, table=True):
+    """Single-runner lease and last-run record for a scheduled job"""
+    __tablename__ = "job_leases"
+    
+    name: str = Field(primary_key=True, max_length=100)
+    owner: Optional[str] = Field(default=None, max_length=200)
+    
+    # Scheduled slot most recently claimed, so each slot runs once across workers
+    slot: datetime
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    
+    # Last run
+    last_started_at: Optional[datetime] = Field(default=None)
+    last_finished_at: Optional[datetime] = Field(default=None)
+    last_duration_ms: Optional[float] = Field(default=None)
+    last_status: Optional[str] = Field(default=None, max_length=20)  # "success", "failed"
+    last_error: Optional[str] = Field(default=None)
+
+class IndexerCheckpoint(SQLModel, table=True):
+    """Last message id an incremental indexer has processed"""
+    __tablename__ = "indexer_checkpoints"
+    
+    name: str = Field(primary_key=True, max_length=100)
+    last_id: int = Field(default=0)
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+# API Models
+class JobStatusRead(SQLModel):
+    name: str
+    schedule: str
+    runs: int
+    failures: int
+    skipped: int
+    running: bool
+    next_run_at: Optional[datetime] = None
+    last_started_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    average_duration_ms: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
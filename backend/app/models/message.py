@@ -27,6 +27,8 @@ class Message(MessageBase, table=True):
     detected_errors: str | None = Field(default=None)  # JSON string of errors
     corrections: str | None = Field(default=None)      # JSON string of corrections
     complexity_score: int | None = Field(default=None, ge=1, le=10)  # 1-10 rating
+    detected_language: str | None = Field(default=None, max_length=10)  # None when too short to tell
+    in_target_language: bool | None = Field(default=None)
     
     # Timestamps
     created_at: datetime | None = Field(default_factory=datetime.utcnow)
@@ -74,6 +76,8 @@ class MessageRead(MessageBase):
     id: int
     session_id: int
     complexity_score: int | None = None
+    detected_language: str | None = None
+    in_target_language: bool | None = None
     created_at: datetime
     detected_errors: list[dict[str, Any]] | None = None
     corrections: list[dict[str, Any]] | None = None
@@ -0,0 +1,34 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index, UniqueConstraint
+from typing import Optional
+from datetime import datetime
+
+# Database model
+class PromptCacheEntry(SQLModel, table=True):
+    """One generated variant of a deterministic prompt, e.g. a scenario opener"""
+    __tablename__ = "prompt_cache"
+    __table_args__ = (
+        UniqueConstraint("cache_key", "variant", name="uq_prompt_cache_key_variant"),
+        Index("ix_prompt_cache_expires_at", "expires_at"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    cache_key: str = Field(max_length=64)  # sha256 of the prompt class and its normalised parameters
+    variant: int = Field(default=0)  # Slot in the key's pool of variants
+    prompt_class: str = Field(max_length=50)  # e.g. "opener"
+    content: str
+    
+    # Timestamps
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+# API Models
+class PromptCacheStats(SQLModel):
+    """Lookups served by this worker since it started"""
+    memory_hits: int
+    database_hits: int
+    misses: int
+    hit_rate: Optional[float] = None
+    generated: int
+    generation_failures: int
+    memory_entries: int
@@ -0,0 +1,30 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+# Database model
+class RetentionCheckpoint(SQLModel, table=True):
+    """Progress of a retention policy run, so an interrupted run resumes where it stopped"""
+    __tablename__ = "retention_checkpoints"
+    
+    policy: str = Field(primary_key=True, max_length=100)
+    last_id: int = Field(default=0)  # Highest primary key fully processed
+    rows_affected: int = Field(default=0)
+    
+    # Timestamps
+    started_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = Field(default=None)
+
+# API Models
+class RetentionReport(SQLModel):
+    policy: str
+    dry_run: bool
+    resumed_from_id: int = 0
+    users: int = 0
+    sessions: int = 0
+    messages: int = 0
+    feedback: int = 0
+    user_languages: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
@@ -0,0 +1,86 @@
+from sqlmodel import SQLModel, Field
+from pydantic import field_validator
+from sqlalchemy import Index, UniqueConstraint
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+import json
+
+from .feedback import TextEdit
+
+# Database model
+class ReviewItem(SQLModel, table=True):
+    """A correction the learner should revisit, scheduled with SM-2"""
+    __tablename__ = "review_items"
+    __table_args__ = (
+        # Today's due items are a range scan on this index
+        Index("ix_review_items_user_due", "user_id", "due_at"),
+        UniqueConstraint("user_id", "language_id", "fingerprint", name="uq_review_items_fingerprint"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    language_id: int = Field(foreign_key="languages.id")
+    
+    # Where the correction came from: "message" or "feedback"
+    source: str = Field(max_length=20)
+    source_id: int
+    fingerprint: str = Field(max_length=40)  # sha1 of the normalised original and corrected text
+    
+    original_text: str
+    corrected_text: str
+    explanation: Optional[str] = Field(default=None)
+    text_diff: Optional[str] = Field(default=None)  # JSON edit spans, computed when the item is created
+    
+    # SM-2 state
+    ease: float = Field(default=2.5)
+    interval_days: int = Field(default=0)
+    repetitions: int = Field(default=0)
+    lapses: int = Field(default=0)
+    due_at: datetime
+    last_reviewed_at: Optional[datetime] = Field(default=None)
+    
+    # Timestamps
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    
+    def get_text_diff(self) -> Optional[List[Dict[str, Any]]]:
+        """Helper method to get the edit spans as list"""
+        if self.text_diff:
+            try:
+                return json.loads(self.text_diff)
+            except json.JSONDecodeError:
+                return None
+        return None
+
+# API Models
+class ReviewItemRead(SQLModel):
+    id: int
+    language_id: int
+    source: str
+    source_id: int
+    original_text: str
+    corrected_text: str
+    explanation: Optional[str] = None
+    text_diff: Optional[List[TextEdit]] = None
+    ease: float
+    interval_days: int
+    repetitions: int
+    lapses: int
+    due_at: datetime
+    last_reviewed_at: Optional[datetime] = None
+
+class ReviewOutcome(SQLModel):
+    item_id: int
+    quality: int = Field(ge=0, le=5)  # SM-2 grade: below 3 means forgotten
+    reviewed_at: Optional[datetime] = None
+
+    @field_validator("reviewed_at")
+    @classmethod
+    def to_naive_utc(cls, value: Optional[datetime]) -> Optional[datetime]:
+        """Times are stored as naive UTC, convert ones sent with an offset"""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+class ReviewOutcomeResult(SQLModel):
+    recorded: int
+    missing_item_ids: List[int]
@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel
+from typing import Optional, List
+from datetime import datetime
+
+# API Models
+class SearchHit(SQLModel):
+    message_id: int
+    session_id: int
+    session_title: Optional[str] = None
+    language_id: int
+    snippet: str  # HTML-escaped text, with matched terms wrapped in <mark></mark>
+    score: float
+    created_at: Optional[datetime] = None
+
+class SearchResults(SQLModel):
+    query: str
+    results: List[SearchHit]
+    limit: int
+    offset: int
+    has_more: bool
@@ -1,4 +1,6 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, Index, Integer
+from pydantic import computed_field
 from typing import Optional, List, Dict, Any, TYPE_CHECKING
 from datetime import datetime
 from enum import Enum
@@ -6,6 +8,7 @@ import json
 
 if TYPE_CHECKING:
     from .language import Language
+    from .archive import ArchivedConversation
 
 class SessionStatus(str, Enum):
     ACTIVE = "active"
@@ -26,9 +29,17 @@ class ConversationSessionBase(SQLModel):
     target_language_id: int = Field(foreign_key="languages.id")
     conversation_context: Optional[str] = Field(default=None)  # Initial context/scenario
 
+# Bumped by every update of a session row, which only applies if the row still has the version it was read at
+_version_column = Column("version", Integer, nullable=False, server_default="1")
+
 # Database model
 class ConversationSession(ConversationSessionBase, table=True):
     __tablename__ = "conversation_sessions"
+    __table_args__ = (
+        # Sessions imported from other tools, so an import can be rerun without duplicates
+        Index("uq_conversation_sessions_user_external", "user_id", "external_id", unique=True),
+    )
+    __mapper_args__ = {"version_id_col": _version_column}
     
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
@@ -41,6 +52,10 @@ class ConversationSession(ConversationSessionBase, table=True):
     message_count: int = Field(default=0)
     user_message_count: int = Field(default=0)
     
+    # User messages whose language could be detected, and how many were in the target language
+    language_checked_count: int = Field(default=0)
+    target_language_count: int = Field(default=0)
+    
     # Session status
     status: SessionStatus = Field(default=SessionStatus.ACTIVE)
     
@@ -49,12 +64,22 @@ class ConversationSession(ConversationSessionBase, table=True):
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     started_at: Optional[datetime] = Field(default=None)
     ended_at: Optional[datetime] = Field(default=None)
+    archived_at: Optional[datetime] = Field(default=None)  # Transcript and messages moved to archived_conversations
+    
+    # Id of the session in the tool it was imported from, see ImportService
+    external_id: Optional[str] = Field(default=None, max_length=100)
+    
+    # Optimistic concurrency control, see SessionService
+    version: int = Field(default=1, sa_column=_version_column)
     
     # Relationships
     user: Optional["User"] = Relationship(back_populates="sessions")
     messages: List["Message"] = Relationship(back_populates="session")
     feedback_records: List["Feedback"] = Relationship(back_populates="session")
     target_language: Optional["Language"] = Relationship()
+    archive: Optional["ArchivedConversation"] = Relationship(
+        back_populates="session", sa_relationship_kwargs={"uselist": False}
+    )
     
     def set_conversation(self, conversation: List[Dict[str, Any]]):
         """Helper method to set full conversation as JSON string"""
@@ -62,6 +87,8 @@ class ConversationSession(ConversationSessionBase, table=True):
     
     def get_conversation(self) -> List[Dict[str, Any]]:
         """Helper method to get conversation as list of dicts"""
+        if self.archived_at is not None and self.archive is not None:
+            return self.archive.get_conversation()
         if self.full_conversation:
             try:
                 return json.loads(self.full_conversation)
@@ -71,6 +98,10 @@ class ConversationSession(ConversationSessionBase, table=True):
 
 # API Models
 class ConversationSessionCreate(ConversationSessionBase):
+    # Chosen by the difficulty engine when omitted
+    difficulty_level: Optional[DifficultyLevel] = None
+    # Defaults to the user's current language
+    target_language_id: Optional[int] = None
     # For backward compatibility, accept target language code
     target_language_code: Optional[str] = Field(default=None, max_length=10)
 
@@ -81,6 +112,8 @@ class ConversationSessionUpdate(SQLModel):
     conversation_context: Optional[str] = None
     status: Optional[SessionStatus] = None
     ended_at: Optional[datetime] = None
+    # Version of the session the edit was made on, rejected with 409 if it has changed since
+    version: Optional[int] = None
 
 class ConversationSessionRead(ConversationSessionBase):
     id: int
@@ -89,10 +122,22 @@ class ConversationSessionRead(ConversationSessionBase):
     duration_minutes: Optional[float] = None
     message_count: int
     user_message_count: int
+    language_checked_count: int = 0
+    target_language_count: int = 0
     created_at: datetime
     updated_at: datetime
     started_at: Optional[datetime] = None
     ended_at: Optional[datetime] = None
+    archived_at: Optional[datetime] = None
+    version: int = 1
+    
+    @computed_field
+    @property
+    def target_language_ratio(self) -> Optional[float]:
+        """Share of checked user messages written in the target language"""
+        if not self.language_checked_count:
+            return None
+        return round(self.target_language_count / self.language_checked_count, 4)
 
 class ConversationSessionReadWithMessages(ConversationSessionRead):
     messages: List["MessageRead"] = []
@@ -0,0 +1,35 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from typing import Optional
+from datetime import datetime
+
+# Database model
+class SummaryJob(SQLModel, table=True):
+    """Queued session-summary feedback, enqueued when a session ends"""
+    __tablename__ = "summary_jobs"
+    __table_args__ = (
+        # The worker claims the oldest runnable jobs with a range scan on this index
+        Index("ix_summary_jobs_status_available", "status", "available_at"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    session_id: int = Field(foreign_key="conversation_sessions.id", unique=True)
+    user_id: int = Field(foreign_key="users.id")
+    
+    status: str = Field(default="pending", max_length=20)  # "pending", "running", "done", "skipped", "failed"
+    attempts: int = Field(default=0)
+    claim_token: Optional[str] = Field(default=None, max_length=32)  # Set by the run processing the job
+    available_at: datetime = Field(default_factory=datetime.utcnow)  # Not retried before this
+    last_error: Optional[str] = Field(default=None)
+    feedback_id: Optional[int] = Field(default=None, foreign_key="feedback.id")
+    
+    # Timestamps
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
+
+# API Models
+class SummaryStatus(SQLModel):
+    session_id: int
+    status: str
+    feedback_id: Optional[int] = None
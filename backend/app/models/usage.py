@@ -0,0 +1,24 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import date
+
+# Database model
+class LLMUsage(SQLModel, table=True):
+    """LLM tokens spent on behalf of a user in one UTC day"""
+    __tablename__ = "llm_usage"
+    
+    user_id: int = Field(primary_key=True, foreign_key="users.id")
+    day: date = Field(primary_key=True)
+    requests: int = Field(default=0)
+    prompt_tokens: int = Field(default=0)
+    completion_tokens: int = Field(default=0)
+
+# API Models
+class LLMUsageRead(SQLModel):
+    day: date
+    requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    daily_quota: Optional[int] = None  # None when unlimited
+    remaining_tokens: Optional[int] = None
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, Integer, Index
 from datetime import datetime
 from enum import Enum
 from typing import List, Optional, TYPE_CHECKING
@@ -35,6 +36,8 @@ class User(UserBase, table=True):
     # Account status
     is_active: bool = Field(default=True)
     is_verified: bool = Field(default=False)
+    # Access tokens carry the version they were issued with, bumping it revokes them all
+    token_version: int = Field(default=0, sa_column=Column(Integer, nullable=False, server_default="0"))
     
     # Timestamps
     created_at: datetime | None = Field(default_factory=datetime.utcnow)
@@ -56,6 +59,18 @@ class User(UserBase, table=True):
                 return []
         return []
 
+class TokenRevocation(SQLModel, table=True):
+    """A bump of a user's token version, read by every worker to update its cached versions"""
+    __tablename__ = "token_revocations"
+    __table_args__ = (
+        Index("ix_token_revocations_created_at", "created_at"),
+    )
+    
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    token_version: int
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
 # API Models
 class UserCreate(SQLModel):
     # Account details
@@ -115,4 +130,13 @@ class Token(SQLModel):
     token_type: str = "bearer"
 
 class TokenData(SQLModel):
-    email: str | None = None 
\ No newline at end of file
+    email: str | None = None
+
+class CurrentUser(SQLModel):
+    """The authenticated user as identified by their access token, without loading the account"""
+    id: int
+    email: str
+
+class PasswordChange(SQLModel):
+    current_password: str
+    new_password: str = Field(min_length=8) 
\ No newline at end of file
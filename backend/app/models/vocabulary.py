@@ -0,0 +1,37 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, Index, String
+from typing import Optional, List
+from datetime import datetime, date
+
+# Database model
+class VocabularyEntry(SQLModel, table=True):
+    """One word a learner has produced in a language, keyed (user, language, token)"""
+    __tablename__ = "vocabulary_entries"
+    __table_args__ = (
+        Index("ix_vocabulary_entries_first_seen", "user_id", "language_id", "first_seen_at"),
+    )
+    
+    user_id: int = Field(primary_key=True, foreign_key="users.id")
+    language_id: int = Field(primary_key=True, foreign_key="languages.id")
+    # Binary collation on MySQL, whose default one would merge accent variants such as "año" and "ano"
+    token: str = Field(sa_column=Column(
+        String(64).with_variant(String(64, collation="utf8mb4_bin"), "mysql"), primary_key=True
+    ))
+    
+    occurrences: int = Field(default=1)
+    first_seen_at: datetime
+    last_seen_at: datetime
+
+# API Models
+class VocabularySize(SQLModel):
+    language_id: Optional[int] = None
+    distinct_words: int
+    total_words: int
+
+class WeeklyNewWords(SQLModel):
+    week_start: date
+    new_words: int
+
+class VocabularyGrowth(SQLModel):
+    language_id: Optional[int] = None
+    weeks: List[WeeklyNewWords]
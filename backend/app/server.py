@@ -0,0 +1,102 @@
+"""Production server entry point.
+
+Runs the app under gunicorn with uvicorn workers (uvloop + httptools), one worker
+per available CPU core by default. The app is imported once in the master and
+forked into the workers, each of which resets the inherited DB pools. SIGTERM
+stops accepting new connections and drains in-flight requests for up to
+`graceful_timeout` seconds.
+
+Usage:
+    python -m app.server --host 0.0.0.0 --port 8000 --workers 4
+"""
+import argparse
+import os
+
+from .core.config import settings
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # Older uvicorn still ships the worker
+    try:
+        from uvicorn.workers import UvicornWorker
+    except ImportError:
+        UvicornWorker = None
+
+
+def default_workers() -> int:
+    """Number of CPU cores this process may run on"""
+    if settings.web_concurrency:
+        return settings.web_concurrency
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+if UvicornWorker is not None:
+    class ProductionWorker(UvicornWorker):
+        CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools", "lifespan": "on"}
+
+
+def post_fork(server, worker):
+    """Gunicorn hook: never share pooled connections with the master"""
+    from .db.database import reset_engines_after_fork
+    reset_engines_after_fork()
+
+
+def run_gunicorn(host: str, port: int, workers: int, graceful_timeout: int):
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "app.server.ProductionWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", graceful_timeout)
+            self.cfg.set("post_fork", post_fork)
+            self.cfg.set("accesslog", "-")
+
+        def load(self):
+            from .main import app
+            return app
+
+    ProductionServer().run()
+
+
+def run_uvicorn(host: str, port: int, workers: int, graceful_timeout: int):
+    # Fallback without gunicorn: uvicorn spawns workers, so the app is not preloaded
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ConvoPilot API in production")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--graceful-timeout", type=int, default=settings.graceful_timeout)
+    args = parser.parse_args()
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        gunicorn = None
+
+    if gunicorn is not None and UvicornWorker is not None:
+        run_gunicorn(args.host, args.port, args.workers, args.graceful_timeout)
+    else:
+        run_uvicorn(args.host, args.port, args.workers, args.graceful_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+from sqlmodel import Session, select
+from sqlalchemy import delete, func, update
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from collections import Counter, defaultdict
+from datetime import datetime, date, timedelta
+import json
+
+from ..models.message import Message
+from ..models.session import ConversationSession
+from ..models.archive import ArchivedConversation
+from ..models.analytics import ErrorCounter, DailyErrorCount, ErrorCategoryTrend, ErrorPatternReport
+from ..db.upsert import upsert, greatest
+
+
+def error_types(errors: Iterable[Dict[str, Any]]) -> Counter:
+    """Count detected errors by category"""
+    counts = Counter()
+    for error in errors:
+        if not isinstance(error, dict):
+            continue
+        error_type = error.get("type") or error.get("error_type") or error.get("category") or "other"
+        counts[str(error_type).strip().lower()[:50] or "other"] += 1
+    return counts
+
+
+class AnalyticsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_errors(
+        self,
+        user_id: int,
+        language_id: int,
+        day: date,
+        old_errors: List[Dict[str, Any]],
+        new_errors: List[Dict[str, Any]]
+    ):
+        """Apply the change in a message's detected errors to the counters, in the caller's transaction"""
+        delta = error_types(new_errors)
+        delta.subtract(error_types(old_errors))
+        self._increment({(user_id, day, language_id, error_type): count for error_type, count in delta.items() if count > 0})
+        # Removed errors only lower existing counters, never below zero
+        dialect = self.db.get_bind().dialect.name
+        for error_type, count in delta.items():
+            if count < 0:
+                self.db.exec(
+                    update(ErrorCounter)
+                    .where(
+                        ErrorCounter.user_id == user_id, ErrorCounter.day == day,
+                        ErrorCounter.language_id == language_id, ErrorCounter.error_type == error_type
+                    )
+                    .values(count=greatest(dialect, ErrorCounter.count + count, 0))
+                )
+
+    def record_new_errors(self, entries: Iterable[Tuple[int, int, date, List[Dict[str, Any]]]]):
+        """Count the errors of many new messages at once, given as (user_id, language_id, day, errors), in the caller's transaction"""
+        deltas = defaultdict(int)
+        for user_id, language_id, day, errors in entries:
+            for error_type, count in error_types(errors).items():
+                deltas[(user_id, day, language_id, error_type)] += count
+        self._increment(deltas)
+
+    def _increment(self, deltas: Dict[Tuple[int, date, int, str], int]):
+        upsert(
+            self.db, ErrorCounter,
+            [
+                {"user_id": user_id, "day": day, "language_id": language_id, "error_type": error_type, "count": count}
+                for (user_id, day, language_id, error_type), count in deltas.items()
+            ],
+            ["user_id", "day", "language_id", "error_type"],
+            lambda existing, incoming, dialect: {"count": existing.count + incoming.count}
+        )
+
+    def rebuild_error_counters(self, user_id: Optional[int] = None, batch_size: int = 2000) -> int:
+        """Recount from stored and archived messages, e.g. after upgrading. Returns how many messages were read"""
+        statement = delete(ErrorCounter)
+        if user_id is not None:
+            statement = statement.where(ErrorCounter.user_id == user_id)
+        self.db.exec(statement)
+        self.db.commit()
+
+        read, last_id = 0, 0
+        while True:
+            query = (
+                select(
+                    Message.id, Message.detected_errors, Message.created_at,
+                    ConversationSession.user_id, ConversationSession.target_language_id
+                )
+                .join(ConversationSession, ConversationSession.id == Message.session_id)
+                .where(Message.id > last_id, Message.detected_errors != None)  # noqa: E711
+                .order_by(Message.id)
+                .limit(batch_size)
+            )
+            if user_id is not None:
+                query = query.where(ConversationSession.user_id == user_id)
+            rows = self.db.exec(query).all()
+            if not rows:
+                break
+
+            deltas = defaultdict(int)
+            for _, detected_errors, created_at, row_user_id, language_id in rows:
+                self._count_message(deltas, row_user_id, language_id, detected_errors, created_at)
+            self._increment(deltas)
+            self.db.commit()
+            read += len(rows)
+            last_id = rows[-1][0]
+
+        # Messages of archived sessions are only kept in their archive
+        last_id = 0
+        while True:
+            query = (
+                select(ConversationSession.id, ConversationSession.user_id, ConversationSession.target_language_id)
+                .where(ConversationSession.id > last_id, ConversationSession.archived_at != None)  # noqa: E711
+                .order_by(ConversationSession.id)
+                .limit(batch_size)
+            )
+            if user_id is not None:
+                query = query.where(ConversationSession.user_id == user_id)
+            sessions = self.db.exec(query).all()
+            if not sessions:
+                return read
+
+            deltas = defaultdict(int)
+            for session_id, row_user_id, language_id in sessions:
+                archive = self.db.get(ArchivedConversation, session_id)
+                if archive is None:
+                    continue
+                for message in archive.load().get("messages", []):
+                    created_at = message.get("created_at")
+                    self._count_message(
+                        deltas, row_user_id, language_id, message.get("detected_errors"),
+                        datetime.fromisoformat(created_at) if created_at else None
+                    )
+                    read += 1
+                self.db.expunge(archive)
+            self._increment(deltas)
+            self.db.commit()
+            last_id = sessions[-1][0]
+
+    @staticmethod
+    def _count_message(
+        deltas: Dict, user_id: int, language_id: int, detected_errors: Optional[str], created_at: Optional[datetime]
+    ):
+        if not detected_errors:
+            return
+        try:
+            errors = json.loads(detected_errors)
+        except json.JSONDecodeError:
+            return
+        day = (created_at or datetime.utcnow()).date()
+        for error_type, count in error_types(errors if isinstance(errors, list) else []).items():
+            deltas[(user_id, day, language_id, error_type)] += count
+
+    def get_error_patterns(
+        self,
+        user_id: int,
+        days: int = 30,
+        limit: int = 5,
+        language_id: Optional[int] = None
+    ) -> ErrorPatternReport:
+        """Most frequent error categories over the last `days` days with daily counts and the change from the window before"""
+        window_end = datetime.utcnow().date()
+        window_start = window_end - timedelta(days=days - 1)
+        previous_start = window_start - timedelta(days=days)
+
+        statement = select(ErrorCounter.day, ErrorCounter.error_type, func.sum(ErrorCounter.count)).where(
+            ErrorCounter.user_id == user_id, ErrorCounter.day >= previous_start, ErrorCounter.day <= window_end
+        ).group_by(ErrorCounter.day, ErrorCounter.error_type)
+        if language_id is not None:
+            statement = statement.where(ErrorCounter.language_id == language_id)
+
+        current, previous = defaultdict(dict), Counter()
+        for day, error_type, count in self.db.exec(statement).all():
+            if day >= window_start:
+                current[error_type][day] = int(count)
+            else:
+                previous[error_type] += int(count)
+
+        totals = Counter({error_type: sum(daily.values()) for error_type, daily in current.items()})
+        categories = [
+            ErrorCategoryTrend(
+                error_type=error_type,
+                total=total,
+                previous_total=previous[error_type],
+                change=total - previous[error_type],
+                daily=[
+                    DailyErrorCount(day=window_start + timedelta(days=i), count=current[error_type].get(window_start + timedelta(days=i), 0))
+                    for i in range(days)
+                ]
+            )
+            for error_type, total in totals.most_common(limit)
+            if total > 0
+        ]
+
+        return ErrorPatternReport(
+            language_id=language_id,
+            window_start=window_start,
+            window_end=window_end,
+            total_errors=sum(count for count in totals.values() if count > 0),
+            categories=categories
+        )
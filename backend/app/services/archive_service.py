@@ -0,0 +1,143 @@
+from sqlmodel import Session, select
+from sqlalchemy import delete, desc
+from typing import Optional, List
+from datetime import datetime, timedelta
+
+from ..models.session import ConversationSession, SessionStatus
+from ..models.message import Message, MessageType
+from ..models.archive import ArchivedConversation, CompressionDictionary
+from ..utils import transcript_codec
+
+class ArchiveService:
+    """Moves completed sessions into compressed cold storage"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def train_dictionary(self, sample_size: int = 500) -> Optional[CompressionDictionary]:
+        """Build a new compression dictionary from recent completed conversations"""
+        sessions = self.db.exec(
+            select(ConversationSession)
+            .where(ConversationSession.status == SessionStatus.COMPLETED, ConversationSession.archived_at.is_(None))
+            .order_by(desc(ConversationSession.ended_at))
+            .limit(sample_size)
+        ).all()
+        samples = [transcript_codec.encode(self._build_payload(session)) for session in sessions]
+        if not samples:
+            return None
+
+        dictionary = CompressionDictionary(
+            data=transcript_codec.build_dictionary(samples),
+            sample_count=len(samples)
+        )
+        self.db.add(dictionary)
+        self.db.commit()
+        self.db.refresh(dictionary)
+        return dictionary
+
+    def get_current_dictionary(self) -> Optional[CompressionDictionary]:
+        """Get the most recently trained dictionary"""
+        return self.db.exec(
+            select(CompressionDictionary).order_by(desc(CompressionDictionary.id)).limit(1)
+        ).first()
+
+    def archive_session(self, session_id: int, dictionary: Optional[CompressionDictionary] = None) -> Optional[ArchivedConversation]:
+        """Compress a completed session's transcript and messages and drop them from the hot tables"""
+        db_session = self.db.get(ConversationSession, session_id)
+        if not db_session or db_session.status != SessionStatus.COMPLETED or db_session.archived_at is not None:
+            return None
+
+        payload = self._build_payload(db_session)
+        raw_size = len(transcript_codec.encode(payload))
+        dictionary_data = None
+        if dictionary is not None:
+            dictionary_data = transcript_codec.get_cached_dictionary(dictionary.id) or \
+                transcript_codec.cache_dictionary(dictionary.id, dictionary.data)
+        blob, codec = transcript_codec.compress(payload, dictionary_data)
+
+        archive = ArchivedConversation(
+            session_id=db_session.id,
+            dictionary_id=dictionary.id if dictionary is not None else None,
+            codec=codec,
+            payload=blob,
+            raw_size=raw_size,
+            compressed_size=len(blob),
+            message_count=len(payload["messages"])
+        )
+        self.db.add(archive)
+
+        # Hot row keeps only the pointer
+        self.db.exec(delete(Message).where(Message.session_id == db_session.id))
+        db_session.full_conversation = None
+        db_session.archived_at = archive.archived_at
+        self.db.add(db_session)
+        self.db.commit()
+        return archive
+
+    def archive_completed_sessions(self, older_than_days: int, limit: int = 500) -> int:
+        """Archive sessions completed more than `older_than_days` ago, returns how many"""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        session_ids = self.db.exec(
+            select(ConversationSession.id)
+            .where(
+                ConversationSession.status == SessionStatus.COMPLETED,
+                ConversationSession.archived_at.is_(None),
+                ConversationSession.ended_at < cutoff
+            )
+            .order_by(ConversationSession.id)
+            .limit(limit)
+        ).all()
+
+        dictionary = self.get_current_dictionary()
+        archived = 0
+        for session_id in session_ids:
+            if self.archive_session(session_id, dictionary) is not None:
+                archived += 1
+        return archived
+
+    def get_archived_messages(self, session: ConversationSession) -> List[Message]:
+        """Rebuild a session's archived messages as detached Message objects"""
+        if session.archive is None:
+            return []
+        messages = []
+        for data in session.archive.load().get("messages", []):
+            message = Message(
+                id=data["id"],
+                session_id=session.id,
+                content=data["content"],
+                message_type=MessageType(data["message_type"]),
+                word_count=data.get("word_count"),
+                character_count=data.get("character_count"),
+                detected_errors=data.get("detected_errors"),
+                corrections=data.get("corrections"),
+                complexity_score=data.get("complexity_score"),
+                detected_language=data.get("detected_language"),
+                in_target_language=data.get("in_target_language"),
+                created_at=datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+            )
+            messages.append(message)
+        return messages
+
+    def _build_payload(self, session: ConversationSession) -> dict:
+        messages = self.db.exec(
+            select(Message).where(Message.session_id == session.id).order_by(Message.created_at, Message.id)
+        ).all()
+        return {
+            "conversation": session.get_conversation(),
+            "messages": [
+                {
+                    "id": message.id,
+                    "content": message.content,
+                    "message_type": message.message_type.value,
+                    "word_count": message.word_count,
+                    "character_count": message.character_count,
+                    "detected_errors": message.detected_errors,
+                    "corrections": message.corrections,
+                    "complexity_score": message.complexity_score,
+                    "detected_language": message.detected_language,
+                    "in_target_language": message.in_target_language,
+                    "created_at": message.created_at.isoformat() if message.created_at else None
+                }
+                for message in messages
+            ]
+        }
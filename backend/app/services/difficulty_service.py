@@ -0,0 +1,327 @@
+from sqlmodel import Session, select
+from sqlalchemy import and_, event, func
+from sqlalchemy.orm import aliased
+from typing import Optional, List, Dict, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import threading
+import time
+
+from ..core.config import settings
+from ..models.user import ProficiencyLevel
+from ..models.language import UserLanguage
+from ..models.session import ConversationSession, DifficultyLevel
+from ..models.message import Message, MessageType
+from ..models.feedback import Feedback
+from ..models.difficulty import DifficultyState, DifficultyRecommendation
+from ..db.upsert import upsert
+
+LEVELS = [DifficultyLevel.EASY, DifficultyLevel.MEDIUM, DifficultyLevel.HARD]
+PROFICIENCY_LEVELS = {
+    ProficiencyLevel.BEGINNER: DifficultyLevel.EASY,
+    ProficiencyLevel.ELEMENTARY: DifficultyLevel.EASY,
+    ProficiencyLevel.INTERMEDIATE: DifficultyLevel.MEDIUM,
+    ProficiencyLevel.UPPER_INTERMEDIATE: DifficultyLevel.MEDIUM,
+    ProficiencyLevel.ADVANCED: DifficultyLevel.HARD,
+    ProficiencyLevel.PROFICIENT: DifficultyLevel.HARD,
+}
+
+# Recommendations cached per worker so starting a session needs no query. Entries
+# expire, so changes made by other workers show up within CACHE_TTL_SECONDS.
+CACHE_SIZE = 50_000
+CACHE_TTL_SECONDS = 300
+_cache: "OrderedDict[Tuple[int, int], Tuple[float, DifficultyRecommendation]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: Tuple[int, int]) -> Optional[DifficultyRecommendation]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        _cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key: Tuple[int, int], recommendation: DifficultyRecommendation):
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + CACHE_TTL_SECONDS, recommendation)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _cache_drop(key: Tuple[int, int]):
+    with _cache_lock:
+        _cache.pop(key, None)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def _cache_after_commit(db: Session, key: Tuple[int, int], recommendation: DifficultyRecommendation):
+    """Cache a recommendation once the session commits, forget it if it rolls back"""
+    pending = db.info.get("difficulty_pending")
+    if pending is None:
+        pending = db.info["difficulty_pending"] = {}
+
+        @event.listens_for(db, "after_commit")
+        def _committed(session):
+            for pending_key, pending_recommendation in pending.items():
+                _cache_put(pending_key, pending_recommendation)
+            pending.clear()
+
+        @event.listens_for(db, "after_rollback")
+        def _rolled_back(session):
+            pending.clear()
+
+    pending[key] = recommendation
+
+
+def decide(mean_score: Optional[float], mean_complexity: Optional[float], samples: int) -> str:
+    """"increase", "decrease" or "maintain" from a window's averages"""
+    if samples < settings.difficulty_min_samples or mean_score is None:
+        return "maintain"
+    if mean_score >= settings.difficulty_increase_score and (
+        mean_complexity is None or mean_complexity >= settings.difficulty_increase_complexity
+    ):
+        return "increase"
+    if mean_score < settings.difficulty_decrease_score:
+        return "decrease"
+    return "maintain"
+
+
+def step(level: DifficultyLevel, recommendation: str) -> DifficultyLevel:
+    index = LEVELS.index(level) + {"increase": 1, "decrease": -1}.get(recommendation, 0)
+    return LEVELS[min(max(index, 0), len(LEVELS) - 1)]
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return sum(values) / len(values) if values else None
+
+
+class DifficultyService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def recommend(self, user_id: int, language_id: int) -> DifficultyRecommendation:
+        """Difficulty for the user's next session in a language"""
+        key = (user_id, language_id)
+        recommendation = _cache_get(key)
+        if recommendation is not None:
+            return recommendation
+
+        state = self.db.get(DifficultyState, key)
+        if state is None:
+            level = self._initial_level(user_id, language_id)
+            recommendation = DifficultyRecommendation(
+                language_id=language_id, current_level=level, recommendation="maintain", recommended_level=level, samples=0
+            )
+        else:
+            recommendation = self._to_recommendation(state)
+        _cache_put(key, recommendation)
+        return recommendation
+
+    def observe(
+        self,
+        user_id: int,
+        language_id: int,
+        score: Optional[float] = None,
+        complexity: Optional[float] = None
+    ) -> DifficultyState:
+        """Push a new score and/or complexity rating into the window, in the caller's transaction"""
+        state = self._get_or_create_state(user_id, language_id)
+        window = settings.difficulty_window
+        if score is not None:
+            state.set_scores((state.get_scores() + [float(score)])[-window:])
+        if complexity is not None:
+            state.set_complexities((state.get_complexities() + [float(complexity)])[-window:])
+        self._apply(state)
+        return state
+
+    def record_feedback(self, feedback: Feedback, language_id: int) -> Feedback:
+        """Observe a feedback's overall score and set its difficulty_adjustment, in the caller's transaction"""
+        state = self.observe(feedback.user_id, language_id, score=feedback.overall_score)
+        feedback.difficulty_adjustment = state.recommendation
+        return feedback
+
+    def start_session(self, user_id: int, language_id: int, level: DifficultyLevel):
+        """Record the level a new session runs at, in the caller's transaction"""
+        state = self._get_or_create_state(user_id, language_id)
+        if state.current_level != level:
+            # Performance at the old level says nothing about the new one
+            state.current_level = level
+            state.set_scores([])
+            state.set_complexities([])
+        self._apply(state)
+
+    def recompute_all(self, days: int = 90) -> int:
+        """Rebuild every user's window and recommendation from recent data in one vectorised pass"""
+        import numpy as np
+
+        since = datetime.utcnow() - timedelta(days=days)
+        window = settings.difficulty_window
+        # Like start_session, only sessions since the last change of level count
+        runs = self._current_runs()
+        in_run = and_(
+            runs.c.user_id == ConversationSession.user_id,
+            runs.c.target_language_id == ConversationSession.target_language_id,
+            ConversationSession.id > runs.c.run_start
+        )
+        score_rows = self.db.exec(
+            select(Feedback.user_id, ConversationSession.target_language_id, Feedback.overall_score)
+            .join(ConversationSession, ConversationSession.id == Feedback.session_id)
+            .join(runs, in_run)
+            .where(Feedback.created_at >= since, Feedback.overall_score != None)  # noqa: E711
+            .order_by(Feedback.user_id, ConversationSession.target_language_id, Feedback.created_at, Feedback.id)
+        ).all()
+        complexity_rows = self.db.exec(
+            select(ConversationSession.user_id, ConversationSession.target_language_id, Message.complexity_score)
+            .join(ConversationSession, ConversationSession.id == Message.session_id)
+            .join(runs, in_run)
+            .where(
+                Message.created_at >= since,
+                Message.message_type == MessageType.USER,
+                Message.complexity_score != None  # noqa: E711
+            )
+            .order_by(ConversationSession.user_id, ConversationSession.target_language_id, Message.created_at, Message.id)
+        ).all()
+
+        def windows(rows) -> Dict[Tuple[int, int], Tuple[float, int, bytes]]:
+            """(mean, samples, packed window) of the last `window` values of every (user, language) run"""
+            if not rows:
+                return {}
+            users, languages, values = (np.array(column) for column in zip(*rows))
+            values = values.astype(np.float32)
+            starts = np.flatnonzero(np.concatenate(([True], (users[1:] != users[:-1]) | (languages[1:] != languages[:-1]))))
+            ends = np.append(starts[1:], len(values))
+            lower = np.maximum(starts, ends - window)
+            cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+            counts = ends - lower
+            means = (cumulative[ends] - cumulative[lower]) / counts
+            return {
+                (int(users[start]), int(languages[start])): (float(means[i]), int(counts[i]), values[lower[i]:ends[i]].tobytes())
+                for i, start in enumerate(starts)
+            }
+
+        scores, complexities = windows(score_rows), windows(complexity_rows)
+        keys = scores.keys() | complexities.keys()
+        if not keys:
+            return 0
+
+        # Every key comes from a session, so each has a latest session level
+        levels = {
+            (user_id, language_id): level
+            for user_id, language_id, level in self.db.exec(
+                select(runs.c.user_id, runs.c.target_language_id, runs.c.difficulty_level)
+            ).all()
+        }
+
+        rows = []
+        now = datetime.utcnow()
+        for key in keys:
+            mean_score, score_samples, packed_scores = scores.get(key, (None, 0, b""))
+            mean_complexity, _, packed_complexities = complexities.get(key, (None, 0, b""))
+            current_level = levels.get(key, DifficultyLevel.MEDIUM)
+            recommendation = decide(mean_score, mean_complexity, score_samples)
+            rows.append({
+                "user_id": key[0], "language_id": key[1],
+                "scores": packed_scores, "complexities": packed_complexities,
+                "current_level": current_level, "recommendation": recommendation,
+                "recommended_level": step(current_level, recommendation), "updated_at": now
+            })
+
+        upsert(
+            self.db, DifficultyState, rows, ["user_id", "language_id"],
+            lambda existing, incoming, dialect: {
+                column: getattr(incoming, column)
+                for column in ("scores", "complexities", "current_level", "recommendation", "recommended_level", "updated_at")
+            }
+        )
+        self.db.commit()
+        clear_cache()
+        return len(rows)
+
+    @staticmethod
+    def _current_runs():
+        """Per user and language, the latest session's level and the id of the last session at another level, else 0"""
+        latest = (
+            select(func.max(ConversationSession.id))
+            .group_by(ConversationSession.user_id, ConversationSession.target_language_id)
+        )
+        current = (
+            select(ConversationSession.user_id, ConversationSession.target_language_id, ConversationSession.difficulty_level)
+            .where(ConversationSession.id.in_(latest))
+            .subquery()
+        )
+        earlier = aliased(ConversationSession)
+        return (
+            select(
+                current.c.user_id, current.c.target_language_id, current.c.difficulty_level,
+                func.coalesce(func.max(earlier.id), 0).label("run_start")
+            )
+            .join(
+                earlier,
+                and_(
+                    earlier.user_id == current.c.user_id,
+                    earlier.target_language_id == current.c.target_language_id,
+                    earlier.difficulty_level != current.c.difficulty_level
+                ),
+                isouter=True
+            )
+            .group_by(current.c.user_id, current.c.target_language_id, current.c.difficulty_level)
+            .subquery()
+        )
+
+    def _get_or_create_state(self, user_id: int, language_id: int) -> DifficultyState:
+        state = self.db.get(DifficultyState, (user_id, language_id))
+        if state is None:
+            level = self._initial_level(user_id, language_id)
+            state = DifficultyState(
+                user_id=user_id, language_id=language_id,
+                current_level=level, recommended_level=level, recommendation="maintain"
+            )
+        return state
+
+    def _apply(self, state: DifficultyState):
+        scores, complexities = state.get_scores(), state.get_complexities()
+        state.recommendation = decide(_mean(scores), _mean(complexities), len(scores))
+        state.recommended_level = step(state.current_level, state.recommendation)
+        state.updated_at = datetime.utcnow()
+        self.db.add(state)
+        # Other requests of this worker must not see it before it is committed
+        key = (state.user_id, state.language_id)
+        _cache_drop(key)
+        _cache_after_commit(self.db, key, self._to_recommendation(state))
+
+    def _initial_level(self, user_id: int, language_id: int) -> DifficultyLevel:
+        """Level of the latest session in the language, else one matching the stated proficiency"""
+        level = self.db.exec(
+            select(ConversationSession.difficulty_level)
+            .where(ConversationSession.user_id == user_id, ConversationSession.target_language_id == language_id)
+            .order_by(ConversationSession.id.desc())
+            .limit(1)
+        ).first()
+        if level is not None:
+            return level
+        proficiency = self.db.exec(
+            select(UserLanguage.proficiency_level)
+            .where(UserLanguage.user_id == user_id, UserLanguage.language_id == language_id)
+        ).first()
+        return PROFICIENCY_LEVELS.get(proficiency, DifficultyLevel.MEDIUM)
+
+    @staticmethod
+    def _to_recommendation(state: DifficultyState) -> DifficultyRecommendation:
+        scores, complexities = state.get_scores(), state.get_complexities()
+        mean_score, mean_complexity = _mean(scores), _mean(complexities)
+        return DifficultyRecommendation(
+            language_id=state.language_id,
+            current_level=state.current_level,
+            recommendation=state.recommendation,
+            recommended_level=state.recommended_level,
+            samples=len(scores),
+            mean_score=round(mean_score, 2) if mean_score is not None else None,
+            mean_complexity=round(mean_complexity, 2) if mean_complexity is not None else None
+        )
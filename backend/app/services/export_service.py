@@ -0,0 +1,294 @@
+from sqlmodel import Session, select
+from typing import Optional, List, Dict, Any, Iterator, Iterable, Tuple
+from collections import defaultdict
+from datetime import datetime
+from enum import Enum
+import csv
+import io
+import json
+import zipfile
+
+from ..db.database import engine
+from ..models.user import User
+from ..models.language import Language, UserLanguage
+from ..models.session import ConversationSession
+from ..models.message import Message
+from ..models.feedback import Feedback
+from ..models.archive import ArchivedConversation
+
+# Sessions read per query, and rows per server-side cursor fetch when streaming messages and feedback
+SESSION_CHUNK = 200
+YIELD_PER = 1000
+
+SESSION_COLUMNS = [
+    "id", "external_id", "language", "title", "topic", "difficulty_level", "conversation_context", "status",
+    "created_at", "started_at", "ended_at", "duration_minutes", "message_count", "user_message_count", "archived_at",
+]
+MESSAGE_COLUMNS = [
+    "id", "session_id", "message_type", "content", "created_at", "word_count", "character_count",
+    "complexity_score", "detected_language", "in_target_language", "detected_errors", "corrections",
+]
+FEEDBACK_COLUMNS = [
+    "id", "session_id", "feedback_type", "title", "content", "original_text", "corrected_text", "explanation",
+    "grammar_score", "vocabulary_score", "fluency_score", "overall_score", "recommended_practice",
+    "difficulty_adjustment", "text_diff", "created_at",
+]
+PROFILE_COLUMNS = [
+    "id", "email", "username", "first_name", "last_name", "native_language", "learning_goals",
+    "preferred_topics", "languages", "created_at", "last_login",
+]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, default=_encode, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _parse(raw: Optional[str]) -> Any:
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return None
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, Enum)):
+        return _encode(value)
+    return value
+
+
+class _Sink:
+    """Write end of a zip built on the fly, drained into the response after every chunk"""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def stream_export(user_id: int, export_format: str) -> Iterator[bytes]:
+    """Body of an export response, with its own database session as it is read after the request's has closed"""
+    with Session(engine) as db:
+        export_service = ExportService(db)
+        yield from export_service.csv_zip(user_id) if export_format == "zip" else export_service.ndjson(user_id)
+
+
+class ExportService:
+    """A user's full data as a stream, in memory bounded by one chunk of rows and the largest session.
+
+    Sessions are read in keyset-paginated chunks and messages and feedback through
+    server-side cursors (yield_per), one cursor open at a time. Rows are read as plain
+    columns rather than ORM objects so nothing accumulates in the session.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def ndjson(self, user_id: int) -> Iterator[bytes]:
+        """Profile line, then one line per session with its messages and feedback, in the format imports accept"""
+        yield _line({"type": "profile", **self.profile(user_id)})
+        for sessions in self._session_chunks(user_id):
+            feedback = defaultdict(list)
+            for row in self._feedback(user_id, [session["id"] for session in sessions]):
+                feedback[row["session_id"]].append(row)
+
+            hot = [session for session in sessions if session["archived_at"] is None]
+            groups = self._grouped_messages([session["id"] for session in hot])
+            group = next(groups, None)
+            for session in hot:
+                messages = []
+                if group is not None and group[0] == session["id"]:
+                    messages = group[1]
+                    group = next(groups, None)
+                conversation = _parse(session.pop("full_conversation"))
+                yield _line({
+                    "type": "session", **session, "conversation": conversation,
+                    "messages": messages, "feedback": feedback.pop(session["id"], [])
+                })
+            # Read once the message cursor is exhausted, a connection streams one result at a time
+            for session in sessions:
+                if session["archived_at"] is not None:
+                    session.pop("full_conversation")
+                    payload = self._archive_payload(session["id"])
+                    yield _line({
+                        "type": "session", **session,
+                        "conversation": payload.get("conversation"),
+                        "messages": [self._message(message, session["id"]) for message in payload.get("messages", [])],
+                        "feedback": feedback.pop(session["id"], [])
+                    })
+        for row in self._feedback(user_id, None):
+            yield _line({"type": "feedback", **row})
+
+    def csv_zip(self, user_id: int) -> Iterator[bytes]:
+        """A zip of profile.csv, sessions.csv, messages.csv and feedback.csv, built while it is sent"""
+        sink = _Sink()
+        files: List[Tuple[str, List[str], Iterable[Dict[str, Any]]]] = [
+            ("profile.csv", PROFILE_COLUMNS, [self.profile(user_id)]),
+            ("sessions.csv", SESSION_COLUMNS, (
+                session for sessions in self._session_chunks(user_id, with_conversation=False) for session in sessions
+            )),
+            ("messages.csv", MESSAGE_COLUMNS, self._all_messages(user_id)),
+            ("feedback.csv", FEEDBACK_COLUMNS, self._feedback(user_id, None, all_sessions=True)),
+        ]
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, columns, rows in files:
+                with archive.open(name, "w", force_zip64=True) as entry:
+                    text = io.TextIOWrapper(entry, encoding="utf-8", newline="")
+                    writer = csv.DictWriter(text, fieldnames=columns, extrasaction="ignore")
+                    writer.writeheader()
+                    for count, row in enumerate(rows, 1):
+                        writer.writerow({column: _csv_value(row.get(column)) for column in columns})
+                        if count % YIELD_PER == 0:
+                            text.flush()
+                            yield sink.drain()
+                    text.flush()
+                    text.detach()
+                yield sink.drain()
+        yield sink.drain()
+
+    def profile(self, user_id: int) -> Dict[str, Any]:
+        user = self.db.exec(
+            select(User, Language.code).join(Language, Language.id == User.native_language_id, isouter=True)
+            .where(User.id == user_id)
+        ).one()
+        languages = self.db.exec(
+            select(
+                Language.code, UserLanguage.proficiency_level, UserLanguage.is_current,
+                UserLanguage.started_learning_at, UserLanguage.last_practiced_at
+            )
+            .join(Language, Language.id == UserLanguage.language_id)
+            .where(UserLanguage.user_id == user_id)
+        ).all()
+        account, native_code = user
+        return {
+            **account.model_dump(include={
+                "id", "email", "username", "first_name", "last_name", "learning_goals", "created_at", "last_login"
+            }),
+            "native_language": native_code,
+            "preferred_topics": account.get_preferred_topics(),
+            "languages": [
+                {
+                    "language": code, "proficiency_level": level.value, "is_current": is_current,
+                    "started_learning_at": _encode(started) if started else None,
+                    "last_practiced_at": _encode(practiced) if practiced else None,
+                }
+                for code, level, is_current, started, practiced in languages
+            ],
+        }
+
+    def _session_chunks(self, user_id: int, with_conversation: bool = True) -> Iterator[List[Dict[str, Any]]]:
+        columns = [
+            ConversationSession.id, ConversationSession.external_id, Language.code.label("language"),
+            ConversationSession.title, ConversationSession.topic, ConversationSession.difficulty_level,
+            ConversationSession.conversation_context, ConversationSession.status, ConversationSession.created_at,
+            ConversationSession.started_at, ConversationSession.ended_at, ConversationSession.duration_minutes,
+            ConversationSession.message_count, ConversationSession.user_message_count, ConversationSession.archived_at,
+        ]
+        if with_conversation:
+            columns.append(ConversationSession.full_conversation)
+        last_id = 0
+        while True:
+            rows = self.db.exec(
+                select(*columns)
+                .join(Language, Language.id == ConversationSession.target_language_id, isouter=True)
+                .where(ConversationSession.user_id == user_id, ConversationSession.id > last_id)
+                .order_by(ConversationSession.id)
+                .limit(SESSION_CHUNK)
+            ).all()
+            if not rows:
+                return
+            yield [dict(row._mapping) for row in rows]
+            last_id = rows[-1].id
+
+    def _message_query(self):
+        return select(
+            Message.id, Message.session_id, Message.message_type, Message.content, Message.created_at,
+            Message.word_count, Message.character_count, Message.complexity_score, Message.detected_language,
+            Message.in_target_language, Message.detected_errors, Message.corrections
+        ).execution_options(yield_per=YIELD_PER)
+
+    @staticmethod
+    def _message(row: Dict[str, Any], session_id: int) -> Dict[str, Any]:
+        return {
+            **row,
+            "session_id": session_id,
+            "detected_errors": _parse(row.get("detected_errors")),
+            "corrections": _parse(row.get("corrections")),
+        }
+
+    def _grouped_messages(self, session_ids: List[int]) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """(session id, messages) for each of the sessions that has messages, in session id order"""
+        if not session_ids:
+            return
+        current, messages = None, []
+        for row in self.db.exec(
+            self._message_query()
+            .where(Message.session_id.in_(session_ids))
+            .order_by(Message.session_id, Message.id)
+        ):
+            if row.session_id != current:
+                if messages:
+                    yield current, messages
+                current, messages = row.session_id, []
+            messages.append(self._message(dict(row._mapping), row.session_id))
+        if messages:
+            yield current, messages
+
+    def _all_messages(self, user_id: int) -> Iterator[Dict[str, Any]]:
+        """Every message of the user's sessions, archived ones after the others"""
+        session_ids = select(ConversationSession.id).where(ConversationSession.user_id == user_id)
+        for row in self.db.exec(
+            self._message_query().where(Message.session_id.in_(session_ids)).order_by(Message.session_id, Message.id)
+        ):
+            yield self._message(dict(row._mapping), row.session_id)
+        archived = self.db.exec(
+            select(ConversationSession.id)
+            .where(ConversationSession.user_id == user_id, ConversationSession.archived_at != None)  # noqa: E711
+            .order_by(ConversationSession.id)
+        ).all()
+        for session_id in archived:
+            for message in self._archive_payload(session_id).get("messages", []):
+                yield self._message(message, session_id)
+
+    def _archive_payload(self, session_id: int) -> Dict[str, Any]:
+        archive = self.db.exec(select(ArchivedConversation).where(ArchivedConversation.session_id == session_id)).first()
+        if archive is None:
+            return {}
+        payload = archive.load()
+        self.db.expunge(archive)
+        return payload
+
+    def _feedback(self, user_id: int, session_ids: Optional[List[int]], all_sessions: bool = False) -> Iterator[Dict[str, Any]]:
+        """The user's feedback on the given sessions, on no session when None, or all of it"""
+        query = select(*(getattr(Feedback, column) for column in FEEDBACK_COLUMNS)).where(Feedback.user_id == user_id)
+        if not all_sessions:
+            query = query.where(
+                Feedback.session_id.in_(session_ids) if session_ids is not None else Feedback.session_id == None  # noqa: E711
+            )
+        for row in self.db.exec(query.order_by(Feedback.id).execution_options(yield_per=YIELD_PER)):
+            yield {
+                **row._mapping,
+                "recommended_practice": _parse(row.recommended_practice),
+                "text_diff": _parse(row.text_diff),
+            }
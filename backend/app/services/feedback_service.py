@@ -0,0 +1,61 @@
+from sqlmodel import Session, select
+from sqlalchemy import update
+from typing import Optional, List
+import json
+
+from ..models.feedback import Feedback, FeedbackRead
+from ..models.review import ReviewItem
+from ..utils.text_diff import diff
+
+
+def feedback_to_read(feedback: Feedback) -> FeedbackRead:
+    """Convert a Feedback row, parsing its JSON columns"""
+    return FeedbackRead(
+        **feedback.model_dump(exclude={"recommended_practice", "text_diff"}),
+        recommended_practice=feedback.get_recommended_practice() or None,
+        text_diff=feedback.get_text_diff()
+    )
+
+
+class FeedbackService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_corrections(self, user_id: int, session_id: Optional[int] = None, limit: int = 50, offset: int = 0) -> List[FeedbackRead]:
+        """A user's feedback that corrects some text, newest first, with the stored edit spans"""
+        statement = (
+            select(Feedback)
+            .where(Feedback.user_id == user_id, Feedback.original_text != None, Feedback.corrected_text != None)  # noqa: E711
+            .order_by(Feedback.id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        if session_id is not None:
+            statement = statement.where(Feedback.session_id == session_id)
+        return [feedback_to_read(feedback) for feedback in self.db.exec(statement).all()]
+
+    def backfill_text_diffs(self, batch_size: int = 1000) -> int:
+        """Diff feedback and review items stored before spans were computed on write, returns how many were filled"""
+        filled = 0
+        for model in (Feedback, ReviewItem):
+            last_id = 0
+            while True:
+                rows = self.db.exec(
+                    select(model.id, model.original_text, model.corrected_text)
+                    .where(
+                        model.id > last_id, model.text_diff == None,  # noqa: E711
+                        model.original_text != None, model.corrected_text != None  # noqa: E711
+                    )
+                    .order_by(model.id)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                self.db.exec(update(model), params=[
+                    {"id": row_id, "text_diff": json.dumps(diff(original, corrected), separators=(",", ":"))}
+                    for row_id, original, corrected in rows
+                ])
+                self.db.commit()
+                filled += len(rows)
+                last_id = rows[-1][0]
+        return filled
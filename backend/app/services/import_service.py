@@ -0,0 +1,321 @@
+from sqlmodel import Session, select
+from sqlalchemy import insert
+from pydantic import ValidationError
+from typing import Optional, List, Dict, Tuple, AsyncIterable, AsyncIterator
+from collections import defaultdict
+from datetime import datetime
+import asyncio
+import json
+import time
+import uuid
+
+from ..core.config import settings
+from ..models.user import User
+from ..models.language import Language
+from ..models.session import ConversationSession
+from ..models.message import Message, MessageType
+from ..models.feedback import Feedback
+from ..models.job import IndexerCheckpoint
+from ..models.imports import SessionImport, ImportLineError, ImportReport
+from ..utils import text_metrics
+from ..utils.text_diff import diff
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+MAX_REPORTED_ERRORS = 100
+LOG_EVERY_BATCHES = 20
+
+
+class LineTooLongError(ValueError):
+    """A line of an import is longer than import_max_line_bytes"""
+
+
+async def ndjson_lines(chunks: AsyncIterable[bytes], max_line_bytes: Optional[int] = None) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without reading it all into memory, buffering at most one line"""
+    max_line_bytes = max_line_bytes or settings.import_max_line_bytes
+    buffer = b""
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b"\n")
+        buffer = lines.pop()
+        for line in lines:
+            line_number += 1
+            if len(line) > max_line_bytes:
+                raise LineTooLongError(f"Line {line_number} is longer than {max_line_bytes} bytes")
+            yield line
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(f"Line {line_number + 1} is longer than {max_line_bytes} bytes")
+    if buffer:
+        yield buffer
+
+
+def _json(value) -> Optional[str]:
+    return json.dumps(value) if value else None
+
+
+class ImportService:
+    """Bulk import of historical sessions, one NDJSON line per session with its messages and feedback.
+
+    Lines are validated and inserted a batch at a time with multi-row inserts, each batch
+    in one transaction together with the import's checkpoint, so a named import that fails
+    resumes after its last committed batch. Sessions are also deduplicated on external_id,
+    which defaults to "<import name>:<line>".
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._languages: Optional[Dict[str, Tuple[int, str]]] = None
+        self._users: Dict[str, Optional[int]] = {}
+
+    async def import_ndjson(
+        self,
+        lines: AsyncIterable[bytes],
+        name: Optional[str] = None,
+        user_id: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ) -> ImportReport:
+        """Import sessions into `user_id`'s account, or their user_email's when None"""
+        batch_size = batch_size or settings.import_batch_size
+        report = ImportReport(name=name)
+        checkpoint = None
+        if name:
+            checkpoint_name = f"import:{name}"
+            checkpoint = await asyncio.to_thread(self.db.get, IndexerCheckpoint, checkpoint_name)
+            checkpoint = checkpoint or IndexerCheckpoint(name=checkpoint_name)
+            report.resumed_from_line = report.last_line = checkpoint.last_id
+        tag = name or uuid.uuid4().hex[:12]
+        started = time.perf_counter()
+
+        batch: List[Tuple[int, bytes]] = []
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if line_number <= report.resumed_from_line or not line.strip():
+                continue
+            batch.append((line_number, line))
+            if len(batch) >= batch_size:
+                # Inserts and commits block, keep them off the event loop that is reading the stream
+                await asyncio.to_thread(self._import_batch, batch, tag, user_id, report, checkpoint)
+                self._progress(report, started)
+                batch = []
+        if batch:
+            await asyncio.to_thread(self._import_batch, batch, tag, user_id, report, checkpoint)
+
+        self._progress(report, started)
+        logger.info(
+            f"Imported {report.sessions} sessions, {report.messages} messages and {report.feedback} feedback "
+            f"in {report.duration_seconds:.1f}s ({report.rows_per_second:.0f} rows/s), "
+            f"{report.duplicates} duplicates and {report.invalid} invalid lines skipped"
+        )
+        return report
+
+    def _import_batch(
+        self,
+        batch: List[Tuple[int, bytes]],
+        tag: str,
+        user_id: Optional[int],
+        report: ImportReport,
+        checkpoint: Optional[IndexerCheckpoint]
+    ):
+        parsed: List[Tuple[int, SessionImport]] = []
+        for line_number, line in batch:
+            try:
+                parsed.append((line_number, SessionImport.model_validate_json(line)))
+            except ValidationError as e:
+                self._invalid(report, line_number, str(e.errors(include_url=False, include_input=False)))
+        if user_id is None:
+            self._load_users({row.user_email.lower() for _, row in parsed if row.user_email})
+
+        # (line, row, owner, language id, language code)
+        valid = []
+        for line_number, row in parsed:
+            owner = user_id if user_id is not None else self._users.get((row.user_email or "").lower())
+            language = self._language(row.language)
+            if owner is None:
+                self._invalid(report, line_number, "Unknown user_email")
+            elif language is None:
+                self._invalid(report, line_number, f"Unknown language {row.language!r}")
+            else:
+                row.external_id = row.external_id or f"{tag}:{line_number}"
+                valid.append((line_number, row, owner, *language))
+
+        new = self._skip_duplicates(valid, report)
+        if new:
+            session_ids = self._insert_sessions(new)
+            report.messages += self._insert_messages(new, session_ids)
+            report.feedback += self._insert_feedback(new, session_ids)
+            report.sessions += len(new)
+
+        report.last_line = batch[-1][0]
+        report.batches += 1
+        if checkpoint is not None:
+            checkpoint.last_id = report.last_line
+            checkpoint.updated_at = datetime.utcnow()
+            self.db.add(checkpoint)
+        self.db.commit()
+
+    def _skip_duplicates(self, valid: list, report: ImportReport) -> list:
+        if not valid:
+            return []
+        existing = set(self.db.exec(
+            select(ConversationSession.user_id, ConversationSession.external_id)
+            .where(
+                ConversationSession.user_id.in_({item[2] for item in valid}),
+                ConversationSession.external_id.in_({item[1].external_id for item in valid})
+            )
+        ).all())
+        new = []
+        for item in valid:
+            key = (item[2], item[1].external_id)
+            if key in existing:
+                report.duplicates += 1
+                continue
+            existing.add(key)
+            new.append(item)
+        return new
+
+    def _insert_sessions(self, new: list) -> Dict[Tuple[int, str], int]:
+        """Insert the batch's sessions, returns their ids by (user id, external id)"""
+        now = datetime.utcnow()
+        rows = []
+        for _, row, owner, language_id, _ in new:
+            started_at = row.started_at or row.created_at
+            duration = (row.ended_at - started_at).total_seconds() / 60 if started_at and row.ended_at else None
+            rows.append({
+                "user_id": owner,
+                "external_id": row.external_id,
+                "title": row.title,
+                "topic": row.topic,
+                "difficulty_level": row.difficulty_level,
+                "target_language_id": language_id,
+                "conversation_context": row.conversation_context,
+                "full_conversation": None,
+                "duration_minutes": duration,
+                "message_count": len(row.messages),
+                "user_message_count": sum(message.message_type == MessageType.USER for message in row.messages),
+                "language_checked_count": 0,
+                "target_language_count": 0,
+                "status": row.status,
+                "created_at": row.created_at or started_at or now,
+                "updated_at": now,
+                "started_at": started_at,
+                "ended_at": row.ended_at,
+                "archived_at": None,
+                "version": 1,
+            })
+        self.db.exec(insert(ConversationSession.__table__), params=rows)
+
+        # Multi-row inserts do not return ids on every database, read them back by external id
+        return {
+            (owner, external_id): session_id
+            for session_id, owner, external_id in self.db.exec(
+                select(ConversationSession.id, ConversationSession.user_id, ConversationSession.external_id)
+                .where(
+                    ConversationSession.user_id.in_({item[2] for item in new}),
+                    ConversationSession.external_id.in_({item[1].external_id for item in new})
+                )
+            ).all()
+        }
+
+    def _insert_messages(self, new: list, session_ids: Dict[Tuple[int, str], int]) -> int:
+        from .analytics_service import AnalyticsService
+        from .review_service import annotate_corrections
+        from .search_service import SearchService
+
+        rows, texts, errors = [], defaultdict(list), []
+        for _, row, owner, language_id, language_code in new:
+            session_id = session_ids[(owner, row.external_id)]
+            fallback_time = row.started_at or row.created_at or datetime.utcnow()
+            for message in row.messages:
+                created_at = message.created_at or fallback_time
+                is_user = message.message_type == MessageType.USER
+                texts[language_code].append((len(rows), message.content, is_user))
+                rows.append({
+                    "session_id": session_id,
+                    "content": message.content,
+                    "message_type": message.message_type,
+                    "word_count": None,
+                    "character_count": None,
+                    "detected_errors": _json(message.detected_errors),
+                    "corrections": _json(annotate_corrections(message.corrections or [])),
+                    "complexity_score": message.complexity_score if is_user else None,
+                    "detected_language": None,
+                    "in_target_language": None,
+                    "created_at": created_at,
+                })
+                if message.detected_errors:
+                    errors.append((owner, language_id, created_at.date(), message.detected_errors))
+        if not rows:
+            return 0
+
+        # Metrics computed a language at a time, as the backfill does
+        for language_code, items in texts.items():
+            for (index, _, is_user), metrics in zip(items, text_metrics.compute_many((text for _, text, _ in items), language_code)):
+                rows[index]["word_count"] = metrics.word_count
+                rows[index]["character_count"] = metrics.character_count
+                if is_user and rows[index]["complexity_score"] is None:
+                    rows[index]["complexity_score"] = metrics.complexity_score
+        self.db.exec(insert(Message.__table__), params=rows)
+
+        AnalyticsService(self.db).record_new_errors(errors)
+        # Vocabulary and review items are picked up by their incremental jobs, only search is indexed on write
+        SearchService(self.db).index_messages(self.db.exec(
+            select(Message.id, Message.session_id, Message.created_at, Message.content)
+            .where(Message.session_id.in_(session_ids.values()), Message.message_type != MessageType.SYSTEM)
+        ).all(), new=True)
+        return len(rows)
+
+    def _insert_feedback(self, new: list, session_ids: Dict[Tuple[int, str], int]) -> int:
+        rows = []
+        for _, row, owner, _, _ in new:
+            session_id = session_ids[(owner, row.external_id)]
+            for feedback in row.feedback:
+                edits = None
+                if feedback.original_text is not None and feedback.corrected_text is not None:
+                    edits = json.dumps(diff(feedback.original_text, feedback.corrected_text), separators=(",", ":"))
+                rows.append({
+                    **feedback.model_dump(exclude={"recommended_practice", "created_at"}),
+                    "user_id": owner,
+                    "session_id": session_id,
+                    "recommended_practice": _json(feedback.recommended_practice),
+                    "text_diff": edits,
+                    "created_at": feedback.created_at or row.ended_at or row.started_at or datetime.utcnow(),
+                })
+        if rows:
+            self.db.exec(insert(Feedback.__table__), params=rows)
+        return len(rows)
+
+    def _language(self, code: str) -> Optional[Tuple[int, str]]:
+        """(id, code) of a language code, falling back to its base language, e.g. es-MX to es"""
+        if self._languages is None:
+            self._languages = {
+                language_code.lower(): (language_id, language_code)
+                for language_id, language_code in self.db.exec(select(Language.id, Language.code)).all()
+            }
+        code = code.strip().lower().replace("_", "-")
+        return self._languages.get(code) or self._languages.get(code.split("-")[0])
+
+    def _load_users(self, emails: set):
+        """Add the ids of emails not looked up yet to the cache, unknown emails as None"""
+        missing = emails - self._users.keys()
+        if not missing:
+            return
+        self._users.update(dict.fromkeys(missing))
+        for user_id, email in self.db.exec(select(User.id, User.email).where(User.email.in_(missing))).all():
+            self._users[email.lower()] = user_id
+
+    @staticmethod
+    def _invalid(report: ImportReport, line_number: int, error: str):
+        report.invalid += 1
+        if len(report.errors) < MAX_REPORTED_ERRORS:
+            report.errors.append(ImportLineError(line=line_number, error=error[:500]))
+
+    @staticmethod
+    def _progress(report: ImportReport, started: float):
+        report.duration_seconds = time.perf_counter() - started
+        rows = report.sessions + report.messages + report.feedback
+        report.rows_per_second = rows / report.duration_seconds if report.duration_seconds else 0.0
+        if report.batches and report.batches % LOG_EVERY_BATCHES == 0:
+            logger.info(f"Import at line {report.last_line}: {rows} rows, {report.rows_per_second:.0f} rows/s")
@@ -0,0 +1,62 @@
+from sqlmodel import Session, select
+from sqlalchemy import update, or_
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, List
+from datetime import datetime, timedelta
+
+from ..models.job import JobLease
+
+class JobLeaseService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def try_acquire(self, name: str, owner: str, slot: datetime, lease_seconds: float) -> bool:
+        """Claim a job's scheduled slot; only one caller across all workers wins it"""
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=lease_seconds)
+
+        # Compare-and-swap: the slot must be newer and no live lease may be held
+        result = self.db.exec(
+            update(JobLease)
+            .where(
+                JobLease.name == name,
+                JobLease.slot < slot,
+                or_(JobLease.lease_expires_at.is_(None), JobLease.lease_expires_at < now)
+            )
+            .values(owner=owner, slot=slot, lease_expires_at=expires_at, last_started_at=now)
+        )
+        self.db.commit()
+        if result.rowcount == 1:
+            return True
+
+        if self.db.get(JobLease, name) is not None:
+            return False
+
+        # First run of this job anywhere
+        self.db.add(JobLease(name=name, owner=owner, slot=slot, lease_expires_at=expires_at, last_started_at=now))
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return False
+        return True
+
+    def release(self, name: str, owner: str, status: str, duration_ms: float, error: Optional[str] = None) -> bool:
+        """Release a held lease and record the run outcome"""
+        result = self.db.exec(
+            update(JobLease)
+            .where(JobLease.name == name, JobLease.owner == owner)
+            .values(
+                lease_expires_at=None,
+                last_finished_at=datetime.utcnow(),
+                last_duration_ms=duration_ms,
+                last_status=status,
+                last_error=error
+            )
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def get_leases(self) -> List[JobLease]:
+        """Get the lease record of every job that has run"""
+        return self.db.exec(select(JobLease)).all()
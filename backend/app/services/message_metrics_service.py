@@ -0,0 +1,67 @@
+from sqlmodel import Session, select
+from sqlalchemy import update, func
+from collections import defaultdict
+from datetime import datetime
+
+from ..models.message import Message, MessageType
+from ..models.session import ConversationSession
+from ..models.language import Language
+from ..models.job import IndexerCheckpoint
+from ..utils import text_metrics
+
+INDEXER_NAME = "message_metrics"
+
+class MessageMetricsService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def backfill(self, batch_size: int = 2000, max_batches: int = 50) -> int:
+        """Compute counts and complexity for messages stored without them, returns how many were updated"""
+        checkpoint = self.db.get(IndexerCheckpoint, INDEXER_NAME) or IndexerCheckpoint(name=INDEXER_NAME)
+        # New messages get metrics on insert, anything above this id is already done
+        high_water = self.db.exec(select(func.max(Message.id))).one() or 0
+        updated = 0
+
+        for _ in range(max_batches):
+            rows = self.db.exec(
+                select(Message.id, Message.content, Message.message_type, Language.code)
+                .join(ConversationSession, ConversationSession.id == Message.session_id)
+                .join(Language, Language.id == ConversationSession.target_language_id)
+                .where(Message.id > checkpoint.last_id, Message.id <= high_water, Message.word_count == None)  # noqa: E711
+                .order_by(Message.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                checkpoint.last_id = max(checkpoint.last_id, high_water)
+                break
+
+            # Batch by language so each rule set is applied to all its texts at once
+            by_language = defaultdict(list)
+            for row in rows:
+                by_language[row[3]].append(row)
+            params = []
+            for language_code, language_rows in by_language.items():
+                metrics = text_metrics.compute_many((row[1] for row in language_rows), language_code)
+                for (message_id, _, message_type, _), result in zip(language_rows, metrics):
+                    params.append({
+                        "id": message_id,
+                        "word_count": result.word_count,
+                        "character_count": result.character_count,
+                        "complexity_score": result.complexity_score if message_type == MessageType.USER else None
+                    })
+
+            self.db.exec(update(Message), params=params)
+            checkpoint.last_id = rows[-1][0]
+            updated += len(rows)
+            if len(rows) < batch_size:
+                checkpoint.last_id = high_water
+                break
+            self._save(checkpoint)
+
+        self._save(checkpoint)
+        return updated
+
+    def _save(self, checkpoint: IndexerCheckpoint):
+        checkpoint.updated_at = datetime.utcnow()
+        self.db.add(checkpoint)
+        self.db.commit()
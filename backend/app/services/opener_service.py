@@ -0,0 +1,96 @@
+from sqlmodel import Session, select
+from sqlalchemy import func
+from typing import Optional, Dict, Any
+from datetime import datetime, timedelta
+
+from ..core.config import settings
+from ..models.session import ConversationSession
+from ..models.language import Language
+from .prompt_cache_service import PromptCacheService
+
+PROMPT_CLASS = "opener"
+
+OPENER_PROMPT = (
+    "You are a friendly conversation partner helping someone practise {language}. "
+    "Open a {difficulty} conversation about {topic} with one or two short sentences "
+    "written only in {language}, ending with a question the learner can answer."
+)
+
+
+def openers_enabled() -> bool:
+    return settings.session_openers_enabled and settings.openai_api_key is not None
+
+
+class OpenerService:
+    """First assistant turn of a session, shared between sessions with the same scenario"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def get_opener(self, session: ConversationSession) -> Optional[str]:
+        """A cached or newly generated opener for the session's scenario, None if none could be generated"""
+        language = self.db.get(Language, session.target_language_id)
+        if language is None:
+            return None
+        params = self._params(language, session.topic, session.difficulty_level, session.conversation_context)
+        return await PromptCacheService(self.db).get_or_generate(
+            PROMPT_CLASS, params, lambda: self._generate(language, params, user_id=session.user_id)
+        )
+
+    @staticmethod
+    def _params(language: Language, topic: str, difficulty_level, context: Optional[str]) -> Dict[str, Any]:
+        return {"language": language.code, "topic": topic, "difficulty": difficulty_level, "context": context}
+
+    async def _generate(self, language: Language, params: Dict[str, Any], user_id: Optional[int] = None) -> str:
+        """Ask the LLM for a new opener, charged to `user_id`'s quota when given"""
+        from ..core.llm import get_llm_client
+        from .usage_service import UsageService
+
+        usage_service = UsageService(self.db)
+        if user_id is not None:
+            usage_service.check_quota(user_id)
+
+        prompt = OPENER_PROMPT.format(
+            language=language.name, difficulty=params["difficulty"].value, topic=params["topic"]
+        )
+        messages = [{"role": "system", "content": prompt}]
+        if params["context"]:
+            messages.append({"role": "user", "content": f"Scenario: {params['context']}"})
+        # End the quota check's transaction, the connection is not needed while the LLM answers
+        self.db.commit()
+        # Sampled with some temperature so the variants of a scenario differ
+        response = await get_llm_client().chat(messages, temperature=0.9, max_tokens=120)
+        if user_id is not None:
+            usage_service.record(user_id, response.get("usage"))
+        return response["choices"][0]["message"]["content"].strip()
+
+    async def warm(self, top: int = 50, days: int = 30) -> int:
+        """Fill the variant pools of the most common recent scenarios without a custom context"""
+        since = datetime.utcnow() - timedelta(days=days)
+        scenarios = self.db.exec(
+            select(
+                ConversationSession.target_language_id, ConversationSession.topic, ConversationSession.difficulty_level
+            )
+            .where(ConversationSession.created_at >= since, ConversationSession.conversation_context == None)  # noqa: E711
+            .group_by(
+                ConversationSession.target_language_id, ConversationSession.topic, ConversationSession.difficulty_level
+            )
+            .order_by(func.count().desc())
+            .limit(top)
+        ).all()
+        languages = {
+            language.id: language
+            for language in self.db.exec(
+                select(Language).where(Language.id.in_({row[0] for row in scenarios}))
+            ).all()
+        } if scenarios else {}
+
+        cache_service = PromptCacheService(self.db)
+        added = 0
+        for language_id, topic, difficulty_level in scenarios:
+            language = languages.get(language_id)
+            if language is None:
+                continue
+            params = self._params(language, topic, difficulty_level, None)
+            added += await cache_service.fill(PROMPT_CLASS, params, lambda: self._generate(language, params))
+        return added
@@ -0,0 +1,143 @@
+from sqlmodel import Session, select
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
+
+from ..models.feedback import Feedback
+from ..models.analytics import (
+    SkillSeries, ProgressSeries, SkillSummary, CohortProgressEntry, CohortProgressReport
+)
+
+SKILLS = ["grammar", "vocabulary", "fluency", "overall"]
+SECONDS_PER_DAY = 86400.0
+EPOCH = datetime(1970, 1, 1)  # Naive UTC, matching datetime64 conversion
+
+
+def _optional(value) -> Optional[float]:
+    return None if value != value else round(float(value), 3)  # NaN != NaN
+
+
+class ProgressService:
+    """Score time series computed with NumPy over columnar arrays loaded in one query"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _load_scores(self, since: datetime, user_ids: Optional[List[int]] = None) -> Tuple:
+        """(user_ids, timestamps, scores) arrays sorted by user then time, scores shaped (len(SKILLS), n)"""
+        # NumPy is only needed here, keep it out of the app's import time
+        import numpy as np
+
+        statement = (
+            select(
+                Feedback.user_id, Feedback.created_at,
+                Feedback.grammar_score, Feedback.vocabulary_score, Feedback.fluency_score, Feedback.overall_score
+            )
+            .where(Feedback.created_at >= since)
+            .order_by(Feedback.user_id, Feedback.created_at, Feedback.id)
+        )
+        if user_ids is not None:
+            statement = statement.where(Feedback.user_id.in_(user_ids))
+        rows = self.db.exec(statement).all()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty((len(SKILLS), 0))
+
+        columns = list(zip(*rows))
+        users = np.array(columns[0], dtype=np.int64)
+        timestamps = np.array(columns[1], dtype="datetime64[us]").astype(np.int64) / 1e6
+        scores = np.array(columns[2:], dtype=float)  # None becomes NaN
+        return users, timestamps, scores
+
+    def get_progress(
+        self,
+        user_id: int,
+        days: int = 90,
+        points: int = 30,
+        window: int = 5,
+        alpha: float = 0.3
+    ) -> ProgressSeries:
+        """A learner's per-skill scores over `days`, downsampled to `points` buckets for charting"""
+        import numpy as np
+        from ..utils import timeseries
+
+        end = datetime.utcnow()
+        start = end - timedelta(days=days)
+        _, timestamps, scores = self._load_scores(start, [user_id])
+        start_s, end_s = (start - EPOCH).total_seconds(), (end - EPOCH).total_seconds()
+        bucket_width = (end - start) / points
+
+        skills = []
+        for skill, values in zip(SKILLS, scores):
+            if len(values):
+                rolling = timeseries.rolling_mean(values, window)
+                smoothed = timeseries.ema(values, alpha)
+                slope = timeseries.grouped_slope(timestamps / SECONDS_PER_DAY, values, np.array([0]))[0]
+                present = values[~np.isnan(values)]
+                latest = present[-1] if len(present) else np.nan
+                bucketed = [
+                    timeseries.downsample(timestamps, values, start_s, end_s, points),
+                    timeseries.downsample_last(timestamps, rolling, start_s, end_s, points),
+                    timeseries.downsample_last(timestamps, smoothed, start_s, end_s, points),
+                ]
+            else:
+                slope = latest = np.nan
+                bucketed = [np.full(points, np.nan)] * 3
+            skills.append(SkillSeries(
+                skill=skill,
+                values=[_optional(value) for value in bucketed[0]],
+                rolling_mean=[_optional(value) for value in bucketed[1]],
+                smoothed=[_optional(value) for value in bucketed[2]],
+                slope_per_day=_optional(slope),
+                latest=_optional(latest)
+            ))
+
+        return ProgressSeries(
+            days=days,
+            samples=len(timestamps),
+            bucket_starts=[start + bucket_width * i for i in range(points)],
+            skills=skills
+        )
+
+    def get_cohort_progress(
+        self,
+        user_ids: Optional[List[int]] = None,
+        days: int = 90,
+        alpha: float = 0.3
+    ) -> CohortProgressReport:
+        """Per-skill mean, smoothed level and trend for every user with feedback in the window, in one pass"""
+        import numpy as np
+        from ..utils import timeseries
+
+        users, timestamps, scores = self._load_scores(datetime.utcnow() - timedelta(days=days), user_ids)
+        if not len(users):
+            return CohortProgressReport(days=days, generated_at=datetime.utcnow(), users=[])
+
+        group_starts = np.flatnonzero(np.concatenate(([True], users[1:] != users[:-1])))
+        samples = np.diff(np.append(group_starts, len(users)))
+        x = timestamps / SECONDS_PER_DAY
+
+        summaries = {
+            skill: (
+                timeseries.grouped_mean(values, group_starts),
+                timeseries.grouped_ema_last(values, alpha, group_starts),
+                timeseries.grouped_slope(x, values, group_starts),
+            )
+            for skill, values in zip(SKILLS, scores)
+        }
+
+        return CohortProgressReport(
+            days=days,
+            generated_at=datetime.utcnow(),
+            users=[
+                CohortProgressEntry(
+                    user_id=int(users[start]),
+                    samples=int(samples[i]),
+                    skills={
+                        skill: SkillSummary(
+                            mean=_optional(means[i]), smoothed=_optional(smoothed[i]), slope_per_day=_optional(slopes[i])
+                        )
+                        for skill, (means, smoothed, slopes) in summaries.items()
+                    }
+                )
+                for i, start in enumerate(group_starts)
+            ]
+        )
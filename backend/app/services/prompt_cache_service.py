@@ -0,0 +1,163 @@
+from sqlmodel import Session, select
+from sqlalchemy import Row, delete
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import unicodedata
+
+from ..core.config import settings
+from ..models.prompt_cache import PromptCacheEntry, PromptCacheStats
+from ..db.upsert import upsert
+from ..utils.logger import get_logger
+
+logger = get_logger()
+
+# Full variant pools cached per worker. Pools still being filled are read from
+# the database each time so every worker sees the variants the others add.
+_cache: "OrderedDict[str, Tuple[float, Tuple[str, ...]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"memory_hits": 0, "database_hits": 0, "misses": 0, "generated": 0, "generation_failures": 0}
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFC", value).casefold().split())
+    if hasattr(value, "value"):  # Enums
+        return _normalize(value.value)
+    return value
+
+
+def prompt_key(prompt_class: str, params: Dict[str, Any]) -> str:
+    """Hash of a prompt class and its parameters, insensitive to case, spacing and key order"""
+    normalized = {name: _normalize(value) for name, value in params.items() if value is not None and value != ""}
+    payload = json.dumps([prompt_class, normalized], sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key: str) -> Optional[Tuple[str, ...]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        _cache.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key: str, expires_in: float, pool: Tuple[str, ...]):
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + expires_in, pool)
+        _cache.move_to_end(key)
+        while len(_cache) > settings.prompt_cache_memory_entries:
+            _cache.popitem(last=False)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def get_stats() -> PromptCacheStats:
+    hits = _stats["memory_hits"] + _stats["database_hits"]
+    lookups = hits + _stats["misses"]
+    with _cache_lock:
+        memory_entries = len(_cache)
+    return PromptCacheStats(**_stats, hit_rate=hits / lookups if lookups else None, memory_entries=memory_entries)
+
+
+class PromptCacheService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    async def get_or_generate(
+        self, prompt_class: str, params: Dict[str, Any], generate: Callable[[], Awaitable[str]]
+    ) -> Optional[str]:
+        """A cached variant once the key's pool is full, otherwise a new generation added to the pool"""
+        key = prompt_key(prompt_class, params)
+        pool = _cache_get(key)
+        if pool is not None:
+            _stats["memory_hits"] += 1
+            return random.choice(pool)
+
+        variants = self._load(key)
+        if len(variants) >= settings.prompt_cache_variants:
+            _stats["database_hits"] += 1
+            return random.choice([entry.content for entry in variants])
+
+        _stats["misses"] += 1
+        # Don't hold a connection while the LLM answers, storing the variant opens a new transaction
+        self.db.commit()
+        try:
+            content = await generate()
+        except Exception as e:
+            _stats["generation_failures"] += 1
+            logger.warning(f"Could not generate {prompt_class} prompt: {e}")
+            # Better a repeated variant than none at all
+            return random.choice([entry.content for entry in variants]) if variants else None
+        _stats["generated"] += 1
+        self._store(key, prompt_class, [content], variants)
+        return content
+
+    def _load(self, key: str) -> List[Row]:
+        """Unexpired variants of a key, caching the pool in memory once it is full"""
+        now = datetime.utcnow()
+        # Plain rows, still readable once the transaction is over
+        variants = self.db.exec(
+            select(PromptCacheEntry.variant, PromptCacheEntry.content, PromptCacheEntry.expires_at)
+            .where(PromptCacheEntry.cache_key == key, PromptCacheEntry.expires_at > now)
+            .order_by(PromptCacheEntry.variant)
+        ).all()
+        if len(variants) >= settings.prompt_cache_variants:
+            # Drop the pool from memory when its first variant expires, it is refilled from then on
+            expires_in = (min(entry.expires_at for entry in variants) - now).total_seconds()
+            _cache_put(key, expires_in, tuple(entry.content for entry in variants))
+        return variants
+
+    def _store(self, key: str, prompt_class: str, contents: List[str], variants: List[Row]):
+        """Put new variants in the free slots, replacing expired ones first"""
+        taken = {entry.variant for entry in variants}
+        slots = [index for index in range(settings.prompt_cache_variants + len(contents)) if index not in taken]
+        now = datetime.utcnow()
+        upsert(
+            self.db, PromptCacheEntry,
+            [
+                {
+                    "cache_key": key, "variant": slot, "prompt_class": prompt_class, "content": content,
+                    "created_at": now, "expires_at": now + timedelta(hours=settings.prompt_cache_ttl_hours)
+                }
+                for slot, content in zip(slots, contents)
+            ],
+            ["cache_key", "variant"],
+            lambda existing, incoming, dialect: {
+                "content": incoming.content, "created_at": incoming.created_at, "expires_at": incoming.expires_at
+            }
+        )
+        self.db.commit()
+
+    async def fill(self, prompt_class: str, params: Dict[str, Any], generate: Callable[[], Awaitable[str]]) -> int:
+        """Generate the variants a key is missing, concurrently, returns how many were added"""
+        key = prompt_key(prompt_class, params)
+        variants = self._load(key)
+        missing = settings.prompt_cache_variants - len(variants)
+        if missing <= 0:
+            return 0
+        self.db.commit()
+        results = await asyncio.gather(*(generate() for _ in range(missing)), return_exceptions=True)
+        contents = [result for result in results if isinstance(result, str) and result]
+        _stats["generated"] += len(contents)
+        _stats["generation_failures"] += missing - len(contents)
+        if contents:
+            self._store(key, prompt_class, contents, variants)
+            self._load(key)
+        return len(contents)
+
+    def purge_expired(self) -> int:
+        """Delete expired variants, returns how many were removed"""
+        deleted = self.db.exec(delete(PromptCacheEntry).where(PromptCacheEntry.expires_at <= datetime.utcnow())).rowcount
+        self.db.commit()
+        return deleted
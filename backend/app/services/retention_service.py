@@ -0,0 +1,190 @@
+from sqlmodel import Session, select
+from sqlalchemy import delete, func
+from typing import Optional
+from datetime import datetime, timedelta
+import time
+
+from ..models.user import User, TokenRevocation
+from ..models.language import UserLanguage
+from ..models.session import ConversationSession
+from ..models.message import Message
+from ..models.feedback import Feedback
+from ..models.archive import ArchivedConversation
+from ..models.vocabulary import VocabularyEntry
+from ..models.review import ReviewItem
+from ..models.analytics import ErrorCounter
+from ..models.difficulty import DifficultyState
+from ..models.usage import LLMUsage
+from ..models.summary import SummaryJob
+from ..models.idempotency import IdempotencyKey
+from ..models.retention import RetentionCheckpoint, RetentionReport
+from .search_service import SearchService
+
+class RetentionService:
+    """Deletes data by retention policy in small primary-key batches.
+
+    Each batch is its own transaction and advances the policy's checkpoint in
+    that same transaction, so an interrupted run resumes from the last
+    committed batch. Nothing holds locks across batches.
+    """
+
+    def __init__(self, db: Session, batch_size: int = 1000, pause_ms: int = 100):
+        self.db = db
+        self.batch_size = batch_size
+        self.pause_seconds = pause_ms / 1000
+
+    def purge_deactivated_users(self, older_than_days: int, dry_run: bool = False) -> RetentionReport:
+        """Delete accounts deactivated more than `older_than_days` ago along with all their data"""
+        policy = f"purge_deactivated_users:{older_than_days}d"
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        user_filter = (User.is_active == False) & (User.updated_at < cutoff)  # noqa: E712
+
+        if dry_run:
+            return self._count_user_data(policy, user_filter)
+
+        checkpoint = self._load_checkpoint(policy)
+        report = RetentionReport(policy=policy, dry_run=False, resumed_from_id=checkpoint.last_id)
+        started = time.perf_counter()
+
+        while True:
+            user_ids = self.db.exec(
+                select(User.id).where(user_filter, User.id > checkpoint.last_id).order_by(User.id).limit(self.batch_size)
+            ).all()
+            if not user_ids:
+                break
+            for user_id in user_ids:
+                self._purge_user(user_id, checkpoint, report)
+
+        self._complete(checkpoint)
+        report.duration_seconds = time.perf_counter() - started
+        return report
+
+    def delete_old_messages(self, older_than_days: int, dry_run: bool = False) -> RetentionReport:
+        """Delete messages created more than `older_than_days` ago"""
+        policy = f"delete_old_messages:{older_than_days}d"
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+        if dry_run:
+            count = self.db.exec(select(func.count(Message.id)).where(Message.created_at < cutoff)).one()
+            return RetentionReport(policy=policy, dry_run=True, messages=count)
+
+        checkpoint = self._load_checkpoint(policy)
+        report = RetentionReport(policy=policy, dry_run=False, resumed_from_id=checkpoint.last_id)
+        started = time.perf_counter()
+        max_id = self.db.exec(select(func.max(Message.id))).one() or 0
+
+        # Walk the primary key in fixed ranges so every batch touches at most batch_size rows
+        lower = checkpoint.last_id
+        while lower < max_id:
+            upper = min(lower + self.batch_size, max_id)
+            in_range = (Message.id > lower) & (Message.id <= upper)
+            deleted = self.db.exec(delete(Message).where(in_range, Message.created_at < cutoff)).rowcount
+            SearchService(self.db).remove_messages_before(lower, upper, cutoff)
+            self._advance(checkpoint, upper, deleted)
+            report.messages += deleted
+            report.batches += 1
+
+            # Ids grow with time: once a range has nothing left that is old enough, we are done
+            if not deleted:
+                oldest = self.db.exec(select(func.min(Message.created_at)).where(Message.id > upper)).one()
+                if oldest is None or oldest >= cutoff:
+                    break
+            lower = upper
+            self._throttle()
+
+        self._complete(checkpoint)
+        report.duration_seconds = time.perf_counter() - started
+        return report
+
+    def _purge_user(self, user_id: int, checkpoint: RetentionCheckpoint, report: RetentionReport):
+        """Delete one user's rows child tables first, the user row last"""
+        session_ids = select(ConversationSession.id).where(ConversationSession.user_id == user_id)
+
+        # Queued summaries reference the user's sessions and feedback
+        self.db.exec(delete(SummaryJob).where(SummaryJob.user_id == user_id))
+        report.messages += self._delete_in_batches(Message, Message.session_id.in_(session_ids), checkpoint, report)
+        report.feedback += self._delete_in_batches(Feedback, Feedback.user_id == user_id, checkpoint, report)
+        self.db.exec(delete(ArchivedConversation).where(ArchivedConversation.session_id.in_(session_ids)))
+        report.sessions += self._delete_in_batches(
+            ConversationSession, ConversationSession.user_id == user_id, checkpoint, report
+        )
+        report.user_languages += self._delete_in_batches(
+            UserLanguage, UserLanguage.user_id == user_id, checkpoint, report
+        )
+
+        SearchService(self.db).remove_user(user_id)
+        self.db.exec(delete(VocabularyEntry).where(VocabularyEntry.user_id == user_id))
+        self.db.exec(delete(ErrorCounter).where(ErrorCounter.user_id == user_id))
+        self.db.exec(delete(DifficultyState).where(DifficultyState.user_id == user_id))
+        self.db.exec(delete(LLMUsage).where(LLMUsage.user_id == user_id))
+        self.db.exec(delete(IdempotencyKey).where(IdempotencyKey.user_id == user_id))
+        self.db.exec(delete(TokenRevocation).where(TokenRevocation.user_id == user_id))
+        self._delete_in_batches(ReviewItem, ReviewItem.user_id == user_id, checkpoint, report)
+        self.db.exec(delete(User).where(User.id == user_id))
+        self._advance(checkpoint, user_id, 1)
+        report.users += 1
+
+    def _delete_in_batches(self, model, where, checkpoint: RetentionCheckpoint, report: RetentionReport) -> int:
+        """Delete rows matching `where` in primary-key order, one committed batch at a time"""
+        total = 0
+        while True:
+            ids = self.db.exec(select(model.id).where(where).order_by(model.id).limit(self.batch_size)).all()
+            if not ids:
+                return total
+            deleted = self.db.exec(delete(model).where(model.id.in_(ids))).rowcount
+            # The user is only checkpointed once fully purged, deleting its leftovers again is harmless
+            self._advance(checkpoint, checkpoint.last_id, deleted)
+            total += deleted
+            report.batches += 1
+            self._throttle()
+
+    def _count_user_data(self, policy: str, user_filter) -> RetentionReport:
+        """Count what purging the matching users would delete"""
+        user_ids = select(User.id).where(user_filter)
+        session_ids = select(ConversationSession.id).where(ConversationSession.user_id.in_(user_ids))
+        return RetentionReport(
+            policy=policy,
+            dry_run=True,
+            users=self.db.exec(select(func.count(User.id)).where(user_filter)).one(),
+            sessions=self.db.exec(select(func.count()).select_from(session_ids.subquery())).one(),
+            messages=self.db.exec(select(func.count(Message.id)).where(Message.session_id.in_(session_ids))).one(),
+            feedback=self.db.exec(select(func.count(Feedback.id)).where(Feedback.user_id.in_(user_ids))).one(),
+            user_languages=self.db.exec(
+                select(func.count(UserLanguage.id)).where(UserLanguage.user_id.in_(user_ids))
+            ).one()
+        )
+
+    def get_checkpoint(self, policy: str) -> Optional[RetentionCheckpoint]:
+        """Get the checkpoint of a policy"""
+        return self.db.get(RetentionCheckpoint, policy)
+
+    def _load_checkpoint(self, policy: str) -> RetentionCheckpoint:
+        """Resume an unfinished run of the policy or start a new one"""
+        checkpoint = self.db.get(RetentionCheckpoint, policy)
+        if checkpoint is None:
+            checkpoint = RetentionCheckpoint(policy=policy)
+        elif checkpoint.completed_at is not None:
+            checkpoint.last_id = 0
+            checkpoint.rows_affected = 0
+            checkpoint.started_at = datetime.utcnow()
+            checkpoint.completed_at = None
+        self.db.add(checkpoint)
+        self.db.commit()
+        return checkpoint
+
+    def _advance(self, checkpoint: RetentionCheckpoint, last_id: int, rows: int):
+        """Commit the current batch together with the checkpoint"""
+        checkpoint.last_id = last_id
+        checkpoint.rows_affected += rows
+        checkpoint.updated_at = datetime.utcnow()
+        self.db.add(checkpoint)
+        self.db.commit()
+
+    def _complete(self, checkpoint: RetentionCheckpoint):
+        checkpoint.completed_at = datetime.utcnow()
+        self.db.add(checkpoint)
+        self.db.commit()
+
+    def _throttle(self):
+        if self.pause_seconds:
+            time.sleep(self.pause_seconds)
@@ -0,0 +1,238 @@
+from sqlmodel import Session, select
+from sqlalchemy import update
+from typing import Optional, List, Iterable, Tuple, Dict, Any
+from datetime import datetime, timedelta
+import hashlib
+import json
+
+from ..models.message import Message, MessageType
+from ..models.feedback import Feedback
+from ..models.session import ConversationSession
+from ..models.job import IndexerCheckpoint
+from ..models.review import ReviewItem, ReviewOutcome, ReviewOutcomeResult
+from ..db.upsert import upsert, least
+from ..db.checkpoint import settled_id
+from ..utils.tokenizer import normalize
+from ..utils.text_diff import diff
+
+MIN_EASE = 1.3
+
+
+def correction_pairs(corrections: Iterable[Dict[str, Any]]) -> List[Tuple[str, str, Optional[str], Optional[list]]]:
+    """(original, corrected, explanation, edit spans) from Message.corrections entries"""
+    pairs = []
+    for correction in corrections:
+        if not isinstance(correction, dict):
+            continue
+        original = correction.get("original") or correction.get("original_text")
+        corrected = correction.get("corrected") or correction.get("corrected_text")
+        if original and corrected and original != corrected:
+            edits = correction.get("diff")
+            pairs.append((original, corrected, correction.get("explanation"), edits if isinstance(edits, list) else None))
+    return pairs
+
+
+def annotate_corrections(corrections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Message.corrections entries with their edit spans under "diff", so reads never diff"""
+    annotated = []
+    for correction in corrections:
+        if isinstance(correction, dict):
+            original = correction.get("original") or correction.get("original_text")
+            corrected = correction.get("corrected") or correction.get("corrected_text")
+            if isinstance(original, str) and isinstance(corrected, str):
+                correction = {**correction, "diff": diff(original, corrected)}
+        annotated.append(correction)
+    return annotated
+
+
+def parse_corrections(raw: str) -> List[Dict[str, Any]]:
+    try:
+        corrections = json.loads(raw)
+    except json.JSONDecodeError:
+        return []
+    return corrections if isinstance(corrections, list) else []
+
+
+def fingerprint(original: str, corrected: str) -> str:
+    """Identity of a correction, so the same mistake made twice is one review item"""
+    key = f"{normalize(original).casefold().strip()}\x00{normalize(corrected).casefold().strip()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def sm2(ease: float, interval_days: int, repetitions: int, quality: int) -> Tuple[float, int, int]:
+    """Next (ease, interval_days, repetitions) after a review graded 0-5"""
+    if quality < 3:
+        repetitions, interval_days = 0, 1
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval_days = 1
+        elif repetitions == 2:
+            interval_days = 6
+        else:
+            interval_days = round(interval_days * ease)
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return ease, interval_days, repetitions
+
+
+class ReviewService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def collect_new_items(self, batch_size: int = 1000, max_batches: int = 50) -> int:
+        """Create review items from corrections written since the last run, returns how many were found"""
+        return self._collect_from_messages(batch_size, max_batches) + self._collect_from_feedback(batch_size, max_batches)
+
+    def _collect_from_messages(self, batch_size: int, max_batches: int) -> int:
+        def load(last_id: int, settled: int):
+            rows = self.db.exec(
+                select(
+                    Message.id, Message.corrections, Message.created_at,
+                    ConversationSession.user_id, ConversationSession.target_language_id
+                )
+                .join(ConversationSession, ConversationSession.id == Message.session_id)
+                .where(
+                    Message.id > last_id, Message.id <= settled,
+                    Message.message_type == MessageType.USER, Message.corrections != None  # noqa: E711
+                )
+                .order_by(Message.id)
+                .limit(batch_size)
+            ).all()
+            items = [
+                item
+                for message_id, corrections, created_at, user_id, language_id in rows
+                for item in self._message_items(message_id, parse_corrections(corrections), created_at, user_id, language_id)
+            ]
+            return [row[0] for row in rows], items
+
+        return self._collect("review_items:message", Message.id, load, batch_size, max_batches)
+
+    def _collect_from_feedback(self, batch_size: int, max_batches: int) -> int:
+        # Feedback without a session has no target language and is skipped
+        def load(last_id: int, settled: int):
+            rows = self.db.exec(
+                select(
+                    Feedback.id, Feedback.original_text, Feedback.corrected_text, Feedback.explanation,
+                    Feedback.text_diff, Feedback.created_at, Feedback.user_id, ConversationSession.target_language_id
+                )
+                .join(ConversationSession, ConversationSession.id == Feedback.session_id)
+                .where(
+                    Feedback.id > last_id, Feedback.id <= settled,
+                    Feedback.original_text != None, Feedback.corrected_text != None  # noqa: E711
+                )
+                .order_by(Feedback.id)
+                .limit(batch_size)
+            ).all()
+            items = [
+                self._new_item(
+                    user_id, language_id, "feedback", feedback_id, original, corrected, explanation, created_at,
+                    parse_corrections(text_diff) if text_diff else None
+                )
+                for feedback_id, original, corrected, explanation, text_diff, created_at, user_id, language_id in rows
+                if original and corrected and original != corrected
+            ]
+            return [row[0] for row in rows], items
+
+        return self._collect("review_items:feedback", Feedback.id, load, batch_size, max_batches)
+
+    def _collect(self, checkpoint_name: str, id_column, load, batch_size: int, max_batches: int) -> int:
+        checkpoint = self.db.get(IndexerCheckpoint, checkpoint_name) or IndexerCheckpoint(name=checkpoint_name)
+        settled = settled_id(self.db, checkpoint_name, checkpoint.last_id, id_column)
+        found = 0
+        for _ in range(max_batches):
+            ids, items = load(checkpoint.last_id, settled)
+            if not ids and checkpoint.last_id >= settled:
+                break
+            self._upsert_items(items)
+            # A short batch read everything up to the horizon, the next run can take a new one
+            checkpoint.last_id = ids[-1] if len(ids) == batch_size else settled
+            checkpoint.updated_at = datetime.utcnow()
+            self.db.add(checkpoint)
+            self.db.commit()
+            found += len(items)
+            if len(ids) < batch_size:
+                break
+        return found
+
+    def add_message_corrections(self, message: Message, session: ConversationSession):
+        """Create review items for corrections added to an existing message, in the caller's transaction"""
+        self._upsert_items(self._message_items(
+            message.id, message.get_corrections(), message.created_at, session.user_id, session.target_language_id
+        ))
+
+    def _upsert_items(self, items: List[dict]):
+        # A mistake made again comes back due no later than when it was repeated
+        upsert(
+            self.db, ReviewItem, list({(i["user_id"], i["language_id"], i["fingerprint"]): i for i in items}.values()),
+            ["user_id", "language_id", "fingerprint"],
+            lambda existing, incoming, dialect: {"due_at": least(dialect, existing.due_at, incoming.due_at)}
+        )
+
+    def _message_items(self, message_id, corrections, created_at, user_id, language_id) -> List[dict]:
+        return [
+            self._new_item(user_id, language_id, "message", message_id, original, corrected, explanation, created_at, edits)
+            for original, corrected, explanation, edits in correction_pairs(corrections)
+        ]
+
+    @staticmethod
+    def _new_item(user_id, language_id, source, source_id, original, corrected, explanation, created_at, edits=None) -> dict:
+        # Reuse the spans already stored with the correction, diff only when there are none
+        if edits is None:
+            edits = diff(original, corrected)
+        return {
+            "user_id": user_id, "language_id": language_id,
+            "source": source, "source_id": source_id,
+            "fingerprint": fingerprint(original, corrected),
+            "original_text": original, "corrected_text": corrected, "explanation": explanation,
+            "text_diff": json.dumps(edits, separators=(",", ":")),
+            "ease": 2.5, "interval_days": 0, "repetitions": 0, "lapses": 0,
+            "due_at": created_at or datetime.utcnow(), "created_at": datetime.utcnow()
+        }
+
+    def get_due_items(self, user_id: int, limit: int = 20, language_id: Optional[int] = None, now: Optional[datetime] = None) -> List[ReviewItem]:
+        """Items due for review, most overdue first"""
+        statement = (
+            select(ReviewItem)
+            .where(ReviewItem.user_id == user_id, ReviewItem.due_at <= (now or datetime.utcnow()))
+            .order_by(ReviewItem.due_at)
+            .limit(limit)
+        )
+        if language_id is not None:
+            statement = statement.where(ReviewItem.language_id == language_id)
+        return self.db.exec(statement).all()
+
+    def record_outcomes(self, user_id: int, outcomes: List[ReviewOutcome]) -> ReviewOutcomeResult:
+        """Apply a batch of review grades with one read and one bulk update"""
+        item_ids = {outcome.item_id for outcome in outcomes}
+        states = {
+            row.id: {
+                "id": row.id, "ease": row.ease, "interval_days": row.interval_days,
+                "repetitions": row.repetitions, "lapses": row.lapses
+            }
+            for row in self.db.exec(
+                select(
+                    ReviewItem.id, ReviewItem.ease, ReviewItem.interval_days, ReviewItem.repetitions, ReviewItem.lapses
+                ).where(ReviewItem.user_id == user_id, ReviewItem.id.in_(item_ids))
+            ).all()
+        } if item_ids else {}
+
+        now = datetime.utcnow()
+        # Several grades for one item are applied in the order they happened
+        for outcome in sorted(outcomes, key=lambda outcome: outcome.reviewed_at or now):
+            state = states.get(outcome.item_id)
+            if state is None:
+                continue
+            reviewed_at = outcome.reviewed_at or now
+            state["ease"], state["interval_days"], state["repetitions"] = sm2(
+                state["ease"], state["interval_days"], state["repetitions"], outcome.quality
+            )
+            if outcome.quality < 3:
+                state["lapses"] += 1
+            state["last_reviewed_at"] = reviewed_at
+            state["due_at"] = reviewed_at + timedelta(days=state["interval_days"])
+
+        if states:
+            self.db.exec(update(ReviewItem), params=list(states.values()))
+            self.db.commit()
+
+        return ReviewOutcomeResult(recorded=len(states), missing_item_ids=sorted(item_ids - states.keys()))
@@ -0,0 +1,286 @@
+from sqlmodel import Session, select
+from sqlalchemy import text
+from typing import Optional, List, Iterable
+from datetime import datetime
+from abc import ABC, abstractmethod
+import html
+import re
+
+from ..models.message import Message
+from ..models.session import ConversationSession
+from ..models.search import SearchHit, SearchResults
+
+# Table layout shared by both backends. Rows are denormalised (user and language
+# copied from the session) so a search never has to join the hot tables, and they
+# outlive archival of the messages they came from.
+SEARCH_TABLE = "message_search"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+# Placed around matches by FTS5's snippet(), swapped for <mark> tags once the text is escaped
+MARK_START, MARK_END = "\x02", "\x03"
+
+
+def query_terms(query: str) -> List[str]:
+    """Split a user query into plain search terms, dropping any operators"""
+    return [term.lower() for term in _WORD.findall(query)][:20]
+
+
+def make_snippet(content: str, terms: List[str], width: int = 12) -> str:
+    """Window of about `width` words around the first matching term, HTML-escaped with matches marked"""
+    words = content.split()
+    lowered = [word.lower() for word in words]
+    first = next((i for i, word in enumerate(lowered) if any(term in word for term in terms)), 0)
+    start = max(first - width // 3, 0)
+    window = words[start:start + width]
+    marked = [
+        f"<mark>{html.escape(word)}</mark>" if any(term in word.lower() for term in terms) else html.escape(word)
+        for word in window
+    ]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(words) else ""
+    return prefix + " ".join(marked) + suffix
+
+
+class SearchBackend(ABC):
+    """Dialect-specific storage and querying of the message search index"""
+
+    table = SEARCH_TABLE
+    # DDL run by ensure_search_schema for create_all setups, migrations create it otherwise
+    schema: str = ""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @abstractmethod
+    def insert(self, rows: List[dict], new: bool = False):
+        """Index rows, replacing existing entries for their messages unless `new` says there are none"""
+
+    @abstractmethod
+    def query(self, user_id: int, terms: List[str], language_id: Optional[int], limit: int, offset: int) -> List[dict]:
+        """Messages matching any of the terms, those matching more or rarer terms first"""
+
+    def delete_user(self, user_id: int):
+        self.db.exec(text(f"DELETE FROM {self.table} WHERE user_id = :user_id"), params={"user_id": user_id})
+
+    def delete_messages_before(self, lower_id: int, upper_id: int, cutoff: datetime):
+        self.db.exec(
+            text(
+                f"DELETE FROM {self.table} WHERE message_id > :lower AND message_id <= :upper AND created_at < :cutoff"
+            ),
+            params={"lower": lower_id, "upper": upper_id, "cutoff": cutoff}
+        )
+
+
+class MySQLSearchBackend(SearchBackend):
+    """InnoDB FULLTEXT index, ranked with MATCH ... AGAINST in natural language mode"""
+
+    schema = f"""
+        CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+            message_id INT NOT NULL PRIMARY KEY,
+            session_id INT NOT NULL,
+            user_id INT NOT NULL,
+            language_id INT NOT NULL,
+            created_at DATETIME NULL,
+            content TEXT NOT NULL,
+            INDEX ix_message_search_user_language (user_id, language_id),
+            FULLTEXT INDEX ft_message_search_content (content)
+        ) ENGINE=InnoDB
+    """
+
+    def insert(self, rows: List[dict], new: bool = False):
+        self.db.exec(
+            text(f"""
+                INSERT INTO {self.table} (message_id, session_id, user_id, language_id, created_at, content)
+                VALUES (:message_id, :session_id, :user_id, :language_id, :created_at, :content)
+                ON DUPLICATE KEY UPDATE content = VALUES(content)
+            """),
+            params=rows
+        )
+
+    def query(self, user_id: int, terms: List[str], language_id: Optional[int], limit: int, offset: int) -> List[dict]:
+        language_filter = "AND language_id = :language_id" if language_id is not None else ""
+        result = self.db.exec(
+            text(f"""
+                SELECT message_id, session_id, language_id, created_at, content,
+                       MATCH(content) AGAINST (:query IN NATURAL LANGUAGE MODE) AS score
+                FROM {self.table}
+                WHERE user_id = :user_id {language_filter}
+                  AND MATCH(content) AGAINST (:query IN NATURAL LANGUAGE MODE)
+                ORDER BY score DESC, message_id DESC
+                LIMIT :limit OFFSET :offset
+            """),
+            params={"query": " ".join(terms), "user_id": user_id, "language_id": language_id, "limit": limit, "offset": offset}
+        )
+        return [
+            {**row._mapping, "snippet": make_snippet(row.content, terms)}
+            for row in result
+        ]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 virtual table, ranked with bm25 (lower is better, so negated)"""
+
+    schema = f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+            content,
+            message_id UNINDEXED,
+            session_id UNINDEXED,
+            user_id UNINDEXED,
+            language_id UNINDEXED,
+            created_at UNINDEXED,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )
+    """
+
+    def insert(self, rows: List[dict], new: bool = False):
+        # FTS5 has no upsert, replace any existing row for the message. message_id is not
+        # indexed, so each delete scans the table, skipped for messages never indexed before
+        if not new:
+            self.db.exec(
+                text(f"DELETE FROM {self.table} WHERE message_id = :message_id"),
+                params=[{"message_id": row["message_id"]} for row in rows]
+            )
+        self.db.exec(
+            text(f"""
+                INSERT INTO {self.table} (content, message_id, session_id, user_id, language_id, created_at)
+                VALUES (:content, :message_id, :session_id, :user_id, :language_id, :created_at)
+            """),
+            params=rows
+        )
+
+    def query(self, user_id: int, terms: List[str], language_id: Optional[int], limit: int, offset: int) -> List[dict]:
+        language_filter = "AND language_id = :language_id" if language_id is not None else ""
+        result = self.db.exec(
+            text(f"""
+                SELECT message_id, session_id, language_id, created_at, content,
+                       snippet({self.table}, 0, :mark_start, :mark_end, '…', 12) AS snippet,
+                       -bm25({self.table}) AS score
+                FROM {self.table}
+                WHERE {self.table} MATCH :query AND user_id = :user_id {language_filter}
+                ORDER BY bm25({self.table}), message_id DESC
+                LIMIT :limit OFFSET :offset
+            """),
+            params={
+                # Quote each term so user input can't use FTS5 query syntax
+                "query": " OR ".join(f'"{term}"' for term in terms),
+                "user_id": user_id, "language_id": language_id, "limit": limit, "offset": offset,
+                "mark_start": MARK_START, "mark_end": MARK_END
+            }
+        )
+        rows = []
+        for row in result:
+            data = dict(row._mapping)
+            # The content is the user's own text, escape it before adding the tags
+            data["snippet"] = html.escape(data["snippet"]).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+            if isinstance(data["created_at"], str):
+                data["created_at"] = datetime.fromisoformat(data["created_at"])
+            rows.append(data)
+        return rows
+
+
+BACKENDS = {
+    "mysql": MySQLSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def ensure_search_schema(engine):
+    """Create the search table if missing, for setups that don't run migrations"""
+    backend = BACKENDS.get(engine.dialect.name)
+    if backend is None:
+        return
+    with engine.begin() as connection:
+        connection.execute(text(backend.schema))
+
+
+class SearchService:
+    def __init__(self, db: Session):
+        self.db = db
+        dialect = db.get_bind().dialect.name
+        if dialect not in BACKENDS:
+            raise ValueError(f"Full-text search is not supported on {dialect}")
+        self.backend = BACKENDS[dialect](db)
+
+    def index_messages(self, messages: Iterable[Message], session: Optional[ConversationSession] = None, new: bool = False):
+        """Add messages to the search index in the caller's transaction, `new` when they were just inserted"""
+        messages = list(messages)
+        if not messages:
+            return
+        sessions = {session.id: session} if session is not None else {}
+        missing = {message.session_id for message in messages} - sessions.keys()
+        if missing:
+            sessions.update(
+                (s.id, s) for s in self.db.exec(select(ConversationSession).where(ConversationSession.id.in_(missing))).all()
+            )
+
+        rows = [
+            {
+                "message_id": message.id,
+                "session_id": message.session_id,
+                "user_id": sessions[message.session_id].user_id,
+                "language_id": sessions[message.session_id].target_language_id,
+                "created_at": message.created_at,
+                "content": message.content
+            }
+            for message in messages
+            if message.session_id in sessions
+        ]
+        if rows:
+            self.backend.insert(rows, new=new)
+
+    def reindex_all(self, batch_size: int = 1000) -> int:
+        """Backfill the index from the messages table, returns how many messages were indexed"""
+        indexed, last_id = 0, 0
+        while True:
+            messages = self.db.exec(
+                select(Message).where(Message.id > last_id).order_by(Message.id).limit(batch_size)
+            ).all()
+            if not messages:
+                return indexed
+            self.index_messages(messages)
+            self.db.commit()
+            indexed += len(messages)
+            last_id = messages[-1].id
+
+    def search(self, user_id: int, query: str, language_id: Optional[int] = None, limit: int = 20, offset: int = 0) -> SearchResults:
+        """Ranked matches from a user's own messages"""
+        terms = query_terms(query)
+        if not terms:
+            return SearchResults(query=query, results=[], limit=limit, offset=offset, has_more=False)
+
+        # Fetch one extra row to know whether there is another page
+        rows = self.backend.query(user_id, terms, language_id, limit + 1, offset)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        session_ids = {row["session_id"] for row in rows}
+        titles = dict(self.db.exec(
+            select(ConversationSession.id, ConversationSession.title).where(ConversationSession.id.in_(session_ids))
+        ).all()) if session_ids else {}
+
+        return SearchResults(
+            query=query,
+            results=[
+                SearchHit(
+                    message_id=row["message_id"],
+                    session_id=row["session_id"],
+                    session_title=titles.get(row["session_id"]),
+                    language_id=row["language_id"],
+                    snippet=row["snippet"],
+                    score=float(row["score"]),
+                    created_at=row["created_at"]
+                )
+                for row in rows
+            ],
+            limit=limit,
+            offset=offset,
+            has_more=has_more
+        )
+
+    def remove_user(self, user_id: int):
+        """Drop a user's rows from the index in the caller's transaction"""
+        self.backend.delete_user(user_id)
+
+    def remove_messages_before(self, lower_id: int, upper_id: int, cutoff: datetime):
+        """Drop index rows for messages in (lower_id, upper_id] created before `cutoff`"""
+        self.backend.delete_messages_before(lower_id, upper_id, cutoff)
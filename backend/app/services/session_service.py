@@ -1,40 +1,95 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy import and_, desc
-from typing import Optional, List
+from typing import Optional, List, Callable, TypeVar
 from datetime import datetime, timedelta
 import json
 
-from ..models.session import ConversationSession, SessionStatus
-from ..models.user import User
-from ..schemas.session import SessionCreate, SessionUpdate
+from ..models.session import ConversationSession, SessionStatus, ConversationSessionCreate, ConversationSessionUpdate
+from ..models.message import Message, MessageBase, MessageUpdate, MessageType
+from ..core.config import settings
+from ..models.language import Language, UserLanguage
+
+T = TypeVar("T")
+
+class SessionConflictError(Exception):
+    """The session was changed by another request since it was read"""
 
 class SessionService:
+    """Session updates are compare-and-swap on ConversationSession.version. Changes that
+    can be redone on a fresh read (counters, status transitions) are retried when another
+    request wins the race, user edits of the session raise SessionConflictError instead."""
+    
     def __init__(self, db: Session):
         self.db = db
     
-    def create_session(self, user_id: int, session_data: SessionCreate) -> ConversationSession:
+    def _retry_on_conflict(self, operation: Callable[[], T]) -> T:
+        """Run a read-modify-write of a session, redoing it from a fresh read if a concurrent update wins"""
+        for attempt in range(settings.session_update_retries + 1):
+            try:
+                return operation()
+            except StaleDataError:
+                self.db.rollback()
+        raise SessionConflictError("Session is being updated concurrently, try again")
+    
+    def _commit_edit(self, db_session: ConversationSession, expected_version: Optional[int]):
+        """Commit an edit only if the session is still at the version the client edited"""
+        if expected_version is not None and expected_version != db_session.version:
+            self.db.rollback()
+            raise SessionConflictError("Session has changed since it was read")
+        try:
+            self.db.commit()
+        except StaleDataError:
+            self.db.rollback()
+            raise SessionConflictError("Session has changed since it was read")
+    
+    def create_session(self, user_id: int, session_data: ConversationSessionCreate) -> ConversationSession:
         """Create a new conversation session"""
-        # Get user to determine target language
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise ValueError("User not found")
+        from .difficulty_service import DifficultyService
+        
+        language_id = self._resolve_target_language(user_id, session_data)
+        
+        # Let the difficulty engine pick the level unless the learner chose one
+        difficulty_service = DifficultyService(self.db)
+        difficulty_level = session_data.difficulty_level or difficulty_service.recommend(user_id, language_id).recommended_level
         
         db_session = ConversationSession(
             user_id=user_id,
             title=session_data.title,
             topic=session_data.topic,
-            difficulty_level=session_data.difficulty_level,
-            target_language=user.target_language,
+            difficulty_level=difficulty_level,
+            target_language_id=language_id,
             conversation_context=session_data.conversation_context,
             status=SessionStatus.ACTIVE,
             started_at=datetime.utcnow()
         )
         
         self.db.add(db_session)
+        difficulty_service.start_session(user_id, language_id, difficulty_level)
         self.db.commit()
         self.db.refresh(db_session)
         return db_session
     
+    def _resolve_target_language(self, user_id: int, session_data: ConversationSessionCreate) -> int:
+        """Target language id from the request, its language code, or the user's current language"""
+        if session_data.target_language_id is not None:
+            language = self.db.get(Language, session_data.target_language_id)
+            if not language:
+                raise ValueError("Language not found")
+            return language.id
+        if session_data.target_language_code:
+            language = self.db.query(Language).filter(Language.code == session_data.target_language_code).first()
+            if not language:
+                raise ValueError("Language not found")
+            return language.id
+        
+        current = self.db.query(UserLanguage).filter(
+            UserLanguage.user_id == user_id
+        ).order_by(desc(UserLanguage.is_current), desc(UserLanguage.last_practiced_at)).first()
+        if not current:
+            raise ValueError("No target language given and the user has none")
+        return current.language_id
+    
     def get_session_by_id(self, session_id: int) -> Optional[ConversationSession]:
         """Get session by ID"""
         return self.db.query(ConversationSession).filter(
@@ -56,6 +111,17 @@ class SessionService:
             ConversationSession.user_id == user_id
         ).order_by(desc(ConversationSession.created_at)).offset(offset).limit(limit).all()
     
+    def get_session_messages(self, session_id: int) -> List[Message]:
+        """Get all messages for a session in conversation order"""
+        db_session = self.get_session_by_id(session_id)
+        if db_session and db_session.archived_at is not None:
+            from .archive_service import ArchiveService
+            return ArchiveService(self.db).get_archived_messages(db_session)
+        
+        return self.db.query(Message).filter(
+            Message.session_id == session_id
+        ).order_by(Message.created_at, Message.id).all()
+    
     def get_active_sessions(self, user_id: int) -> List[ConversationSession]:
         """Get active sessions for a user"""
         return self.db.query(ConversationSession).filter(
@@ -65,22 +131,27 @@ class SessionService:
             )
         ).order_by(desc(ConversationSession.updated_at)).all()
     
-    def update_session(self, session_id: int, user_id: int, session_data: SessionUpdate) -> Optional[ConversationSession]:
-        """Update session information"""
+    def update_session(self, session_id: int, user_id: int, session_data: ConversationSessionUpdate) -> Optional[ConversationSession]:
+        """Update session information, raises SessionConflictError if the session changed meanwhile"""
         db_session = self.get_user_session(session_id, user_id)
         if not db_session:
             return None
         
-        update_data = session_data.dict(exclude_unset=True)
+        update_data = session_data.model_dump(exclude_unset=True)
+        expected_version = update_data.pop("version", None)
         for field, value in update_data.items():
             setattr(db_session, field, value)
+        db_session.updated_at = datetime.utcnow()
         
-        self.db.commit()
+        self._commit_edit(db_session, expected_version)
         self.db.refresh(db_session)
         return db_session
     
     def end_session(self, session_id: int, user_id: int) -> Optional[ConversationSession]:
-        """End a session and calculate duration"""
+        """End a session, calculate duration and queue its summary feedback"""
+        return self._retry_on_conflict(lambda: self._end_session(session_id, user_id))
+    
+    def _end_session(self, session_id: int, user_id: int) -> Optional[ConversationSession]:
         db_session = self.get_user_session(session_id, user_id)
         if not db_session:
             return None
@@ -88,50 +159,180 @@ class SessionService:
         now = datetime.utcnow()
         db_session.status = SessionStatus.COMPLETED
         db_session.ended_at = now
+        db_session.updated_at = now
         
         # Calculate duration if started_at is available
         if db_session.started_at:
             duration = now - db_session.started_at
             db_session.duration_minutes = duration.total_seconds() / 60
         
+        # Summarised in the background, ending a session never waits for the LLM
+        if db_session.user_message_count:
+            from .summary_service import SummaryService
+            SummaryService(self.db).enqueue(db_session)
+        
         self.db.commit()
         self.db.refresh(db_session)
         return db_session
     
     def pause_session(self, session_id: int, user_id: int) -> Optional[ConversationSession]:
         """Pause a session"""
-        db_session = self.get_user_session(session_id, user_id)
-        if not db_session:
-            return None
-        
-        db_session.status = SessionStatus.PAUSED
-        self.db.commit()
-        self.db.refresh(db_session)
-        return db_session
+        return self._retry_on_conflict(lambda: self._set_status(session_id, user_id, SessionStatus.PAUSED))
     
     def resume_session(self, session_id: int, user_id: int) -> Optional[ConversationSession]:
         """Resume a paused session"""
+        return self._retry_on_conflict(lambda: self._set_status(session_id, user_id, SessionStatus.ACTIVE))
+    
+    def _set_status(self, session_id: int, user_id: int, session_status: SessionStatus) -> Optional[ConversationSession]:
         db_session = self.get_user_session(session_id, user_id)
         if not db_session:
             return None
         
-        db_session.status = SessionStatus.ACTIVE
+        db_session.status = session_status
+        db_session.updated_at = datetime.utcnow()
         self.db.commit()
         self.db.refresh(db_session)
         return db_session
     
-    def update_conversation(self, session_id: int, conversation_data: List[dict]) -> bool:
-        """Update the full conversation data for a session"""
+    def update_conversation(self, session_id: int, conversation_data: List[dict], expected_version: Optional[int] = None) -> bool:
+        """Replace the full conversation data of a session, raises SessionConflictError if it changed meanwhile"""
         db_session = self.get_session_by_id(session_id)
         if not db_session:
             return False
         
         db_session.full_conversation = json.dumps(conversation_data)
-        self.db.commit()
+        db_session.updated_at = datetime.utcnow()
+        self._commit_edit(db_session, expected_version)
         return True
     
+    def add_message(self, session_id: int, user_id: int, message_data: MessageBase) -> Optional[Message]:
+        """Add a message to a session, updating counters and the search index"""
+        return self._retry_on_conflict(lambda: self._add_message(session_id, user_id, message_data))
+    
+    def _add_message(self, session_id: int, user_id: int, message_data: MessageBase) -> Optional[Message]:
+        db_session = self.get_user_session(session_id, user_id)
+        if not db_session:
+            return None
+        
+        message = Message(
+            session_id=session_id,
+            content=message_data.content,
+            message_type=message_data.message_type
+        )
+        self._apply_text_metrics(message, db_session)
+        self.db.add(message)
+        
+        db_session.message_count += 1
+        if message.message_type == MessageType.USER:
+            db_session.user_message_count += 1
+            self._detect_language(message, db_session)
+        db_session.updated_at = datetime.utcnow()
+        
+        # Flush for the message id, then index in the same transaction
+        self.db.flush()
+        if message.message_type != MessageType.SYSTEM:
+            from .search_service import SearchService
+            SearchService(self.db).index_messages([message], db_session, new=True)
+        if message.message_type == MessageType.USER and message.complexity_score is not None:
+            from .difficulty_service import DifficultyService
+            DifficultyService(self.db).observe(
+                db_session.user_id, db_session.target_language_id, complexity=message.complexity_score
+            )
+        
+        self.db.commit()
+        self.db.refresh(message)
+        return message
+    
+    def _detect_language(self, message: Message, db_session: ConversationSession):
+        """Flag a user message not written in the session's target language and count it on the session"""
+        if not settings.langid_enabled:
+            return
+        from ..utils import langid
+        
+        # Undo this message's previous contribution when its content changed
+        if message.in_target_language is not None:
+            db_session.language_checked_count -= 1
+            db_session.target_language_count -= int(message.in_target_language)
+        message.detected_language = message.in_target_language = None
+        
+        language = self.db.get(Language, db_session.target_language_id)
+        target_code = language.code.lower().replace("_", "-").split("-")[0] if language else None
+        identifier = langid.get_identifier(settings.langid_model_path)
+        if identifier is None or not target_code or not identifier.covers(target_code):
+            return
+        detection = identifier.detect(message.content)
+        if detection is None:
+            return
+        
+        message.detected_language = detection.code
+        message.in_target_language = detection.code == target_code or detection.confidence < settings.langid_min_confidence
+        db_session.language_checked_count += 1
+        db_session.target_language_count += int(message.in_target_language)
+    
+    def _apply_text_metrics(self, message: Message, db_session: ConversationSession):
+        """Fill in word and character counts, and complexity for user messages"""
+        from ..utils import text_metrics
+        
+        language = self.db.get(Language, db_session.target_language_id)
+        metrics = text_metrics.compute(message.content, language.code if language else "")
+        message.word_count = metrics.word_count
+        message.character_count = metrics.character_count
+        if message.message_type == MessageType.USER:
+            message.complexity_score = metrics.complexity_score
+    
+    def update_message(self, session_id: int, user_id: int, message_id: int, message_data: MessageUpdate) -> Optional[Message]:
+        """Update a message or its analysis, keeping error counters, review items and the search index in step"""
+        return self._retry_on_conflict(lambda: self._update_message(session_id, user_id, message_id, message_data))
+    
+    def _update_message(self, session_id: int, user_id: int, message_id: int, message_data: MessageUpdate) -> Optional[Message]:
+        db_session = self.get_user_session(session_id, user_id)
+        if not db_session:
+            return None
+        message = self.db.get(Message, message_id)
+        if not message or message.session_id != session_id:
+            return None
+        
+        update_data = message_data.model_dump(exclude_unset=True)
+        if update_data.get("content") is not None and update_data["content"] != message.content:
+            message.content = update_data["content"]
+            self._apply_text_metrics(message, db_session)
+            if message.message_type == MessageType.USER:
+                self._detect_language(message, db_session)
+            if message.message_type != MessageType.SYSTEM:
+                from .search_service import SearchService
+                SearchService(self.db).index_messages([message], db_session)
+        if "detected_errors" in update_data:
+            from .analytics_service import AnalyticsService
+            old_errors = message.get_detected_errors()
+            message.set_detected_errors(update_data["detected_errors"])
+            AnalyticsService(self.db).record_errors(
+                db_session.user_id, db_session.target_language_id,
+                (message.created_at or datetime.utcnow()).date(),
+                old_errors, message.get_detected_errors()
+            )
+        if "corrections" in update_data:
+            from .review_service import ReviewService, annotate_corrections
+            message.set_corrections(annotate_corrections(update_data["corrections"] or []))
+            ReviewService(self.db).add_message_corrections(message, db_session)
+        if "complexity_score" in update_data:
+            message.complexity_score = update_data["complexity_score"]
+            if message.complexity_score is not None and message.message_type == MessageType.USER:
+                from .difficulty_service import DifficultyService
+                DifficultyService(self.db).observe(
+                    db_session.user_id, db_session.target_language_id, complexity=message.complexity_score
+                )
+        
+        self.db.add(message)
+        db_session.updated_at = datetime.utcnow()
+        self.db.commit()
+        self.db.refresh(message)
+        return message
+    
     def increment_message_count(self, session_id: int, is_user_message: bool = False) -> bool:
         """Increment message counters for a session"""
+        return self._retry_on_conflict(lambda: self._increment_message_count(session_id, is_user_message))
+    
+    def _increment_message_count(self, session_id: int, is_user_message: bool) -> bool:
         db_session = self.get_session_by_id(session_id)
         if not db_session:
             return False
@@ -139,10 +340,32 @@ class SessionService:
         db_session.message_count += 1
         if is_user_message:
             db_session.user_message_count += 1
+        db_session.updated_at = datetime.utcnow()
         
         self.db.commit()
         return True
     
+    def pause_stale_sessions(self, idle_minutes: int) -> int:
+        """Pause active sessions with no activity for `idle_minutes`, returns how many"""
+        now = datetime.utcnow()
+        cutoff = now - timedelta(minutes=idle_minutes)
+        paused = self.db.query(ConversationSession).filter(
+            and_(
+                ConversationSession.status == SessionStatus.ACTIVE,
+                ConversationSession.updated_at < cutoff
+            )
+        ).update(
+            {
+                ConversationSession.status: SessionStatus.PAUSED,
+                ConversationSession.updated_at: now,
+                # Bulk updates bypass the mapper, bump the version so in-flight updates notice
+                ConversationSession.version: ConversationSession.version + 1
+            },
+            synchronize_session=False
+        )
+        self.db.commit()
+        return paused
+    
     def get_session_statistics(self, user_id: int, days: int = 30) -> dict:
         """Get session statistics for a user over a period"""
         start_date = datetime.utcnow() - timedelta(days=days)
@@ -176,6 +399,8 @@ class SessionService:
     
     def parse_conversation(self, session: ConversationSession) -> List[dict]:
         """Parse conversation JSON data"""
+        if session.archived_at is not None:
+            return session.get_conversation()
         if not session.full_conversation:
             return []
         try:
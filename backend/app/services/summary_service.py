@@ -0,0 +1,265 @@
+from sqlmodel import Session, select
+from sqlalchemy import update
+from typing import Optional, List, Dict, Any, Callable, Tuple
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+import asyncio
+import json
+import uuid
+
+from ..core.config import settings
+from ..models.session import ConversationSession
+from ..models.message import Message, MessageType
+from ..models.feedback import Feedback, FeedbackType
+from ..models.language import Language
+from ..models.summary import SummaryJob, SummaryStatus
+from ..utils.tokenizer import vocabulary_tokens
+from ..utils.logger import get_logger
+from .analytics_service import error_types
+
+logger = get_logger()
+
+# Running jobs not finished after this long belong to a worker that died
+STALE_AFTER = timedelta(minutes=10)
+
+SUMMARY_PROMPT = (
+    "You are a {language} teacher. Below is a learner's practice conversation and the errors "
+    "detected in their messages. Reply with a JSON object only, with keys: grammar_score, "
+    "vocabulary_score, fluency_score, overall_score (0-100 numbers), summary (two or three "
+    "sentences addressed to the learner, in English) and recommended_practice (up to three short items)."
+)
+
+
+def _errors(raw: Optional[str]) -> List[Dict[str, Any]]:
+    try:
+        errors = json.loads(raw) if raw else []
+    except json.JSONDecodeError:
+        return []
+    return errors if isinstance(errors, list) else []
+
+
+def _clamp(value: float) -> float:
+    return round(min(max(value, 0.0), 100.0), 1)
+
+
+def offline_summary(messages: List[Dict[str, Any]], language_code: str) -> Dict[str, Any]:
+    """Scores and advice from message metrics and detected errors alone, no LLM needed"""
+    user_messages = [message for message in messages if message["message_type"] == MessageType.USER]
+    words = sum(message["word_count"] or 0 for message in user_messages)
+    errors = Counter()
+    tokens: List[str] = []
+    for message in user_messages:
+        errors.update(error_types(_errors(message["detected_errors"])))
+        tokens.extend(vocabulary_tokens(message["content"], language_code))
+
+    # Grammar: errors per word, one error every ten words scores zero
+    grammar = 100 * (1 - min(sum(errors.values()) / max(words, 1) * 10, 1))
+    # Vocabulary: lexical variety and the complexity rating of the messages
+    complexities = [message["complexity_score"] for message in user_messages if message["complexity_score"]]
+    variety = len(set(tokens)) / len(tokens) if tokens else 0
+    vocabulary = 50 * variety + 5 * (sum(complexities) / len(complexities) if complexities else 5)
+    # Fluency: how much the learner wrote per turn, and whether it was in the target language
+    average_words = words / len(user_messages) if user_messages else 0
+    checked = [message["in_target_language"] for message in user_messages if message["in_target_language"] is not None]
+    on_target = sum(checked) / len(checked) if checked else 1
+    fluency = 70 * min(average_words / 12, 1) + 30 * on_target
+
+    practice = [f"Review your {error_type} mistakes" for error_type, _ in errors.most_common(2)]
+    if on_target < 0.8:
+        practice.append("Write more of your replies in the target language")
+    if average_words < 6:
+        practice.append("Try answering in longer, complete sentences")
+
+    scores = {"grammar_score": _clamp(grammar), "vocabulary_score": _clamp(vocabulary), "fluency_score": _clamp(fluency)}
+    scores["overall_score"] = _clamp(sum(scores.values()) / 3)
+    top_errors = ", ".join(error_type for error_type, _ in errors.most_common(3))
+    summary = (
+        f"You wrote {len(user_messages)} messages ({words} words). "
+        + (f"Your most frequent mistakes were: {top_errors}." if errors else "No mistakes were detected.")
+    )
+    return {**scores, "summary": summary, "recommended_practice": practice[:3]}
+
+
+class SummaryService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, session: ConversationSession):
+        """Queue a summary for an ended session, in the caller's transaction"""
+        if self.db.exec(select(SummaryJob.id).where(SummaryJob.session_id == session.id)).first() is None:
+            self.db.add(SummaryJob(session_id=session.id, user_id=session.user_id))
+
+    def get_status(self, session_id: int) -> Optional[SummaryStatus]:
+        job = self.db.exec(select(SummaryJob).where(SummaryJob.session_id == session_id)).first()
+        if job is None:
+            return None
+        return SummaryStatus(session_id=session_id, status=job.status, feedback_id=job.feedback_id)
+
+    async def process_batch(self, batch_size: Optional[int] = None) -> int:
+        """Summarise up to `batch_size` queued sessions concurrently, returns how many jobs were handled.
+
+        Database work runs in worker threads so that only the LLM calls run on the event loop.
+        """
+        jobs, sessions, messages = await asyncio.to_thread(self._load_batch, batch_size or settings.summary_batch_size)
+        if not jobs:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._summarise(job, sessions.get(job.session_id), messages[job.session_id]) for job in jobs),
+            return_exceptions=True
+        )
+        await asyncio.to_thread(self._finish_batch, jobs, sessions, results)
+        return len(jobs)
+
+    def _load_batch(self, batch_size: int) -> Tuple[List[SummaryJob], Dict[int, Any], Dict[int, List[Dict[str, Any]]]]:
+        """Claim a batch of jobs and read their sessions and messages"""
+        jobs = self._claim(batch_size)
+        if not jobs:
+            return [], {}, {}
+
+        session_ids = [job.session_id for job in jobs]
+        sessions = {
+            session.id: (session, code, name)
+            for session, code, name in self.db.exec(
+                select(ConversationSession, Language.code, Language.name)
+                .join(Language, Language.id == ConversationSession.target_language_id)
+                .where(ConversationSession.id.in_(session_ids))
+            ).all()
+        }
+        # Every message of every session in the batch, with its analysis, in one query
+        messages = defaultdict(list)
+        for row in self.db.exec(
+            select(
+                Message.session_id, Message.message_type, Message.content, Message.word_count,
+                Message.complexity_score, Message.detected_errors, Message.in_target_language
+            )
+            .where(Message.session_id.in_(session_ids))
+            .order_by(Message.session_id, Message.id)
+        ).all():
+            messages[row.session_id].append(dict(row._mapping))
+        # Give the connection back while the LLM answers, the loaded objects stay usable detached
+        self.db.close()
+        return jobs, sessions, messages
+
+    def _finish_batch(self, jobs: List[SummaryJob], sessions: Dict[int, Any], results: List[Any]):
+        for job, result in zip(jobs, results):
+            self._finish(job, sessions.get(job.session_id), result)
+        self.db.commit()
+
+    def _claim(self, batch_size: int) -> List[SummaryJob]:
+        now, token = datetime.utcnow(), uuid.uuid4().hex
+        self.db.exec(
+            update(SummaryJob)
+            .where(SummaryJob.status == "running", SummaryJob.started_at < now - STALE_AFTER)
+            .values(status="pending")
+        )
+        ids = self.db.exec(
+            select(SummaryJob.id)
+            .where(SummaryJob.status == "pending", SummaryJob.available_at <= now)
+            .order_by(SummaryJob.available_at)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            self.db.commit()
+            return []
+        # Only jobs still pending are taken, in case a CLI run overlaps the scheduled one
+        self.db.exec(
+            update(SummaryJob)
+            .where(SummaryJob.id.in_(ids), SummaryJob.status == "pending")
+            .values(status="running", started_at=now, attempts=SummaryJob.attempts + 1, claim_token=token)
+        )
+        self.db.commit()
+        return self.db.exec(select(SummaryJob).where(SummaryJob.claim_token == token)).all()
+
+    async def _summarise(self, job: SummaryJob, session_row, messages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Summary fields for one session, None when there is nothing to summarise"""
+        if session_row is None or not any(message["message_type"] == MessageType.USER for message in messages):
+            return None
+        session, language_code, language_name = session_row
+
+        # Use the LLM while it is available and the user has quota, otherwise summarise offline
+        if settings.openai_api_key is not None and job.attempts <= settings.summary_max_attempts:
+            from .usage_service import QuotaExceededError
+
+            try:
+                await asyncio.to_thread(self._usage, lambda usage: usage.check_quota(session.user_id))
+            except QuotaExceededError:
+                return offline_summary(messages, language_code)
+            return await self._llm_summary(session, language_name, messages)
+        return offline_summary(messages, language_code)
+
+    async def _llm_summary(self, session: ConversationSession, language_name: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        from ..core.llm import get_llm_client
+
+        transcript = "\n".join(
+            f"{message['message_type'].value}: {message['content']}"
+            + (f"  [errors: {message['detected_errors']}]" if message["detected_errors"] else "")
+            for message in messages
+            if message["message_type"] != MessageType.SYSTEM
+        )
+        response = await get_llm_client().chat(
+            [
+                {"role": "system", "content": SUMMARY_PROMPT.format(language=language_name)},
+                {"role": "user", "content": transcript[-12000:]},
+            ],
+            temperature=0.2,
+            response_format={"type": "json_object"}
+        )
+        await asyncio.to_thread(self._usage, lambda usage: usage.record(session.user_id, response.get("usage")))
+        data = json.loads(response["choices"][0]["message"]["content"])
+        summary = {
+            field: _clamp(float(data[field]))
+            for field in ("grammar_score", "vocabulary_score", "fluency_score", "overall_score")
+        }
+        summary["summary"] = str(data.get("summary") or "")
+        summary["recommended_practice"] = [str(item) for item in data.get("recommended_practice") or []][:3]
+        return summary
+
+    def _usage(self, call: Callable[[Any], Any]) -> Any:
+        """Run `call` on a UsageService with a session of its own, as the jobs of a batch use it from concurrent threads"""
+        from .usage_service import UsageService
+
+        with Session(self.db.get_bind()) as db:
+            return call(UsageService(db))
+
+    def _finish(self, job: SummaryJob, session_row, result):
+        """Store the outcome of one job in the batch's transaction"""
+        now = datetime.utcnow()
+        if isinstance(result, BaseException):
+            job.last_error = f"{type(result).__name__}: {result}"[:500]
+            # Retried with backoff, the last attempt is summarised offline and cannot fail on the LLM
+            job.status = "pending" if job.attempts <= settings.summary_max_attempts else "failed"
+            job.available_at = now + timedelta(seconds=30 * 2 ** job.attempts)
+            logger.warning(f"Summary of session {job.session_id} failed: {job.last_error}")
+        elif result is None:
+            job.status = "skipped"
+        else:
+            from .difficulty_service import DifficultyService
+
+            session = session_row[0]
+            feedback = Feedback(
+                user_id=session.user_id,
+                session_id=session.id,
+                feedback_type=FeedbackType.SESSION_SUMMARY,
+                title=f"Summary: {session.title}"[:200],
+                content=result["summary"],
+                grammar_score=result["grammar_score"],
+                vocabulary_score=result["vocabulary_score"],
+                fluency_score=result["fluency_score"],
+                overall_score=result["overall_score"],
+            )
+            feedback.set_recommended_practice(result["recommended_practice"])
+            DifficultyService(self.db).record_feedback(feedback, session.target_language_id)
+            self.db.add(feedback)
+            self.db.flush()
+            job.feedback_id = feedback.id
+            job.status = "done"
+            # A new ETag tells clients polling the session that the summary is in. Written
+            # without a version check so a concurrent turn never fails the whole batch
+            self.db.exec(
+                update(ConversationSession)
+                .where(ConversationSession.id == session.id)
+                .values(updated_at=now, version=ConversationSession.version + 1)
+            )
+        job.finished_at = now
+        self.db.add(job)
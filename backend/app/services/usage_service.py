@@ -0,0 +1,60 @@
+from sqlmodel import Session
+from typing import Optional, Dict, Any
+from datetime import datetime
+
+from ..core.config import settings
+from ..models.usage import LLMUsage, LLMUsageRead
+from ..db.upsert import upsert
+
+
+class QuotaExceededError(Exception):
+    """The user has spent today's LLM token allowance"""
+
+
+class UsageService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def check_quota(self, user_id: int):
+        """Raise QuotaExceededError if the user may not start another LLM call today"""
+        quota = settings.llm_daily_token_quota
+        if quota is None:
+            return
+        usage = self.db.get(LLMUsage, (user_id, datetime.utcnow().date()))
+        if usage is not None and usage.prompt_tokens + usage.completion_tokens >= quota:
+            raise QuotaExceededError(f"Daily LLM token quota of {quota} reached")
+
+    def record(self, user_id: int, usage: Optional[Dict[str, Any]]):
+        """Add one call's token usage (the provider's "usage" object) to today's total"""
+        usage = usage or {}
+        upsert(
+            self.db, LLMUsage,
+            [{
+                "user_id": user_id, "day": datetime.utcnow().date(), "requests": 1,
+                "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+                "completion_tokens": int(usage.get("completion_tokens") or 0)
+            }],
+            ["user_id", "day"],
+            lambda existing, incoming, dialect: {
+                "requests": existing.requests + incoming.requests,
+                "prompt_tokens": existing.prompt_tokens + incoming.prompt_tokens,
+                "completion_tokens": existing.completion_tokens + incoming.completion_tokens
+            }
+        )
+        self.db.commit()
+
+    def get_today(self, user_id: int) -> LLMUsageRead:
+        """Today's usage and what is left of the quota"""
+        today = datetime.utcnow().date()
+        usage = self.db.get(LLMUsage, (user_id, today)) or LLMUsage(user_id=user_id, day=today)
+        total = usage.prompt_tokens + usage.completion_tokens
+        quota = settings.llm_daily_token_quota
+        return LLMUsageRead(
+            day=today,
+            requests=usage.requests,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=total,
+            daily_quota=quota,
+            remaining_tokens=max(quota - total, 0) if quota is not None else None
+        )
@@ -7,6 +7,7 @@ import json
 from ..models.user import User, UserCreate, UserUpdate
 from ..models.language import Language, UserLanguage
 from ..core.security import get_password_hash, verify_password
+from ..core.token_versions import token_versions, revoke
 
 class UserService:
     def __init__(self, db: Session):
@@ -142,9 +143,36 @@ class UserService:
         
         db_user.is_active = False
         db_user.updated_at = datetime.utcnow()
-        self.db.add(db_user)
+        revoke(self.db, db_user)
+        self.db.commit()
+        self.db.refresh(db_user)
+        token_versions.record(db_user.id, db_user.token_version)
+        return db_user
+    
+    def change_password(self, user_id: int, current_password: str, new_password: str) -> Optional[User]:
+        """Set a new password and revoke all tokens, None if the current password is wrong"""
+        db_user = self.get_user_by_id(user_id)
+        if not db_user or not verify_password(current_password, db_user.hashed_password):
+            return None
+        
+        db_user.hashed_password = get_password_hash(new_password)
+        db_user.updated_at = datetime.utcnow()
+        revoke(self.db, db_user)
+        self.db.commit()
+        self.db.refresh(db_user)
+        token_versions.record(db_user.id, db_user.token_version)
+        return db_user
+    
+    def revoke_tokens(self, user_id: int) -> Optional[User]:
+        """Log the user out everywhere by revoking every access token issued so far"""
+        db_user = self.get_user_by_id(user_id)
+        if not db_user:
+            return None
+        
+        revoke(self.db, db_user)
         self.db.commit()
         self.db.refresh(db_user)
+        token_versions.record(db_user.id, db_user.token_version)
         return db_user
     
     def get_user_statistics(self, user_id: int) -> dict:
@@ -0,0 +1,115 @@
+from sqlmodel import Session, select
+from sqlalchemy import func
+from typing import Optional, Dict, Tuple
+from datetime import datetime, timedelta, date
+
+from ..models.message import Message, MessageType
+from ..models.session import ConversationSession
+from ..models.language import Language
+from ..models.job import IndexerCheckpoint
+from ..models.vocabulary import VocabularyEntry, VocabularySize, WeeklyNewWords, VocabularyGrowth
+from ..db.upsert import upsert, greatest, least
+from ..db.checkpoint import settled_id
+from ..utils.tokenizer import vocabulary_tokens
+
+INDEXER_NAME = "vocabulary"
+
+class VocabularyService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def index_new_messages(self, batch_size: int = 2000, max_batches: int = 50) -> int:
+        """Fold user messages written since the last run into the vocabulary index, returns how many"""
+        checkpoint = self.db.get(IndexerCheckpoint, INDEXER_NAME) or IndexerCheckpoint(name=INDEXER_NAME)
+        settled = settled_id(self.db, INDEXER_NAME, checkpoint.last_id, Message.id)
+        indexed = 0
+
+        for _ in range(max_batches):
+            rows = self.db.exec(
+                select(
+                    Message.id, Message.content, Message.created_at,
+                    ConversationSession.user_id, ConversationSession.target_language_id, Language.code
+                )
+                .join(ConversationSession, ConversationSession.id == Message.session_id)
+                .join(Language, Language.id == ConversationSession.target_language_id)
+                .where(Message.id > checkpoint.last_id, Message.id <= settled, Message.message_type == MessageType.USER)
+                .order_by(Message.id)
+                .limit(batch_size)
+            ).all()
+            if not rows and checkpoint.last_id >= settled:
+                break
+
+            # Aggregate the batch in memory so each word is written once
+            entries: Dict[Tuple[int, int, str], dict] = {}
+            for message_id, content, created_at, user_id, language_id, language_code in rows:
+                seen_at = created_at or datetime.utcnow()
+                for token in vocabulary_tokens(content, language_code):
+                    key = (user_id, language_id, token)
+                    entry = entries.get(key)
+                    if entry is None:
+                        entries[key] = {
+                            "user_id": user_id, "language_id": language_id, "token": token,
+                            "occurrences": 1, "first_seen_at": seen_at, "last_seen_at": seen_at
+                        }
+                    else:
+                        entry["occurrences"] += 1
+                        entry["first_seen_at"] = min(entry["first_seen_at"], seen_at)
+                        entry["last_seen_at"] = max(entry["last_seen_at"], seen_at)
+
+            upsert(
+                self.db, VocabularyEntry, list(entries.values()), ["user_id", "language_id", "token"],
+                lambda existing, incoming, dialect: {
+                    "occurrences": existing.occurrences + incoming.occurrences,
+                    "first_seen_at": least(dialect, existing.first_seen_at, incoming.first_seen_at),
+                    "last_seen_at": greatest(dialect, existing.last_seen_at, incoming.last_seen_at)
+                }
+            )
+
+            # Entries and checkpoint commit together, so no message is counted twice. A short
+            # batch read everything up to the horizon, the next run can take a new one
+            checkpoint.last_id = rows[-1][0] if len(rows) == batch_size else settled
+            checkpoint.updated_at = datetime.utcnow()
+            self.db.add(checkpoint)
+            self.db.commit()
+            indexed += len(rows)
+            if len(rows) < batch_size:
+                break
+
+        return indexed
+
+    def get_vocabulary_size(self, user_id: int, language_id: Optional[int] = None) -> VocabularySize:
+        """Distinct words a user has produced, optionally in one language"""
+        statement = select(func.count(), func.coalesce(func.sum(VocabularyEntry.occurrences), 0)).where(
+            VocabularyEntry.user_id == user_id
+        )
+        if language_id is not None:
+            statement = statement.where(VocabularyEntry.language_id == language_id)
+        distinct_words, total_words = self.db.exec(statement).one()
+        return VocabularySize(language_id=language_id, distinct_words=distinct_words, total_words=total_words)
+
+    def get_new_words_per_week(self, user_id: int, language_id: Optional[int] = None, weeks: int = 12) -> VocabularyGrowth:
+        """New distinct words per week (weeks start on Monday), oldest first"""
+        today = datetime.utcnow().date()
+        first_week = today - timedelta(days=today.weekday()) - timedelta(weeks=weeks - 1)
+
+        day = func.date(VocabularyEntry.first_seen_at)
+        statement = (
+            select(day, func.count())
+            .where(VocabularyEntry.user_id == user_id, VocabularyEntry.first_seen_at >= first_week)
+            .group_by(day)
+        )
+        if language_id is not None:
+            statement = statement.where(VocabularyEntry.language_id == language_id)
+
+        counts = {first_week + timedelta(weeks=i): 0 for i in range(weeks)}
+        for seen_on, count in self.db.exec(statement).all():
+            if isinstance(seen_on, str):
+                seen_on = date.fromisoformat(seen_on)
+            week_start = seen_on - timedelta(days=seen_on.weekday())
+            if week_start in counts:
+                counts[week_start] += count
+
+        return VocabularyGrowth(
+            language_id=language_id,
+            weeks=[WeeklyNewWords(week_start=week_start, new_words=count) for week_start, count in counts.items()]
+        )
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from the given parts"""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def session_etag(session_id: int, updated_at: datetime | None, message_count: int) -> str:
+    """ETag for a session read, changes whenever the session row or its message count does"""
+    version = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+    return make_etag(session_id, version, message_count)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
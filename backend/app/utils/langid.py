@@ -0,0 +1,156 @@
+"""Offline language identification with hashed byte n-grams.
+
+A multinomial naive Bayes model over byte 1-4-grams of the lower-cased UTF-8
+text, hashed into a fixed number of buckets. The model is one float32 matrix
+(buckets x languages) of log probabilities saved as .npy, with the language
+codes in a JSON file beside it. It is memory-mapped, so every worker shares
+the same pages and loading costs nothing. Classifying a message is a
+vectorised hash and one gather-and-sum over the matrix.
+"""
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .logger import get_logger
+
+logger = get_logger()
+
+BUCKET_BITS = 16
+MAX_N = 4
+MIN_LETTERS = 8  # Shorter texts ("ok", "gracias") are too ambiguous to classify
+EVIDENCE_CAP = 40  # n-grams beyond this don't make a detection more confident
+SEED_CORPUS = Path(__file__).resolve().parents[1] / "data" / "langid_seed.tsv"
+DEFAULT_MODEL_PATH = Path(__file__).resolve().parents[1] / "data" / "langid.npy"
+
+_NON_LETTERS = re.compile(r"[\W\d_]+", re.UNICODE)
+_PRIME = np.uint64(0x100000001B3)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(64 - BUCKET_BITS)
+
+
+class Detection(NamedTuple):
+    code: str
+    confidence: float  # Posterior probability of `code`, 0-1
+
+
+def features(text: str) -> np.ndarray:
+    """Bucket indices of the text's byte n-grams"""
+    cleaned = _NON_LETTERS.sub(" ", text.lower()).strip()
+    data = np.frombuffer(f" {cleaned} ".encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    length = len(data)
+    buckets = []
+    hashes = np.zeros(length, dtype=np.uint64)
+    for n in range(1, min(MAX_N, length) + 1):
+        # Rolling polynomial hash: hashes[i] covers data[i:i + n]
+        hashes = hashes[:length - n + 1] * _PRIME + data[n - 1:]
+        buckets.append(((hashes + np.uint64(n)) * _MIX) >> _SHIFT)
+    return np.concatenate(buckets).astype(np.intp) if buckets else np.empty(0, dtype=np.intp)
+
+
+def letter_count(text: str) -> int:
+    return sum(1 for char in text if char.isalpha())
+
+
+def train(samples: Iterable[Tuple[str, str]], smoothing: float = 0.5) -> Tuple[List[str], np.ndarray]:
+    """(codes, log-probability matrix) from (language code, text) samples"""
+    counts: Dict[str, np.ndarray] = {}
+    for code, text in samples:
+        grams = features(text)
+        if code not in counts:
+            counts[code] = np.zeros(1 << BUCKET_BITS, dtype=np.float64)
+        counts[code] += np.bincount(grams, minlength=1 << BUCKET_BITS)
+    codes = sorted(counts)
+    matrix = np.stack([counts[code] for code in codes], axis=1) + smoothing
+    return codes, np.log(matrix / matrix.sum(axis=0)).astype(np.float32)
+
+
+def seed_samples() -> List[Tuple[str, str]]:
+    """Built-in example sentences, so a model exists before there is any data"""
+    samples = []
+    for line in SEED_CORPUS.read_text(encoding="utf-8").splitlines():
+        code, _, text = line.partition("\t")
+        if text:
+            samples.append((code, text))
+    return samples
+
+
+def save(path: Path, codes: List[str], weights: np.ndarray):
+    """Write the model atomically so running workers never map a partial file"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, weights)
+    path.with_suffix(".json").write_text(json.dumps({"codes": codes, "bucket_bits": BUCKET_BITS}))
+    tmp.replace(path)
+
+
+class LanguageIdentifier:
+    def __init__(self, codes: List[str], weights: np.ndarray):
+        self.codes = codes
+        self.weights = weights
+        self._index = {code: i for i, code in enumerate(codes)}
+
+    @classmethod
+    def load(cls, path: Path) -> "LanguageIdentifier":
+        path = Path(path)
+        meta = json.loads(path.with_suffix(".json").read_text())
+        if meta.get("bucket_bits") != BUCKET_BITS:
+            raise ValueError(f"Language model {path} was built with different features, retrain it")
+        return cls(meta["codes"], np.load(path, mmap_mode="r"))
+
+    def detect(self, text: str, candidates: Optional[Iterable[str]] = None) -> Optional[Detection]:
+        """Most likely language of the text, or None if it's too short to tell"""
+        if letter_count(text) < MIN_LETTERS:
+            return None
+        grams = features(text)
+        scores = np.asarray(self.weights[grams].sum(axis=0), dtype=np.float64)
+        if candidates is not None:
+            columns = [self._index[code] for code in candidates if code in self._index]
+            if not columns:
+                return None
+            mask = np.full(len(self.codes), -np.inf)
+            mask[columns] = 0.0
+            scores = scores + mask
+        # Naive Bayes is overconfident on long texts, cap how much evidence counts
+        scores *= min(len(grams), EVIDENCE_CAP) / len(grams)
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        best = int(probabilities.argmax())
+        return Detection(self.codes[best], float(probabilities[best]))
+
+    def covers(self, code: str) -> bool:
+        return code in self._index
+
+
+_identifier: Optional[LanguageIdentifier] = None
+_missing_logged = False
+_lock = threading.Lock()
+
+
+def get_identifier(path: Optional[Path] = None) -> Optional[LanguageIdentifier]:
+    """The process-wide identifier, None while no model has been built (see app/jobs/langid.py)"""
+    global _identifier, _missing_logged
+    if _identifier is None:
+        with _lock:
+            if _identifier is None:
+                path = Path(path or DEFAULT_MODEL_PATH)
+                # Training here would stall a request, detection waits for the job to build the file
+                if not path.exists():
+                    if not _missing_logged:
+                        logger.warning(f"No language model at {path}, run python -m app.jobs.langid to enable detection")
+                        _missing_logged = True
+                    return None
+                _identifier = LanguageIdentifier.load(path)
+    return _identifier
+
+
+def reset_identifier():
+    """Drop the loaded model so the next call maps the file again, e.g. after retraining"""
+    global _identifier, _missing_logged
+    with _lock:
+        _identifier = None
+        _missing_logged = False
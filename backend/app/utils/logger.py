@@ -3,8 +3,10 @@ import logging
 def get_logger():
     logger = logging.getLogger(__name__)
     logger.setLevel(logging.INFO)
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    # Every module shares this logger, only attach the handler once
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
     return logger
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Word- and character-level diffs between an original and a corrected text.
+
+Edits are reported as spans of code-point offsets into the texts exactly as
+stored (not normalised): "a" is [start, end) in the original and "b" in the
+corrected text. Equal stretches are left out. Tokens are compared after NFC
+normalisation, so precomposed and combining-accent spellings of the same
+word are equal. A one-word replacement also carries character-level "chars"
+edits (relative to the words), and "kind" says when the change is only
+accents or only case.
+"""
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import List, Tuple
+
+# Words (letters, digits and the combining marks that attach to them), whitespace runs, single other characters
+_TOKEN = re.compile(r"[\w\u0300-\u036f]+(?:['\u2019-][\w\u0300-\u036f]+)*|\s+|[^\w\s]")
+
+
+def _tokens(text: str) -> List[Tuple[str, int, int]]:
+    return [(match.group(), match.start(), match.end()) for match in _TOKEN.finditer(text)]
+
+
+def _clusters(text: str) -> List[Tuple[str, int, int]]:
+    """Characters with any following combining marks kept together"""
+    clusters = []
+    for index, char in enumerate(text):
+        if clusters and unicodedata.combining(char):
+            cluster, start, _ = clusters[-1]
+            clusters[-1] = (cluster + char, start, index + 1)
+        else:
+            clusters.append((char, index, index + 1))
+    return clusters
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(char for char in unicodedata.normalize("NFD", text) if not unicodedata.combining(char))
+
+
+def _kind(original: str, corrected: str) -> str | None:
+    if original.casefold() == corrected.casefold():
+        return "case"
+    if _strip_accents(original).casefold() == _strip_accents(corrected).casefold():
+        return "accent"
+    return None
+
+
+def _opcodes(a: List[Tuple[str, int, int]], b: List[Tuple[str, int, int]]):
+    keys_a = [unicodedata.normalize("NFC", item[0]) for item in a]
+    keys_b = [unicodedata.normalize("NFC", item[0]) for item in b]
+    return SequenceMatcher(None, keys_a, keys_b, autojunk=False).get_opcodes()
+
+
+def _span(items, start: int, end: int, fallback: int) -> List[int]:
+    """Code-point range covered by items[start:end], empty at `fallback` when there are none"""
+    if start == end:
+        return [fallback, fallback]
+    return [items[start][1], items[end - 1][2]]
+
+
+def _edits(a, b) -> List[dict]:
+    edits = []
+    for op, a_start, a_end, b_start, b_end in _opcodes(a, b):
+        if op == "equal":
+            continue
+        a_at = a[a_start][1] if a_start < len(a) else (a[-1][2] if a else 0)
+        b_at = b[b_start][1] if b_start < len(b) else (b[-1][2] if b else 0)
+        edits.append({
+            "op": op,
+            "a": _span(a, a_start, a_end, a_at),
+            "b": _span(b, b_start, b_end, b_at),
+        })
+    return edits
+
+
+def diff(original: str, corrected: str) -> List[dict]:
+    """Word-level edits from `original` to `corrected`, with character detail for single-word replacements"""
+    original_tokens, corrected_tokens = _tokens(original or ""), _tokens(corrected or "")
+    edits = _edits(original_tokens, corrected_tokens)
+    for edit in edits:
+        if edit["op"] != "replace":
+            continue
+        original_word = original[edit["a"][0]:edit["a"][1]]
+        corrected_word = corrected[edit["b"][0]:edit["b"][1]]
+        kind = _kind(original_word, corrected_word)
+        if kind:
+            edit["kind"] = kind
+        if not any(char.isspace() for char in original_word + corrected_word):
+            edit["chars"] = _edits(_clusters(original_word), _clusters(corrected_word))
+    return edits
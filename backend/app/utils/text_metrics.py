@@ -0,0 +1,99 @@
+"""Text statistics and readability-based complexity for messages.
+
+Each language gets a precompiled rule set: its tokenizer, a syllable pattern
+and the coefficients of its Flesch-style reading-ease formula. Languages
+without a published formula use English coefficients, and scripts where
+syllables can't be counted from vowels (Chinese, Japanese, ...) fall back to
+sentence and word length.
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional
+
+from .tokenizer import UNSEGMENTED_LANGUAGES, normalize, split_sentences, tokenize
+
+# Reading ease = base - sentence_weight * words per sentence - syllable_weight * syllables per word
+READING_EASE = {
+    "en": (206.835, 1.015, 84.6),  # Flesch
+    "es": (206.84, 1.02, 60.0),  # Fernández Huerta
+    "fr": (207.0, 1.015, 73.6),  # Kandel & Moles
+    "de": (180.0, 1.0, 58.5),  # Amstad
+    "it": (217.0, 1.3, 60.0),  # Flesch-Vacca
+    "pt": (248.835, 1.015, 84.6),  # Martins et al.
+    "nl": (206.835, 0.93, 77.0),  # Douma
+}
+
+_LATIN_VOWELS = "aeiouyàáâãäåæèéêëìíîïòóôõöøùúûüýÿœ"
+
+
+class LanguageRules(NamedTuple):
+    code: str
+    syllable: Optional[re.Pattern]  # None where syllables aren't countable from vowels
+    reading_ease: tuple
+
+
+class TextMetrics(NamedTuple):
+    word_count: int
+    character_count: int  # Excluding whitespace
+    sentence_count: int
+    unique_words: int
+    type_token_ratio: float
+    average_sentence_length: float  # Words per sentence
+    average_word_length: float  # Characters per word
+    complexity_score: Optional[int]  # 1-10, None for text without words
+
+
+@lru_cache(maxsize=None)
+def rules_for(language_code: str) -> LanguageRules:
+    """Precompiled rules for a language, built once per code"""
+    code = (language_code or "").lower().split("-")[0]
+    syllable = None if code in UNSEGMENTED_LANGUAGES else re.compile(f"[{_LATIN_VOWELS}]+", re.IGNORECASE)
+    return LanguageRules(code=code, syllable=syllable, reading_ease=READING_EASE.get(code, READING_EASE["en"]))
+
+
+def _scale(value: float, easiest: float, hardest: float) -> int:
+    """Map `value` linearly onto 1-10, `easiest` -> 1 and `hardest` -> 10"""
+    position = (value - easiest) / (hardest - easiest)
+    return int(min(max(round(1 + position * 9), 1), 10))
+
+
+def compute(text: str, language_code: str) -> TextMetrics:
+    """Metrics for one text"""
+    rules = rules_for(language_code)
+    text = normalize(text)
+    words = tokenize(text, rules.code)
+    word_count = len(words)
+    character_count = sum(1 for char in text if not char.isspace())
+    sentence_count = max(len(split_sentences(text)), 1) if word_count else 0
+    if not word_count:
+        return TextMetrics(0, character_count, 0, 0, 0.0, 0.0, 0.0, None)
+
+    unique_words = len({word.casefold() for word in words})
+    average_sentence_length = word_count / sentence_count
+    average_word_length = sum(len(word) for word in words) / word_count
+
+    if rules.syllable is not None:
+        syllables = sum(max(len(rules.syllable.findall(word)), 1) for word in words)
+        base, sentence_weight, syllable_weight = rules.reading_ease
+        ease = base - sentence_weight * average_sentence_length - syllable_weight * syllables / word_count
+        complexity = _scale(ease, 100.0, 0.0)
+    else:
+        # Tokens here are mostly single characters, so sentence length carries the signal
+        complexity = _scale(average_sentence_length + 2 * average_word_length, 6.0, 50.0)
+
+    return TextMetrics(
+        word_count=word_count,
+        character_count=character_count,
+        sentence_count=sentence_count,
+        unique_words=unique_words,
+        type_token_ratio=round(unique_words / word_count, 4),
+        average_sentence_length=round(average_sentence_length, 2),
+        average_word_length=round(average_word_length, 2),
+        complexity_score=complexity
+    )
+
+
+def compute_many(texts: Iterable[str], language_code: str) -> List[TextMetrics]:
+    """Metrics for many texts in the same language"""
+    rules_for(language_code)
+    return [compute(text, language_code) for text in texts]
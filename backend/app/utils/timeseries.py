@@ -0,0 +1,118 @@
+"""Vectorised kernels for score time series.
+
+Series are float arrays with NaN for missing values. Grouped variants take
+`group_starts`, the index where each group's run begins in arrays sorted by
+group, so a whole cohort is processed in a single pass.
+"""
+import numpy as np
+
+_EMA_BLOCK = 128
+
+
+def rolling_mean(values: np.ndarray, window: int, group_starts: np.ndarray | None = None) -> np.ndarray:
+    """Mean of the last `window` non-missing values at each point, never reaching into an earlier group"""
+    present = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(present, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(present)))
+
+    index = np.arange(len(values))
+    lower = np.maximum(index - window + 1, 0)
+    if group_starts is not None and len(group_starts):
+        lower = np.maximum(lower, _group_start_of(index, group_starts))
+
+    window_sums = sums[index + 1] - sums[lower]
+    window_counts = counts[index + 1] - counts[lower]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, window_sums / np.maximum(window_counts, 1), np.nan)
+
+
+def ema(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponentially weighted mean with weights renormalised over the non-missing values seen so far"""
+    decay = 1.0 - alpha
+    present = ~np.isnan(values)
+    x = np.where(present, values, 0.0)
+    w = present.astype(float)
+
+    # Within a block the recurrence is a lower-triangular matrix product, blocks chain through the carry
+    steps = np.arange(_EMA_BLOCK)
+    exponents = steps[:, None] - steps[None, :]
+    kernel = np.where(exponents >= 0, decay ** np.maximum(exponents, 0), 0.0)
+    carry_decay = decay ** (steps + 1)
+
+    numerator = np.empty(len(values))
+    denominator = np.empty(len(values))
+    carry_numerator = carry_denominator = 0.0
+    for start in range(0, len(values), _EMA_BLOCK):
+        end = min(start + _EMA_BLOCK, len(values))
+        size = end - start
+        numerator[start:end] = kernel[:size, :size] @ x[start:end] + carry_decay[:size] * carry_numerator
+        denominator[start:end] = kernel[:size, :size] @ w[start:end] + carry_decay[:size] * carry_denominator
+        carry_numerator, carry_denominator = numerator[end - 1], denominator[end - 1]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def grouped_ema_last(values: np.ndarray, alpha: float, group_starts: np.ndarray) -> np.ndarray:
+    """Final `ema` value of every group"""
+    index = np.arange(len(values))
+    group_ids = np.searchsorted(group_starts, index, side="right") - 1
+    group_ends = np.append(group_starts[1:], len(values)) - 1
+    present = ~np.isnan(values)
+    # Exponents count back from each group's end, so weights stay in (0, 1]
+    weights = np.where(present, (1.0 - alpha) ** (group_ends[group_ids] - index), 0.0)
+    numerator = np.bincount(group_ids, weights=weights * np.where(present, values, 0.0), minlength=len(group_starts))
+    denominator = np.bincount(group_ids, weights=weights, minlength=len(group_starts))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def grouped_slope(x: np.ndarray, y: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    """Least-squares slope of y over x within every group, NaN with fewer than two distinct points"""
+    group_ids = np.searchsorted(group_starts, np.arange(len(x)), side="right") - 1
+    present = ~np.isnan(y)
+    groups = len(group_starts)
+
+    def total(values):
+        return np.bincount(group_ids[present], weights=values[present], minlength=groups)
+
+    n = np.bincount(group_ids[present], minlength=groups).astype(float)
+    sum_x, sum_y = total(x), total(y)
+    sum_xy, sum_xx = total(x * y), total(x * x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = n * sum_xx - sum_x ** 2
+        return np.where((n >= 2) & (variance > 1e-12), (n * sum_xy - sum_x * sum_y) / variance, np.nan)
+
+
+def grouped_mean(values: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    group_ids = np.searchsorted(group_starts, np.arange(len(values)), side="right") - 1
+    present = ~np.isnan(values)
+    counts = np.bincount(group_ids[present], minlength=len(group_starts))
+    sums = np.bincount(group_ids[present], weights=values[present], minlength=len(group_starts))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def downsample(timestamps: np.ndarray, values: np.ndarray, start: float, end: float, points: int) -> np.ndarray:
+    """Mean of the non-missing values falling in each of `points` equal time buckets over [start, end)"""
+    width = (end - start) / points
+    buckets = np.clip(((timestamps - start) // width).astype(int), 0, points - 1)
+    present = ~np.isnan(values)
+    counts = np.bincount(buckets[present], minlength=points)
+    sums = np.bincount(buckets[present], weights=values[present], minlength=points)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+def downsample_last(timestamps: np.ndarray, values: np.ndarray, start: float, end: float, points: int) -> np.ndarray:
+    """Last non-missing value in each of `points` equal time buckets, for already-smoothed series"""
+    width = (end - start) / points
+    buckets = np.clip(((timestamps - start) // width).astype(int), 0, points - 1)
+    present = np.nonzero(~np.isnan(values))[0]
+    last = np.full(points, -1)
+    np.maximum.at(last, buckets[present], present)
+    return np.where(last >= 0, values[np.maximum(last, 0)], np.nan)
+
+
+def _group_start_of(index: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    return group_starts[np.searchsorted(group_starts, index, side="right") - 1]
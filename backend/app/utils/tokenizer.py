@@ -0,0 +1,47 @@
+"""Language-aware word tokenization.
+
+Space-delimited languages are split on word boundaries. Chinese and Japanese
+don't put spaces between words, so Han characters become one token each and
+hiragana, katakana and latin runs stay together. That is a reasonable
+approximation without a dictionary-based segmenter.
+"""
+import re
+import unicodedata
+from typing import List
+
+UNSEGMENTED_LANGUAGES = {"zh", "ja"}
+
+# Letters only (apostrophes and hyphens inside words kept), no digits or underscores
+_WORD = re.compile(r"[^\W\d_]+(?:['’\-][^\W\d_]+)*", re.UNICODE)
+_HAN = r"㐀-䶿一-鿿豈-﫿"
+_HIRAGANA = r"぀-ゟ"
+_KATAKANA = r"゠-ヿㇰ-ㇿ"
+_UNSEGMENTED = re.compile(
+    rf"[{_HAN}]|[{_HIRAGANA}]+|[{_KATAKANA}]+|[^\W\d_{_HAN}{_HIRAGANA}{_KATAKANA}]+", re.UNICODE
+)
+
+
+# Sentence-final punctuation, including the full-width forms used in Chinese and Japanese
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*(?:\s+|$)|[。！？]+[」』”’)）]*\s*|\n{2,}")
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFC", text)
+
+
+def tokenize(text: str, language_code: str) -> List[str]:
+    """Split text into words for the given language"""
+    text = normalize(text)
+    if language_code in UNSEGMENTED_LANGUAGES:
+        return _UNSEGMENTED.findall(text)
+    return _WORD.findall(text)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences on terminal punctuation"""
+    return [sentence for sentence in (part.strip() for part in _SENTENCE_END.split(normalize(text))) if sentence]
+
+
+def vocabulary_tokens(text: str, language_code: str, max_length: int = 64) -> List[str]:
+    """Case-folded word tokens suitable as vocabulary keys"""
+    return [token.casefold() for token in tokenize(text, language_code) if len(token) <= max_length]
@@ -0,0 +1,80 @@
+"""Compression for archived conversation transcripts.
+
+Uses zlib with a preset dictionary built from sample conversations. Short
+transcripts share most of their bytes with each other (JSON keys, message
+types, common phrases), so a dictionary makes them far smaller than
+compressing each one on its own.
+"""
+import json
+import re
+import zlib
+from collections import Counter
+from typing import Any, Optional
+
+MAX_DICTIONARY_SIZE = 32 * 1024  # zlib only uses the last 32 KiB of a preset dictionary
+CODEC_ZLIB = "zlib"
+CODEC_ZLIB_DICT = "zlib-dict"
+
+_TOKEN = re.compile(rb'"[^"\s]{1,40}": ?|[^\s"]{2,40}\s?')
+
+
+def build_dictionary(samples: list[bytes], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """Build a preset dictionary from the substrings that save the most bytes across samples"""
+    counts = Counter()
+    for sample in samples:
+        tokens = _TOKEN.findall(sample)
+        counts.update(set(tokens))  # Count each token once per sample, favouring shared ones
+        counts.update(set(a + b for a, b in zip(tokens, tokens[1:])))
+
+    scored = sorted(
+        ((count * len(token), token) for token, count in counts.items() if count > 1),
+        reverse=True
+    )
+    chosen, total = [], 0
+    for _, token in scored:
+        if total + len(token) > size:
+            continue
+        chosen.append(token)
+        total += len(token)
+    # zlib finds matches nearest the end of the dictionary most cheaply, put the best last
+    return b"".join(reversed(chosen))
+
+
+def encode(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compress(payload: Any, dictionary: Optional[bytes] = None) -> tuple[bytes, str]:
+    """Compress a JSON-serialisable payload, returns (blob, codec)"""
+    raw = encode(payload)
+    if dictionary:
+        compressor = zlib.compressobj(level=9, zdict=dictionary)
+        return compressor.compress(raw) + compressor.flush(), CODEC_ZLIB_DICT
+    return zlib.compress(raw, level=9), CODEC_ZLIB
+
+
+def decompress(blob: bytes, codec: str, dictionary: Optional[bytes] = None) -> Any:
+    """Inverse of compress"""
+    if codec == CODEC_ZLIB_DICT:
+        if dictionary is None:
+            raise ValueError("Transcript was compressed with a dictionary but none was given")
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        raw = decompressor.decompress(blob) + decompressor.flush()
+    elif codec == CODEC_ZLIB:
+        raw = zlib.decompress(blob)
+    else:
+        raise ValueError(f"Unknown transcript codec: {codec}")
+    return json.loads(raw)
+
+
+# Dictionaries never change once stored, so keep the ones in use in memory
+_dictionary_cache: dict[int, bytes] = {}
+
+
+def get_cached_dictionary(dictionary_id: int) -> Optional[bytes]:
+    return _dictionary_cache.get(dictionary_id)
+
+
+def cache_dictionary(dictionary_id: int, data: bytes) -> bytes:
+    _dictionary_cache[dictionary_id] = data
+    return data
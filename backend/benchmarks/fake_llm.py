@@ -0,0 +1,109 @@
+"""Local stand-in for an OpenAI-style chat completions API with injectable latency and errors.
+
+Every request waits `--latency-ms` plus up to `--jitter-ms`. A `--slow-rate`
+fraction of requests waits `--slow-ms` instead. A `--error-rate` fraction
+fails with `--error-status`. A single request can override these with
+X-Fake-Latency-Ms and X-Fake-Status headers. The knobs can also be changed
+while the server runs with PUT /fake/config, and GET /fake/stats reports
+request counts.
+
+Usage (from the backend directory):
+    python benchmarks/fake_llm.py --port 8001 --latency-ms 200 --slow-rate 0.05 --slow-ms 3000 --error-rate 0.02
+    LLM_BASE_URL=http://127.0.0.1:8001/v1 uvicorn app.main:app
+
+Tests can also mount it in process with httpx.ASGITransport(app=create_app(...)).
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class FakeConfig(BaseModel):
+    latency_ms: float = 50
+    jitter_ms: float = 0
+    slow_rate: float = 0
+    slow_ms: float = 2000
+    error_rate: float = 0
+    error_status: int = 503
+    fail_next: int = 0  # Fail this many upcoming requests regardless of error_rate
+
+
+def create_app(config: Optional[FakeConfig] = None, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI(title="Fake LLM")
+    app.state.config = config or FakeConfig()
+    app.state.stats = {"requests": 0, "errors": 0, "slow": 0, "in_flight": 0, "max_in_flight": 0}
+    rng = random.Random(seed)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        config, stats = app.state.config, app.state.stats
+        body = await request.json()
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            latency = request.headers.get("x-fake-latency-ms")
+            if latency is not None:
+                delay = float(latency)
+            elif rng.random() < config.slow_rate:
+                stats["slow"] += 1
+                delay = config.slow_ms
+            else:
+                delay = config.latency_ms + rng.uniform(0, config.jitter_ms)
+            await asyncio.sleep(delay / 1000)
+
+            status = request.headers.get("x-fake-status")
+            if status is None and config.fail_next > 0:
+                config.fail_next -= 1
+                status = config.error_status
+            elif status is None and rng.random() < config.error_rate:
+                status = config.error_status
+            if status is not None and int(status) >= 400:
+                stats["errors"] += 1
+                return JSONResponse({"error": {"message": "injected failure"}}, status_code=int(status))
+
+            last = (body.get("messages") or [{}])[-1].get("content", "")
+            return {
+                "id": f"chatcmpl-fake-{stats['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"Echo: {last}"},
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": len(str(body).split()), "completion_tokens": len(last.split()) + 1}
+            }
+        finally:
+            stats["in_flight"] -= 1
+
+    @app.put("/fake/config")
+    async def set_config(new_config: FakeConfig):
+        app.state.config = new_config
+        return new_config
+
+    @app.get("/fake/stats")
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OpenAI-style LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    for field, info in FakeConfig.model_fields.items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(info.default), default=info.default)
+    args = parser.parse_args()
+    fake_config = FakeConfig(**{field: getattr(args, field) for field in FakeConfig.model_fields})
+    uvicorn.run(create_app(fake_config), host=args.host, port=args.port, log_level="warning")
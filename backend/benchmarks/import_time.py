@@ -0,0 +1,62 @@
+"""Import-time profile of the app using `python -X importtime`.
+
+Usage (from the backend directory):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module app.main --top 30 --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def profile_imports(module: str) -> list[tuple[str, int, int]]:
+    """Import `module` in a fresh interpreter and return (name, self_us, cumulative_us) rows"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of N runs")
+    parser.add_argument("--budget-ms", type=float, default=None, help="exit non-zero if total import time exceeds this")
+    args = parser.parse_args()
+
+    runs = [profile_imports(args.module) for _ in range(args.runs)]
+    # The last row is the top-level module, its cumulative time is the total
+    best = min(runs, key=lambda rows: rows[-1][2])
+    total_ms = best[-1][2] / 1000
+
+    print(f"{args.module}: {total_ms:.1f} ms total (best of {args.runs})\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us in sorted(best, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nImport time {total_ms:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
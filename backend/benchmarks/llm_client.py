@@ -0,0 +1,76 @@
+"""Tail latency of the shared LLM client against the fake provider, with and without hedging.
+
+Runs `--requests` chat calls at `--concurrency` against benchmarks/fake_llm.py
+mounted in process. A `--slow-rate` fraction of calls stalls and a
+`--error-rate` fraction fails. Prints latency percentiles and the client's
+retry and hedge counters for each configuration.
+
+Usage (from the backend directory):
+    python benchmarks/llm_client.py
+    python benchmarks/llm_client.py --requests 2000 --slow-rate 0.05 --hedge-after-ms 150
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx  # noqa: E402
+
+from app.core.llm import LLMClient, LLMError  # noqa: E402
+from fake_llm import FakeConfig, create_app  # noqa: E402
+
+
+async def run(args, hedge_after_ms):
+    fake = create_app(FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 2,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms, error_rate=args.error_rate
+    ), seed=1)
+    client = LLMClient(
+        base_url="http://fake/v1",
+        max_concurrency=args.concurrency * 2,  # Headroom so slow calls can be hedged
+        backoff_base_seconds=0.01,
+        hedge_after_seconds=hedge_after_ms / 1000 if hedge_after_ms else None,
+        transport=httpx.ASGITransport(app=fake),
+    )
+    gate = asyncio.Semaphore(args.concurrency)
+    latencies, failures = [], 0
+
+    async def one(i):
+        nonlocal failures
+        async with gate:
+            started = time.perf_counter()
+            try:
+                await client.chat([{"role": "user", "content": f"hola {i}"}], model="fake")
+            except LLMError:
+                failures += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    await client.aclose()
+    quantiles = statistics.quantiles(latencies, n=100)
+    label = f"hedge after {hedge_after_ms}ms" if hedge_after_ms else "no hedging"
+    print(
+        f"{label:>22}: p50 {quantiles[49]:7.1f}ms  p95 {quantiles[94]:7.1f}ms  p99 {quantiles[98]:7.1f}ms  "
+        f"failed {failures}  {client.get_status()}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-ms", type=float, default=1000)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--hedge-after-ms", type=float, default=120)
+    args = parser.parse_args()
+
+    asyncio.run(run(args, None))
+    asyncio.run(run(args, args.hedge_after_ms))
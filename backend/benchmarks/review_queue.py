@@ -0,0 +1,114 @@
+"""Throughput of the spaced-repetition review queue for a user with many items.
+
+Seeds one user with `--items` review items spread over the past and next year,
+then times fetching the due queue and recording batches of outcomes, and prints
+the query plan of the due-items query so index use can be checked.
+
+Usage (from the backend directory):
+    python benchmarks/review_queue.py
+    python benchmarks/review_queue.py --items 200000 --database-url mysql+pymysql://...
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+
+from app.models import Language, User, ReviewItem, ReviewOutcome  # noqa: E402
+from app.services.review_service import ReviewService  # noqa: E402
+
+
+def seed(engine, items: int) -> int:
+    """Create a user with `items` review items, returns the user id"""
+    with Session(engine) as db:
+        language = Language(code="es", name="Spanish", native_name="Español")
+        db.add(language)
+        db.commit()
+        user = User(
+            email=f"bench-{time.time_ns()}@example.com", username=f"bench{time.time_ns()}",
+            hashed_password="x", native_language_id=language.id
+        )
+        db.add(user)
+        db.commit()
+        user_id, language_id = user.id, language.id
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                "user_id": user_id, "language_id": language_id, "source": "message", "source_id": i,
+                "fingerprint": f"{i:040x}", "original_text": f"yo soy {i} años", "corrected_text": f"yo tengo {i} años",
+                "ease": 2.5, "interval_days": 0, "repetitions": 0, "lapses": 0,
+                "due_at": now + timedelta(minutes=random.randint(-365 * 24 * 60, 365 * 24 * 60)), "created_at": now
+            }
+            for i in range(items)
+        ]
+        for start in range(0, items, 5000):
+            db.exec(insert(ReviewItem), params=rows[start:start + 5000])
+        db.commit()
+        return user_id
+
+
+def explain_due_query(engine, user_id: int) -> list:
+    query = "SELECT id FROM review_items WHERE user_id = :user_id AND due_at <= :now ORDER BY due_at LIMIT 20"
+    prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    with engine.connect() as connection:
+        return connection.execute(text(f"{prefix} {query}"), {"user_id": user_id, "now": datetime.utcnow()}).all()
+
+
+def timed(func, runs: int) -> list[float]:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def report(name: str, durations: list[float], per_call: int = 1):
+    p95 = sorted(durations)[max(int(len(durations) * 0.95) - 1, 0)]
+    median = statistics.median(durations)
+    print(f"{name:<28} median {median:8.2f} ms   p95 {p95:8.2f} ms   {per_call * 1000 / median:10.0f} items/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--due-limit", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=100, help="outcomes recorded per call")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/review_queue.db"
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+
+    started = time.perf_counter()
+    user_id = seed(engine, args.items)
+    print(f"Seeded {args.items} items in {time.perf_counter() - started:.1f} s ({engine.dialect.name})\n")
+    for row in explain_due_query(engine, user_id):
+        print("plan:", " | ".join(str(value) for value in row))
+    print()
+
+    with Session(engine) as db:
+        service = ReviewService(db)
+        report("due queue", timed(lambda: service.get_due_items(user_id, limit=args.due_limit), args.runs), args.due_limit)
+
+        def record_batch():
+            items = service.get_due_items(user_id, limit=args.batch_size)
+            db.expunge_all()
+            service.record_outcomes(user_id, [ReviewOutcome(item_id=item.id, quality=random.randint(0, 5)) for item in items])
+
+        report(f"fetch + record {args.batch_size}", timed(record_batch, args.runs), args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
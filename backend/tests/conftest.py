@@ -0,0 +1,4 @@
+import os
+
+# Settings are read when app modules are imported, point them at a throwaway database first
+os.environ.setdefault("DATABASE_URL", "sqlite://")
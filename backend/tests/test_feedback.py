@@ -0,0 +1,47 @@
+"""Edit spans stored with feedback by the code that writes it"""
+import asyncio
+import json
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models.language import Language
+from app.models.user import User
+from app.services.feedback_service import FeedbackService
+from app.services.import_service import ImportService
+from app.services.search_service import ensure_search_schema
+
+
+@pytest.fixture
+def db(tmp_path):
+    database_engine = create_engine(f"sqlite:///{tmp_path / 'feedback.db'}")
+    SQLModel.metadata.create_all(database_engine)
+    ensure_search_schema(database_engine)
+    with Session(database_engine) as session:
+        language = Language(code="es", name="Spanish", native_name="Español")
+        session.add(language)
+        session.commit()
+        session.add(User(email="a@example.com", username="learner", hashed_password="x", native_language_id=language.id))
+        session.commit()
+        yield session
+
+
+async def _lines(*rows):
+    for row in rows:
+        yield json.dumps(row).encode("utf-8") + b"\n"
+
+
+def test_imported_corrections_carry_their_edit_spans(db):
+    line = {
+        "language": "es", "title": "t", "topic": "t",
+        "feedback": [
+            {"feedback_type": "grammar_correction", "title": "t", "content": "c",
+             "original_text": "yo tiene un gato", "corrected_text": "yo tengo un gato"},
+            {"feedback_type": "session_summary", "title": "t", "content": "c"},
+        ]
+    }
+    report = asyncio.run(ImportService(db).import_ndjson(_lines(line), user_id=1))
+    assert report.feedback == 2
+
+    [correction] = FeedbackService(db).get_corrections(1)
+    assert [(edit.op, edit.a, edit.b) for edit in correction.text_diff] == [("replace", [3, 8], [3, 8])]
@@ -0,0 +1,82 @@
+"""Id-ordered indexers, which must not skip rows whose transaction commits late"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.config import settings
+from app.models.job import IndexerCheckpoint
+from app.models.language import Language
+from app.models.message import Message, MessageType
+from app.models.session import ConversationSession, DifficultyLevel
+from app.models.user import User
+from app.models.vocabulary import VocabularyEntry
+from app.services.vocabulary_service import INDEXER_NAME, VocabularyService
+
+
+@pytest.fixture
+def db(tmp_path):
+    database_engine = create_engine(f"sqlite:///{tmp_path / 'indexers.db'}")
+    SQLModel.metadata.create_all(database_engine)
+    with Session(database_engine) as session:
+        language = Language(code="es", name="Spanish", native_name="Español")
+        session.add(language)
+        session.commit()
+        user = User(email="a@example.com", username="learner", hashed_password="x", native_language_id=language.id)
+        session.add(user)
+        session.commit()
+        session.add(ConversationSession(
+            id=1, user_id=user.id, target_language_id=language.id, title="t", topic="t",
+            difficulty_level=DifficultyLevel.MEDIUM
+        ))
+        session.commit()
+        yield session
+
+
+def _message(db: Session, message_id: int, content: str):
+    db.add(Message(id=message_id, session_id=1, content=content, message_type=MessageType.USER))
+    db.commit()
+
+
+def _settle(db: Session):
+    """Age the horizon past the settle window"""
+    horizon = db.get(IndexerCheckpoint, f"{INDEXER_NAME}:horizon")
+    horizon.updated_at = datetime.utcnow() - timedelta(seconds=settings.indexer_settle_seconds + 1)
+    db.add(horizon)
+    db.commit()
+
+
+def _tokens(db: Session):
+    return set(db.exec(select(VocabularyEntry.token)).all())
+
+
+def test_recent_rows_wait_for_the_settle_window(db):
+    _message(db, 1, "hola")
+    assert VocabularyService(db).index_new_messages() == 0
+    _settle(db)
+    assert VocabularyService(db).index_new_messages() == 1
+    assert _tokens(db) == {"hola"}
+
+
+def test_rows_committed_below_the_checkpoint_are_not_skipped(db):
+    _message(db, 2, "playa")
+    VocabularyService(db).index_new_messages()
+    # A transaction that took id 1 before id 2 commits only now
+    _message(db, 1, "montaña")
+    _settle(db)
+    assert VocabularyService(db).index_new_messages() == 2
+    assert _tokens(db) == {"playa", "montaña"}
+
+
+def test_later_rows_are_indexed_once(db):
+    _message(db, 1, "hola")
+    VocabularyService(db).index_new_messages()
+    _settle(db)
+    VocabularyService(db).index_new_messages()
+    _message(db, 2, "adiós")
+    # Caught up, so a new horizon is taken and has to settle first
+    assert VocabularyService(db).index_new_messages() == 0
+    _settle(db)
+    assert VocabularyService(db).index_new_messages() == 1
+    assert VocabularyService(db).index_new_messages() == 0
+    assert db.exec(select(VocabularyEntry.occurrences).where(VocabularyEntry.token == "hola")).one() == 1
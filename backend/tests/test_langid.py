@@ -0,0 +1,26 @@
+"""Loading the language identification model"""
+import pytest
+
+from app.utils import langid
+
+
+@pytest.fixture(autouse=True)
+def fresh_identifier():
+    langid.reset_identifier()
+    yield
+    langid.reset_identifier()
+
+
+def test_missing_model_skips_detection_without_training(tmp_path):
+    path = tmp_path / "langid.npy"
+    assert langid.get_identifier(path) is None
+    assert langid.get_identifier(path) is None
+    assert not path.exists()
+
+
+def test_model_built_later_is_loaded(tmp_path):
+    path = tmp_path / "langid.npy"
+    assert langid.get_identifier(path) is None
+    langid.save(path, *langid.train(langid.seed_samples()))
+    identifier = langid.get_identifier(path)
+    assert identifier is not None and identifier.covers("es")
@@ -0,0 +1,174 @@
+"""Read replica routing, with two SQLite files standing in for the primary and a replica"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.db import routing
+from app.db.routing import (
+    HEARTBEAT, STICKY_COOKIE, ReadYourWritesMiddleware, ReplicaRouter, RoutingSession, get_read_db, write_heartbeat
+)
+from app.models.job import IndexerCheckpoint
+from app.models.language import Language
+
+
+@pytest.fixture
+def primary(tmp_path, monkeypatch):
+    primary_engine = _database(tmp_path / "primary.db", "primary")
+    monkeypatch.setattr(routing, "engine", primary_engine)
+    return primary_engine
+
+
+@pytest.fixture
+def replica(tmp_path, primary, monkeypatch):
+    replica_engine = _database(tmp_path / "replica.db", "replica")
+    with Session(replica_engine) as db:
+        write_heartbeat(db)
+    monkeypatch.setattr(routing, "replicas", ReplicaRouter([replica_engine]))
+    return replica_engine
+
+
+def _database(path, name):
+    """A database whose only language is named after it, to tell which one a read went to"""
+    database_engine = create_engine(f"sqlite:///{path}")
+    SQLModel.metadata.create_all(database_engine)
+    with Session(database_engine) as db:
+        db.add(Language(code="es", name=name, native_name=name))
+        db.commit()
+    return database_engine
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware)
+
+    @app.get("/language")
+    def read_language(db: Session = Depends(get_read_db)):
+        return db.exec(select(Language.name)).one()
+
+    @app.post("/language")
+    def write_language():
+        return "ok"
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_reads_go_to_a_caught_up_replica(replica):
+    assert _client().get("/language").json() == "replica"
+
+
+def test_reads_use_the_primary_without_replicas(primary, monkeypatch):
+    monkeypatch.setattr(routing, "replicas", ReplicaRouter([]))
+    assert _client().get("/language").json() == "primary"
+
+
+def test_lagging_replica_is_skipped(replica):
+    with Session(replica) as db:
+        heartbeat = db.get(IndexerCheckpoint, HEARTBEAT)
+        heartbeat.updated_at = datetime.utcnow() - timedelta(minutes=5)
+        db.add(heartbeat)
+        db.commit()
+    assert _client().get("/language").json() == "primary"
+
+
+def test_replica_without_heartbeat_is_skipped(replica):
+    with Session(replica) as db:
+        db.delete(db.get(IndexerCheckpoint, HEARTBEAT))
+        db.commit()
+    assert _client().get("/language").json() == "primary"
+
+
+def test_unreachable_replica_falls_back_to_the_primary(tmp_path, primary, monkeypatch):
+    missing = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    monkeypatch.setattr(routing, "replicas", ReplicaRouter([missing]))
+    assert _client().get("/language").json() == "primary"
+    assert routing.replicas.replicas[0].skip_until > time.monotonic()
+
+
+def _break(replica_engine):
+    with replica_engine.begin() as connection:
+        connection.execute(text("DROP TABLE user_languages"))
+        connection.execute(text("DROP TABLE languages"))
+
+
+def test_query_failing_on_the_replica_is_retried_on_the_primary(replica):
+    _break(replica)
+    client = _client()
+    assert client.get("/language").json() == "primary"
+    assert routing.replicas.replicas[0].skip_until > time.monotonic()
+
+
+def test_replica_failing_mid_request_falls_back_to_the_primary(replica):
+    app = FastAPI()
+
+    @app.get("/languages")
+    def read_languages(db: Session = Depends(get_read_db)):
+        first = db.exec(select(Language.name)).one()
+        _break(replica)
+        return [first, db.exec(select(Language.name)).one()]
+
+    assert TestClient(app).get("/languages").json() == ["replica", "primary"]
+
+
+def test_corrupted_replica_file_falls_back_to_the_primary(tmp_path, replica):
+    client = _client()
+    assert client.get("/language").json() == "replica"
+    # Replaced on disk while the replica still counts as caught up
+    replica.dispose()
+    (tmp_path / "replica.db").write_bytes(b"not a database" * 1000)
+    assert client.get("/language").json() == "primary"
+    assert routing.replicas.replicas[0].skip_until > time.monotonic()
+
+
+def test_writes_in_a_read_session_go_to_the_primary(primary, replica):
+    with RoutingSession(replica) as db:
+        assert db.exec(select(Language.name)).one() == "replica"
+        db.add(Language(code="fr", name="French", native_name="Français"))
+        db.commit()
+        # Reads after a write see it
+        assert db.exec(select(Language.name).where(Language.code == "fr")).one() == "French"
+    with Session(replica) as db:
+        assert db.exec(select(Language).where(Language.code == "fr")).first() is None
+
+
+def test_reads_after_a_write_stick_to_the_primary(replica):
+    client = _client()
+    response = client.post("/language")
+    assert STICKY_COOKIE in response.cookies
+    assert client.get("/language").json() == "primary"
+    # Other clients keep reading from the replica
+    assert _client().get("/language").json() == "replica"
+
+
+def test_stickiness_holds_on_another_worker(replica, monkeypatch):
+    cookie = _client().post("/language").cookies[STICKY_COOKIE]
+    # A worker with its own router and no memory of the write
+    monkeypatch.setattr(routing, "replicas", ReplicaRouter([replica]))
+    other_worker = _client()
+    other_worker.cookies.set(STICKY_COOKIE, cookie)
+    assert other_worker.get("/language").json() == "primary"
+
+
+def test_stickiness_expires(replica):
+    until = int(time.time()) - 1
+    client = _client()
+    client.cookies.set(STICKY_COOKIE, f"{until}.{routing._signature(until)}")
+    assert client.get("/language").json() == "replica"
+
+
+@pytest.mark.parametrize("cookie", ["9999999999.forged", "garbage", ""])
+def test_unsigned_cookies_are_ignored(replica, cookie):
+    client = _client()
+    client.cookies.set(STICKY_COOKIE, cookie)
+    assert client.get("/language").json() == "replica"
+
+
+def test_cookie_for_a_longer_window_is_ignored(replica):
+    until = int(time.time()) + 3600
+    client = _client()
+    client.cookies.set(STICKY_COOKIE, f"{until}.{routing._signature(until)}")
+    assert client.get("/language").json() == "replica"
@@ -0,0 +1,52 @@
+"""Message search, on SQLite's FTS5 backend"""
+from datetime import datetime
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.services.search_service import SearchService, ensure_search_schema, make_snippet
+
+
+@pytest.fixture
+def db(tmp_path):
+    database_engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    SQLModel.metadata.create_all(database_engine)
+    ensure_search_schema(database_engine)
+    with Session(database_engine) as session:
+        yield session
+
+
+def _index(db: Session, message_id: int, content: str):
+    SearchService(db).backend.insert([{
+        "message_id": message_id, "session_id": 1, "user_id": 1, "language_id": 1,
+        "created_at": datetime(2026, 1, 1), "content": content
+    }], new=True)
+    db.commit()
+
+
+def test_snippets_escape_message_content(db):
+    _index(db, 1, "<script>alert(1)</script> hola <img src=x onerror=alert(1)>")
+    [hit] = SearchService(db).search(1, "hola").results
+    assert "<script>" not in hit.snippet and "<img" not in hit.snippet
+    assert "&lt;script&gt;" in hit.snippet
+    assert "<mark>hola</mark>" in hit.snippet
+
+
+def test_matched_markup_is_escaped_inside_the_mark(db):
+    _index(db, 1, "probando <script>alert(1)</script>")
+    [hit] = SearchService(db).search(1, "script").results
+    assert "<script>" not in hit.snippet
+    assert "<mark>script</mark>" in hit.snippet
+
+
+def test_matches_any_term(db):
+    _index(db, 1, "quiero ir a la playa")
+    _index(db, 2, "la playa y el mar")
+    hits = SearchService(db).search(1, "playa mar").results
+    # Both match, the one with both terms first
+    assert [hit.message_id for hit in hits] == [2, 1]
+
+
+def test_make_snippet_escapes_words():
+    snippet = make_snippet("mira <b onclick=x>hola</b> amigo", ["hola"])
+    assert snippet == "mira &lt;b <mark>onclick=x&gt;hola&lt;/b&gt;</mark> amigo"
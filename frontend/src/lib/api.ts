@@ -6,6 +6,8 @@ const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 // Create axios instance
 const api = axios.create({
   baseURL: API_BASE_URL,
+  // Send the backend's cookies, which keep reads right after a write on the primary database
+  withCredentials: true,
   headers: {
     'Content-Type': 'application/json',
   },